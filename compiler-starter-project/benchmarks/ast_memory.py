@@ -0,0 +1,70 @@
+import argparse
+import sys
+import time
+import tracemalloc
+
+from benchmarks.corpus import infix_and_postfix, random_prefix
+from components.ast.arrays import from_prefix, parse_infix
+from components.evaluator import evaluate_prefix, prefix_to_ast
+
+    # -------------------------------------------
+    #   Benchmark: memory per node of the object AST vs the struct-of-arrays AST.
+    #
+    #   Builds the same random expression as Expression_* objects (prefix_to_ast)
+    #   and as an ArrayAST (from the prefix form, and through MyParser from the infix
+    #   form), and reports the bytes allocated per node (tracemalloc) and the build /
+    #   evaluation time of each.
+    #
+    #   Run from `compiler-starter-project/`:
+    #       python -m benchmarks.ast_memory
+    # -------------------------------------------
+
+def allocated(function) -> tuple:
+    """(result, bytes still allocated after `function` returned) while the result is kept alive."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = function()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, after - before
+
+
+def best_time(function, repeat:int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="AST memory benchmark")
+    arg_parser.add_argument("--tokens", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    args = arg_parser.parse_args(argv)
+
+    # The object AST evaluates recursively
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), 200_000))
+    print(f"{'tokens':>8} {'ast':>8} {'bytes/node':>11} {'build (ms)':>11} {'eval (ms)':>10}")
+    for n_tokens in args.tokens:
+        prefix = random_prefix(n_tokens, operators="+-*", seed=0)
+        infix, _ = infix_and_postfix(prefix)
+        n_nodes = len(prefix.split())
+        expected = evaluate_prefix(prefix)
+
+        candidates = (
+            ("objects", lambda: prefix_to_ast(prefix), lambda tree: tree.run() or tree.value),
+            ("arrays", lambda: from_prefix(prefix), lambda tree: tree.evaluate()),
+            ("parsed", lambda: parse_infix(infix), lambda tree: tree.evaluate()),
+        )
+        for name, build, run in candidates:
+            tree, size = allocated(build)
+            assert run(tree) == expected, name
+            build_time = best_time(build, args.repeat)
+            run_time = best_time(lambda: run(tree), args.repeat)
+            print(f"{n_nodes:>8} {name:>8} {size / n_nodes:>11.1f} {build_time * 1e3:>11.2f} {run_time * 1e3:>10.2f}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
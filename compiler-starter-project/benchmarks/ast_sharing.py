@@ -0,0 +1,78 @@
+import argparse
+import sys
+import time
+import tracemalloc
+
+from benchmarks.corpus import repeated_prefix
+from components.ast.compiler import compile_expression
+from components.ast.statement import NodePool
+from components.evaluator import prefix_to_ast
+from components.memory import Memory
+
+    # -------------------------------------------
+    #   Benchmark: common-subexpression sharing with hash-consed AST nodes.
+    #
+    #   Builds expressions with heavy repetition (benchmarks.corpus.repeated_prefix) as
+    #   a plain Expression tree (prefix_to_ast) and as a DAG (prefix_to_ast with a
+    #   NodePool), and reports the nodes, the bytes still allocated by each and the time
+    #   of one `run()`. The compiled program of the same tree is shown for reference.
+    #
+    #   Run from `compiler-starter-project/`:
+    #       python -m benchmarks.ast_sharing
+    # -------------------------------------------
+
+def allocated(function) -> tuple:
+    """(result, bytes still allocated after `function` returned) while the result is kept alive."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = function()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, after - before
+
+
+def best_time(function, repeat:int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(tree) -> object:
+    tree.run()
+    return tree.value
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="AST sharing benchmark")
+    arg_parser.add_argument("--copies", type=int, nargs="+", default=[100, 1_000, 10_000])
+    arg_parser.add_argument("--distinct", type=int, default=8, help="distinct small formulas")
+    arg_parser.add_argument("--repeat", type=int, default=5)
+    args = arg_parser.parse_args(argv)
+
+    memory = Memory()
+    for name, value in (("a", 3), ("b", 5), ("c", 7)):
+        memory.set(variable_name=name, value=value, data_type=int)
+    print(f"{'tree nodes':>11} {'dag nodes':>10} {'tree bytes':>11} {'dag bytes':>10} "
+          f"{'tree run (ms)':>14} {'dag run (ms)':>13} {'compiled (ms)':>14}")
+    for n_copies in args.copies:
+        prefix = repeated_prefix(n_copies, args.distinct)
+        n_tokens = len(prefix.split())
+        tree, tree_bytes = allocated(lambda: prefix_to_ast(prefix, memory))
+        pool = NodePool(memory)
+        dag, dag_bytes = allocated(lambda: prefix_to_ast(prefix, pool=pool))
+        program = compile_expression(tree)
+        assert run(tree) == run(dag) == program.run(memory=memory)
+        assert compile_expression(dag).run(memory=memory) == program.run(memory=memory)
+
+        tree_time = best_time(lambda: tree.run(), args.repeat)
+        dag_time = best_time(lambda: dag.run(), args.repeat)
+        program_time = best_time(lambda: program.run(memory=memory), args.repeat)
+        print(f"{n_tokens:>11,} {len(pool):>10,} {tree_bytes:>11,} {dag_bytes:>10,} "
+              f"{tree_time * 1e3:>14.3f} {dag_time * 1e3:>13.3f} {program_time * 1e3:>14.3f}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,71 @@
+import argparse
+import sys
+import time
+
+from benchmarks.corpus import random_prefix
+from components.ast.compiler import compile_expression
+from components.evaluator import prefix_to_ast
+
+    # -------------------------------------------
+    #   Benchmark: Expression tree `run()` vs. compiled bytecode `run()`.
+    #
+    #   Both evaluate the same random expression many times. The compiled program
+    #   is also re-run with a different binding of `x` on every iteration.
+    #
+    #   Run from `compiler-starter-project/`:
+    #       python -m benchmarks.compiled
+    # -------------------------------------------
+
+def with_variable(expression:str) -> str:
+    # Replace every third operand by `x` so the program has something to bind
+    tokens = expression.split()
+    operands = 0
+    for position, token in enumerate(tokens):
+        if token.isdigit():
+            operands += 1
+            if operands % 3 == 0:
+                tokens[position] = "x"
+    return " ".join(tokens)
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="compiled expression benchmark")
+    arg_parser.add_argument("--tokens", type=int, default=1_000)
+    arg_parser.add_argument("--runs", type=int, default=1_000)
+    args = arg_parser.parse_args(argv)
+
+    expression = random_prefix(args.tokens, operators="+-*")
+    tree = prefix_to_ast(expression)
+
+    start = time.perf_counter()
+    program = compile_expression(expression)
+    compile_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(args.runs):
+        tree.run()
+    tree_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(args.runs):
+        program.run({})
+    vm_time = time.perf_counter() - start
+    assert program.run({}) == tree.value
+
+    variable_program = compile_expression(with_variable(expression))
+    start = time.perf_counter()
+    for x in range(args.runs):
+        variable_program.run({"x": x})
+    binding_time = time.perf_counter() - start
+
+    print(f"expression tokens        : {len(expression.split())}")
+    print(f"constant program length  : {len(program)} instructions (folded)")
+    print(f"variable program length  : {len(variable_program)} instructions")
+    print(f"compile                  : {compile_time * 1e3:.3f} ms")
+    print(f"tree run()               : {tree_time / args.runs * 1e6:.1f} us/run")
+    print(f"compiled run()           : {vm_time / args.runs * 1e6:.1f} us/run")
+    print(f"compiled run(x=...)      : {binding_time / args.runs * 1e6:.1f} us/run")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,85 @@
+import argparse
+import contextlib
+import io
+import math
+import sys
+import time
+
+from benchmarks.corpus import flat_infix, left_deep_prefix, nested_infix
+from components.parsers import MyParser
+
+    # -------------------------------------------
+    #   Scaling benchmark for the MyParser converters.
+    #
+    #   Each converter runs on inputs that double in size. For a linear algorithm the
+    #   time doubles too, so the fitted log-log slope should stay close to 1.0
+    #   (the old string-building prefix_to_infix shows a slope close to 2.0).
+    #
+    #   Run from `compiler-starter-project/`:
+    #       python -m benchmarks.converters
+    # -------------------------------------------
+
+def legacy_prefix_to_infix(expression):
+    # The previous implementation: one new f-string of the whole subexpression per operator
+    stack = []
+    for token in reversed(expression.split()):
+        if token.lstrip('-').isdigit():
+            stack.append(token)
+        else:
+            op1 = stack.pop()
+            op2 = stack.pop()
+            stack.append(f"({op1} {token} {op2})")
+    return stack[0]
+
+
+def slope(sizes, times) -> float:
+    # Least-squares slope of log(time) against log(size)
+    xs = [math.log(size) for size in sizes]
+    ys = [math.log(max(t, 1e-9)) for t in times]
+    mean_x = sum(xs) / len(xs)
+    mean_y = sum(ys) / len(ys)
+    numerator = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys))
+    denominator = sum((x - mean_x) ** 2 for x in xs)
+    return numerator / denominator
+
+
+def best_of(function, argument, repeat:int) -> float:
+    best = math.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(argument)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="converter scaling benchmark")
+    arg_parser.add_argument("--sizes", type=int, nargs="+", default=[12_500, 25_000, 50_000, 100_000])
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    args = arg_parser.parse_args(argv)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        parser = MyParser()
+
+    cases = [
+        ("prefix_to_infix (left-deep)", parser.prefix_to_infix, left_deep_prefix),
+        ("legacy prefix_to_infix (left-deep)", legacy_prefix_to_infix, left_deep_prefix),
+        ("prefix_to_postfix (left-deep)", parser.prefix_to_postfix, left_deep_prefix),
+        ("infix_to_prefix (flat)", parser.infix_to_prefix, flat_infix),
+        ("infix_to_prefix (nested)", parser.infix_to_prefix, nested_infix),
+        ("infix_to_postfix (flat)", parser.infix_to_postfix, flat_infix),
+        ("infix_to_postfix (nested)", parser.infix_to_postfix, nested_infix),
+    ]
+
+    print(f"{'converter':<36}" + "".join(f"{size:>11}" for size in args.sizes) + f"{'slope':>8}")
+    for name, function, generate in cases:
+        times = []
+        for size in args.sizes:
+            expression = generate(size)
+            with contextlib.redirect_stdout(io.StringIO()):
+                times.append(best_of(function, expression, args.repeat))
+        print(f"{name:<36}" + "".join(f"{t:>10.4f}s" for t in times) + f"{slope(args.sizes, times):>8.2f}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,186 @@
+import random
+
+    # -------------------------------------------
+    #   Expression generators used by the benchmarks.
+    #   Every generator is seeded so that runs are reproducible.
+    # -------------------------------------------
+
+def random_prefix(n_tokens:int, operators:str = "+-", seed:int = 0) -> str:
+    """
+    Generates a random prefix expression with roughly `n_tokens` tokens.
+    Example:
+    Input: n_tokens=5
+    Output: "+ 3 - 4 5"
+    """
+    rng = random.Random(seed)
+    n_operators = max(1, n_tokens // 2)
+    tokens = []
+    pending = 1                             # Number of operands still needed to close the expression
+    for _ in range(n_operators):
+        # Open an operator while we still can, otherwise close with numbers
+        while rng.random() < 0.5 and pending > 1:
+            tokens.append(str(rng.randint(1, 9)))
+            pending -= 1
+        tokens.append(rng.choice(operators))
+        pending += 1
+    tokens.extend(str(rng.randint(1, 9)) for _ in range(pending))
+    return " ".join(tokens)
+
+
+def repeated_prefix(n_copies:int, distinct:int = 8, seed:int = 0) -> str:
+    """
+    Generates a prefix expression made of `n_copies` occurrences of `distinct` small
+    formulas over a, b and c, combined pairwise into a balanced tree (so the lower
+    combinations repeat too).
+    Example:
+    Input: n_copies=2, distinct=1
+    Output: "+ + * a b c + * a b c"
+    """
+    rng = random.Random(seed)
+    formulas = [f"{rng.choice('+-*')} {rng.choice('*+')} {rng.choice('abc')} {rng.choice('abc')} {rng.randint(1, 9)}"
+                for _ in range(distinct)]
+    level = [rng.choice(formulas) for _ in range(n_copies)]
+    while len(level) > 1:
+        paired = [f"{rng.choice('+*')} {level[i]} {level[i + 1]}" for i in range(0, len(level) - 1, 2)]
+        if len(level) % 2:
+            paired.append(level[-1])
+        level = paired
+    return level[0]
+
+
+def left_deep_prefix(n_operators:int) -> str:
+    """
+    Generates a left-deep prefix expression.
+    Example:
+    Input: n_operators=2
+    Output: "+ + 1 2 3"
+    """
+    operands = " ".join(str(i % 9 + 1) for i in range(n_operators + 1))
+    return "+ " * n_operators + operands
+
+
+def flat_infix(n_operators:int) -> str:
+    """
+    Generates a wide, flat infix sum.
+    Example:
+    Input: n_operators=2
+    Output: "1 + 2 + 3"
+    """
+    return " + ".join(str(i % 9 + 1) for i in range(n_operators + 1))
+
+
+def nested_infix(n_operators:int) -> str:
+    """
+    Generates a right-deep, fully parenthesized infix expression.
+    Example:
+    Input: n_operators=2
+    Output: "1 + ( 2 + 3 )"
+    """
+    head = " ".join(f"{i % 9 + 1} + (" for i in range(n_operators - 1))
+    tail = f"{(n_operators - 1) % 9 + 1} + {n_operators % 9 + 1}"
+    return f"{head} {tail} {') ' * (n_operators - 1)}".strip()
+
+
+def right_deep_prefix(n_operators:int, operators:str = "+-*") -> str:
+    """
+    Generates a right-deep prefix expression (maximum nesting of open operators).
+    Example:
+    Input: n_operators=2
+    Output: "+ 1 - 2 3"
+    """
+    tokens = []
+    for i in range(n_operators):
+        tokens.append(operators[i % len(operators)])
+        tokens.append(str(i % 9 + 1))
+    tokens.append(str(n_operators % 9 + 1))
+    return " ".join(tokens)
+
+
+def wide_sum_prefix(n_operators:int) -> str:
+    """
+    Generates a balanced sum: the widest tree for a given number of operators.
+    Example:
+    Input: n_operators=3
+    Output: "+ + 1 2 + 3 4"
+    """
+    tokens = []
+    stack = [n_operators + 1]               # Operand counts still to lay out, depth first
+    operand = 0
+    while stack:
+        count = stack.pop()
+        if count == 1:
+            tokens.append(str(operand % 9 + 1))
+            operand += 1
+        else:
+            tokens.append("+")
+            stack.append(count - count // 2)
+            stack.append(count // 2)
+    return " ".join(tokens)
+
+
+def long_numbers_prefix(n_operators:int, digits:int = 40, seed:int = 0) -> str:
+    """
+    Generates a random + - * prefix expression whose operands are `digits` long.
+    Example:
+    Input: n_operators=1, digits=3
+    Output: "* 512 907"
+    """
+    rng = random.Random(seed)
+    tokens = random_prefix(n_operators * 2 + 1, operators="+-*", seed=seed).split()
+    return " ".join(token if token in "+-*" else str(rng.randrange(10 ** (digits - 1), 10 ** digits)) for token in tokens)
+
+
+def many_variables_prefix(n_operators:int, n_variables:int = 100, seed:int = 0) -> str:
+    """
+    Generates a random prefix expression whose operands are variables v0 .. v{n_variables - 1}.
+    Example:
+    Input: n_operators=2
+    Output: "+ v12 * v3 v87"
+    """
+    rng = random.Random(seed)
+    tokens = random_prefix(n_operators * 2 + 1, operators="+-*", seed=seed).split()
+    return " ".join(token if token in "+-*" else f"v{rng.randrange(n_variables)}" for token in tokens)
+
+
+def infix_and_postfix(prefix:str) -> tuple:
+    """
+    Converts a prefix expression to (infix, postfix), accepting any operand token (numbers
+    or names), so every corpus has all three forms whatever the converters under test accept.
+    Example:
+    Input: "+ x * 2 y"
+    Output: ("(x + (2 * y))", "x 2 y * +")
+    """
+    infix = []
+    postfix = []
+    stack = []                              # Open operators: [op, left operand done?]
+    for token in prefix.split():
+        if token in ("+", "-", "*", "/"):
+            stack.append([token, False])
+            infix.append("(")
+            continue
+        infix.append(token)
+        postfix.append(token)
+        while stack:
+            if not stack[-1][1]:
+                stack[-1][1] = True
+                infix.append(f" {stack[-1][0]} ")
+                break
+            infix.append(")")
+            postfix.append(stack.pop()[0])
+    return "".join(infix), " ".join(postfix)
+
+
+# Corpus name -> generator(n_operators, seed) returning a prefix expression
+CORPORA = {
+    "random": lambda n, seed=0: random_prefix(n * 2 + 1, operators="+-*", seed=seed),
+    "left_deep": lambda n, seed=0: left_deep_prefix(n),
+    "right_deep": lambda n, seed=0: right_deep_prefix(n),
+    "wide_sum": lambda n, seed=0: wide_sum_prefix(n),
+    "long_numbers": lambda n, seed=0: long_numbers_prefix(n, seed=seed),
+    "many_variables": lambda n, seed=0: many_variables_prefix(n, seed=seed),
+}
+
+
+def variable_bindings(n_variables:int = 100) -> dict:
+    """Values for the variables of `many_variables_prefix`."""
+    return {f"v{i}": i + 1 for i in range(n_variables)}
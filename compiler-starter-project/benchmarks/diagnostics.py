@@ -0,0 +1,87 @@
+import argparse
+import random
+import sys
+import time
+
+from benchmarks.corpus import infix_and_postfix, random_prefix
+from components.diagnostics import BulkParser
+from components.engine import Engine
+from components.streaming import evaluate_statements, stream_statements
+
+    # -------------------------------------------
+    #   Benchmark: bulk parsing throughput on malformed input.
+    #
+    #   Generates `--lines` short expressions in infix and prefix notation, then a copy
+    #   where `--error-rate` of the lines are broken (illegal character, missing operand,
+    #   doubled operator or stray parenthesis). Reports lines/s of BulkParser on clean and
+    #   broken input, next to the Engine-based streaming path on clean input.
+    #
+    #   Run from `compiler-starter-project/`:
+    #       python -m benchmarks.diagnostics
+    # -------------------------------------------
+
+def corrupt(line:str, rng:random.Random) -> str:
+    tokens = line.split()
+    damage = rng.randrange(4)
+    if damage == 0:
+        position = rng.randrange(len(line) + 1)
+        return line[:position] + rng.choice("$?!@") + line[position:]
+    if damage == 1:
+        return " ".join(tokens[:-1])
+    if damage == 2:
+        position = rng.randrange(len(tokens))
+        return " ".join(tokens[:position] + [rng.choice("*/")] + tokens[position:])
+    return line + " )"
+
+
+def make_corpus(n_lines:int, tokens:int, error_rate:float, seed:int = 0) -> dict:
+    rng = random.Random(seed)
+    prefix_lines = [random_prefix(tokens, operators="+-*", seed=seed * n_lines + i) for i in range(n_lines)]
+    infix_lines = [infix_and_postfix(line)[0] for line in prefix_lines]
+    broken = set(rng.sample(range(n_lines), int(n_lines * error_rate)))
+
+    def join(lines):
+        return "\n".join(lines).encode() + b"\n"
+
+    return {
+        "infix": (join(infix_lines), join(corrupt(line, rng) if i in broken else line for i, line in enumerate(infix_lines))),
+        "prefix": (join(prefix_lines), join(corrupt(line, rng) if i in broken else line for i, line in enumerate(prefix_lines))),
+    }
+
+
+def lines_per_second(function, data:bytes, repeat:int) -> tuple:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        records = sum(1 for _ in function(data))
+        best = min(best, time.perf_counter() - start)
+    return records / best, records
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="bulk parser benchmark")
+    arg_parser.add_argument("--lines", type=int, default=20_000)
+    arg_parser.add_argument("--tokens", type=int, default=15, help="tokens per expression")
+    arg_parser.add_argument("--error-rate", type=float, default=0.1)
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    args = arg_parser.parse_args(argv)
+
+    corpus = make_corpus(args.lines, args.tokens, args.error_rate)
+    print(f"{args.lines} lines of ~{args.tokens} tokens, {args.error_rate:.0%} broken")
+    print(f"{'mode':>7} {'engine clean':>13} {'bulk clean':>11} {'bulk broken':>12} {'broken/clean':>13} {'diagnostics':>12}")
+    for mode, (clean, broken) in corpus.items():
+        engine_rate, _ = lines_per_second(lambda data: evaluate_statements(Engine(mode=mode), stream_statements([data])), clean, args.repeat)
+        clean_rate, _ = lines_per_second(lambda data: BulkParser(mode=mode).evaluate_text(data), clean, args.repeat)
+        bulk = None
+
+        def run_broken(data):
+            nonlocal bulk
+            bulk = BulkParser(mode=mode)
+            return bulk.evaluate_text(data)
+        broken_rate, _ = lines_per_second(run_broken, broken, args.repeat)
+        print(f"{mode:>7} {engine_rate:>13,.0f} {clean_rate:>11,.0f} {broken_rate:>12,.0f} "
+              f"{broken_rate / clean_rate:>12.2f}x {len(bulk.report):>12,}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,51 @@
+import argparse
+import sys
+import time
+
+from benchmarks.corpus import random_prefix
+from components.fastlex import tokenize_fast
+from components.lexica import MyLexer
+from components.parsers import MyParser
+
+    # -------------------------------------------
+    #   Benchmark: MyLexer (SLY) vs. components.fastlex.tokenize_fast.
+    #
+    #   The input is an infix expression with variables and multi-digit numbers.
+    #
+    #   Run from `compiler-starter-project/`:
+    #       python -m benchmarks.lexer
+    # -------------------------------------------
+
+def infix_text(n_tokens:int) -> str:
+    infix = MyParser().prefix_to_infix(random_prefix(n_tokens, operators="+-*/"))
+    # Swap some digits for names and widen numbers so every token kind shows up
+    return infix.replace("7", "rate_7").replace("3", "1234")
+
+
+def best_of(function, argument, repeat:int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(argument)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="lexer benchmark")
+    arg_parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    args = arg_parser.parse_args(argv)
+
+    lexer = MyLexer()
+    print(f"{'tokens':>10} {'sly (s)':>9} {'fast (s)':>9} {'speedup':>8}")
+    for size in args.sizes:
+        text = infix_text(size)
+        n_tokens = len(tokenize_fast(text))
+        sly_time = best_of(lambda source: sum(1 for _ in lexer.tokenize(source)), text, args.repeat)
+        fast_time = best_of(tokenize_fast, text, args.repeat)
+        print(f"{n_tokens:>10} {sly_time:>9.4f} {fast_time:>9.4f} {sly_time / fast_time:>7.1f}x")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
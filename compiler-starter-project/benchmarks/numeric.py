@@ -0,0 +1,63 @@
+import argparse
+import sys
+import time
+
+from benchmarks.corpus import random_prefix
+from components.ast.compiler import compile_expression
+from components.evaluator import evaluate_prefix
+from components.numeric import BACKENDS, get_backend
+
+    # -------------------------------------------
+    #   Benchmark: cost of each numeric backend on small-integer input.
+    #
+    #   Evaluates many short random expressions (single digits, + - * /) with
+    #   evaluate_prefix and with a compiled program, under every backend, and
+    #   reports the time relative to float. The programs are compiled without constant
+    #   folding, so the compiled column times the arithmetic and not a folded constant.
+    #
+    #   Run from `compiler-starter-project/`:
+    #       python -m benchmarks.numeric
+    # -------------------------------------------
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="numeric backend benchmark")
+    arg_parser.add_argument("--expressions", type=int, default=2_000)
+    arg_parser.add_argument("--tokens", type=int, default=15, help="tokens per expression")
+    arg_parser.add_argument("--operators", default="+-*/")
+    arg_parser.add_argument("--precision", type=int, default=28)
+    args = arg_parser.parse_args(argv)
+
+    expressions = [random_prefix(args.tokens, operators=args.operators, seed=seed) for seed in range(args.expressions)]
+
+    print(f"{args.expressions} expressions of ~{args.tokens} tokens, operators {args.operators!r}")
+    print(f"{'backend':>14} {'prefix (s)':>11} {'vs float':>9} {'compiled (s)':>13} {'vs float':>9} {'errors':>7}")
+    baseline = None
+    for name in BACKENDS:
+        backend = get_backend(name, args.precision)
+        programs = [compile_expression(expression, backend, fold=False) for expression in expressions]
+        errors = 0
+
+        start = time.perf_counter()
+        for expression in expressions:
+            try:
+                evaluate_prefix(expression, backend)
+            except (ValueError, ArithmeticError):
+                errors += 1             # e.g. a non-exact division under "int"
+        prefix_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for program in programs:
+            try:
+                program.run({}, backend=backend)
+            except (ValueError, ArithmeticError):
+                pass
+        compiled_time = time.perf_counter() - start
+
+        if baseline is None:
+            baseline = (prefix_time, compiled_time)
+        print(f"{backend.name:>14} {prefix_time:>11.4f} {prefix_time / baseline[0]:>8.2f}x "
+              f"{compiled_time:>13.4f} {compiled_time / baseline[1]:>8.2f}x {errors:>7}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,48 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.corpus import random_prefix
+from components.batch import evaluate_parallel
+
+    # -------------------------------------------
+    #   Throughput of components.batch.evaluate_parallel for 1/2/4/8 workers.
+    #
+    #   Scaling is bounded by the cores of the machine: compare the lines/s column
+    #   with `os.cpu_count()` printed in the header.
+    #
+    #   Run from `compiler-starter-project/`:
+    #       python -m benchmarks.parallel
+    # -------------------------------------------
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="parallel batch benchmark")
+    arg_parser.add_argument("--lines", type=int, default=200_000)
+    arg_parser.add_argument("--tokens", type=int, default=20, help="tokens per expression")
+    arg_parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    arg_parser.add_argument("--chunk-bytes", type=int, default=1 << 19)
+    args = arg_parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as scratch:
+        path = os.path.join(scratch, "expressions.txt")
+        with open(path, "w") as file:
+            # A few hundred distinct formulas, like a real workload with repeats
+            for line in range(args.lines):
+                file.write(random_prefix(args.tokens, operators="+-*/", seed=line % 500) + "\n")
+
+        print(f"cores: {os.cpu_count()}  lines: {args.lines}")
+        print(f"{'workers':>8} {'seconds':>9} {'lines/s':>11} {'speedup':>8}")
+        baseline = None
+        for workers in args.workers:
+            start = time.perf_counter()
+            for _ in evaluate_parallel([path], workers=workers, chunk_bytes=args.chunk_bytes):
+                pass
+            elapsed = time.perf_counter() - start
+            baseline = baseline or elapsed
+            print(f"{workers:>8} {elapsed:>9.2f} {args.lines / elapsed:>11.0f} {baseline / elapsed:>7.2f}x")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,57 @@
+import argparse
+import contextlib
+import io
+import sys
+import time
+
+from benchmarks.corpus import random_prefix
+from components.evaluator import evaluate_prefix
+from components.lexica import MyLexer
+from components.parsers import MyParser
+
+    # -------------------------------------------
+    #   Benchmark: prefix -> infix -> MyLexer -> MyParser (old push_equal pipeline)
+    #              vs. components.evaluator.evaluate_prefix (single pass)
+    #
+    #   Run from `compiler-starter-project/`:
+    #       python -m benchmarks.prefix_eval
+    # -------------------------------------------
+
+def pipeline(parser:MyParser, lexer:MyLexer, text:str):
+    infix_expr = parser.prefix_to_infix(text)
+    return parser.parse(lexer.tokenize(infix_expr))
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    # The old pipeline prints on every token, keep that out of the terminal
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="prefix evaluation benchmark")
+    arg_parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    arg_parser.add_argument("--pipeline-max", type=int, default=100_000,
+                            help="skip the old pipeline above this many tokens")
+    args = arg_parser.parse_args(argv)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        parser = MyParser()
+    lexer = MyLexer()
+
+    print(f"{'tokens':>10} {'pipeline (s)':>14} {'direct (s)':>12} {'speedup':>9}")
+    for size in args.sizes:
+        text = random_prefix(size)
+        direct_result, direct_time = timed(evaluate_prefix, text)
+        if size <= args.pipeline_max:
+            pipeline_result, pipeline_time = timed(pipeline, parser, lexer, text)
+            assert pipeline_result == direct_result, (pipeline_result, direct_result)
+            print(f"{size:>10} {pipeline_time:>14.4f} {direct_time:>12.4f} {pipeline_time / direct_time:>8.1f}x")
+        else:
+            print(f"{size:>10} {'skipped':>14} {direct_time:>12.4f} {'-':>9}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
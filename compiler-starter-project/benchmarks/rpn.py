@@ -0,0 +1,69 @@
+import argparse
+import sys
+import time
+import tracemalloc
+
+from benchmarks.corpus import infix_and_postfix, random_prefix
+from components.evaluator import evaluate_postfix
+from components.parsers import MyParser
+from components.rpn import RPNProgram, compile_infix, compile_postfix
+
+    # -------------------------------------------
+    #   Benchmark: precompiled RPN programs (components/rpn.py).
+    #
+    #   For one random expression per size, compares
+    #       - evaluating the postfix string (evaluate_postfix) with running the RPNProgram,
+    #         in time and in peak bytes allocated by one evaluation
+    #       - the size of the binary form with the postfix text
+    #       - reloading the binary form with converting the infix text again
+    #
+    #   Run from `compiler-starter-project/`:
+    #       python -m benchmarks.rpn
+    # -------------------------------------------
+
+def best_time(function, repeat:int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def peak_bytes(function) -> int:
+    function()                              # Warm up lazily converted pools
+    tracemalloc.start()
+    function()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="RPN program benchmark")
+    arg_parser.add_argument("--tokens", type=int, nargs="+", default=[100, 10_000, 100_000])
+    arg_parser.add_argument("--repeat", type=int, default=5)
+    args = arg_parser.parse_args(argv)
+
+    parser = MyParser()
+    print(f"{'tokens':>8} {'postfix (ms)':>13} {'rpn (ms)':>9} {'postfix peak':>13} {'rpn peak':>9} "
+          f"{'text B':>9} {'binary B':>9} {'convert (ms)':>13} {'reload (ms)':>12}")
+    for n_tokens in args.tokens:
+        prefix = random_prefix(n_tokens, operators="+-*", seed=0)
+        infix, postfix = infix_and_postfix(prefix)
+        program = compile_postfix(postfix)
+        data = program.to_bytes()
+        assert program.run() == evaluate_postfix(postfix)
+        assert RPNProgram.from_bytes(data) == program
+
+        postfix_time = best_time(lambda: evaluate_postfix(postfix), args.repeat)
+        rpn_time = best_time(program.run, args.repeat)
+        convert_time = best_time(lambda: compile_infix(infix, parser), args.repeat)
+        reload_time = best_time(lambda: RPNProgram.from_bytes(data), args.repeat)
+        print(f"{len(postfix.split()):>8} {postfix_time * 1e3:>13.3f} {rpn_time * 1e3:>9.3f} "
+              f"{peak_bytes(lambda: evaluate_postfix(postfix)):>13,} {peak_bytes(program.run):>9,} "
+              f"{len(postfix.encode()):>9,} {len(data):>9,} {convert_time * 1e3:>13.3f} {reload_time * 1e3:>12.3f}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
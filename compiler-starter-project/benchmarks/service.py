@@ -0,0 +1,66 @@
+import argparse
+import asyncio
+import json
+import sys
+import time
+
+from benchmarks.corpus import random_prefix
+from components.service import CalculatorService
+
+    # -------------------------------------------
+    #   Throughput of components.service over TCP on localhost.
+    #
+    #   Starts the service in-process, then `--clients` connections each pipeline
+    #   `--requests` prefix expressions drawn from `--distinct` formulas (so some
+    #   requests in a batch are duplicates) and read all responses back.
+    #
+    #   Run from `compiler-starter-project/`:
+    #       python -m benchmarks.service
+    # -------------------------------------------
+
+async def client(port:int, lines:bytes, n_requests:int) -> None:
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(lines)
+    await writer.drain()
+    writer.write_eof()
+    received = 0
+    async for line in reader:
+        assert json.loads(line)["error"] is None
+        received += 1
+    assert received == n_requests
+    writer.close()
+
+
+async def run(args) -> None:
+    service = CalculatorService(batch_window=args.batch_window)
+    server = await service.serve_tcp("127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+
+    formulas = [random_prefix(args.tokens, operators="+-*", seed=seed) for seed in range(args.distinct)]
+    lines = "".join(json.dumps({"id": i, "expression": formulas[i % args.distinct]}) + "\n" for i in range(args.requests)).encode()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client(port, lines, args.requests) for _ in range(args.clients)))
+    seconds = time.perf_counter() - start
+
+    total = args.clients * args.requests
+    print(f"{args.clients} clients x {args.requests} requests: {seconds:.3f} s, {total / seconds:,.0f} evaluations/s")
+    print(service.stats)
+    server.close()
+    await server.wait_closed()
+    service.close()
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="service throughput benchmark")
+    arg_parser.add_argument("--clients", type=int, default=8)
+    arg_parser.add_argument("--requests", type=int, default=5_000, help="requests per client")
+    arg_parser.add_argument("--distinct", type=int, default=200, help="distinct formulas")
+    arg_parser.add_argument("--tokens", type=int, default=15, help="tokens per expression")
+    arg_parser.add_argument("--batch-window", type=float, default=0.001)
+    args = arg_parser.parse_args(argv)
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
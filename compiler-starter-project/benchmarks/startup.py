@@ -0,0 +1,62 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+    # -------------------------------------------
+    #   Startup benchmark for MyParser.
+    #
+    #       - previous : tables always rebuilt, parser.out written on every start
+    #       - cold     : empty table cache (build + save)
+    #       - warm     : tables loaded from the cache
+    #
+    #   Every run is a fresh interpreter; the time reported is the import of
+    #   components.parsers plus MyParser(), measured inside the child process.
+    #
+    #   Run from `compiler-starter-project/`:
+    #       python -m benchmarks.startup
+    # -------------------------------------------
+
+CHILD = (
+    "import time, sly; start = time.perf_counter(); "
+    "from components.parsers import MyParser; MyParser(); "
+    "print(time.perf_counter() - start)"
+)
+
+
+def run_child(env:dict, cwd:str) -> float:
+    output = subprocess.run([sys.executable, "-c", CHILD], env=env, cwd=cwd,
+                            check=True, capture_output=True, text=True).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="parser startup benchmark")
+    arg_parser.add_argument("--repeat", type=int, default=10)
+    args = arg_parser.parse_args(argv)
+
+    project = os.getcwd()
+    with tempfile.TemporaryDirectory() as scratch:
+        base = dict(os.environ, PYTHONPATH=project, CALC_CACHE_DIR=os.path.join(scratch, "cache"))
+        base.pop("CALC_PARSER_DEBUG", None)
+        base.pop("CALC_PARSER_CACHE", None)
+        previous_env = dict(base, CALC_PARSER_CACHE="0", CALC_PARSER_DEBUG=os.path.join(scratch, "parser.out"))
+
+        results = {"previous": [], "cold": [], "warm": []}
+        for _ in range(args.repeat):
+            results["previous"].append(run_child(previous_env, scratch))
+            for name in os.listdir(scratch):
+                if name == "cache":
+                    for table in os.listdir(os.path.join(scratch, "cache")):
+                        os.remove(os.path.join(scratch, "cache", table))
+            results["cold"].append(run_child(base, scratch))
+            results["warm"].append(run_child(base, scratch))
+
+    for name, times in results.items():
+        print(f"{name:<9}: median {statistics.median(times) * 1e3:7.2f} ms  (min {min(times) * 1e3:.2f} ms)")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
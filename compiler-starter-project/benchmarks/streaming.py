@@ -0,0 +1,73 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.corpus import random_prefix
+from components.lexica import MyLexer
+from components.parsers import MyParser
+from components.streaming import read_chunks, stream_statements
+
+    # -------------------------------------------
+    #   Benchmark: tokenizing a whole file with MyLexer vs. components.streaming.
+    #
+    #   Reports time and the peak of Python allocations (tracemalloc) for
+    #       - whole: read the file into one str, then MyLexer.tokenize
+    #       - stream: mmap'd blocks through stream_statements
+    #   The whole-file peak grows with the file; the streaming peak should not.
+    #
+    #   Run from `compiler-starter-project/`:
+    #       python -m benchmarks.streaming
+    # -------------------------------------------
+
+def write_corpus(path:str, lines:int) -> None:
+    parser = MyParser()
+    formulas = [parser.prefix_to_infix(random_prefix(21, operators="+-*/", seed=seed)) for seed in range(200)]
+    with open(path, "w") as file:
+        for line in range(lines):
+            file.write(formulas[line % len(formulas)] + "\n")
+
+
+def whole(path:str, chunk_bytes:int) -> int:
+    with open(path) as file:
+        text = file.read()
+    return sum(1 for _ in MyLexer().tokenize(text))
+
+
+def stream(path:str, chunk_bytes:int) -> int:
+    return sum(len(statement.tokens) for statement in stream_statements(read_chunks(path, chunk_bytes)))
+
+
+def measure(function, path:str, chunk_bytes:int) -> tuple:
+    # Timed without tracemalloc (it slows allocation down several times), then traced
+    start = time.perf_counter()
+    n_tokens = function(path, chunk_bytes)
+    seconds = time.perf_counter() - start
+    tracemalloc.start()
+    function(path, chunk_bytes)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return n_tokens, seconds, peak
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="streaming tokenizer benchmark")
+    arg_parser.add_argument("--lines", type=int, nargs="+", default=[10_000, 40_000])
+    arg_parser.add_argument("--chunk-bytes", type=int, default=1 << 16)
+    args = arg_parser.parse_args(argv)
+
+    print(f"{'lines':>9} {'MiB':>6} {'method':>7} {'tokens':>9} {'seconds':>8} {'peak MiB':>9}")
+    with tempfile.TemporaryDirectory() as scratch:
+        for lines in args.lines:
+            path = os.path.join(scratch, f"expressions_{lines}.txt")
+            write_corpus(path, lines)
+            size = os.path.getsize(path) / (1 << 20)
+            for name, function in (("whole", whole), ("stream", stream)):
+                n_tokens, seconds, peak = measure(function, path, args.chunk_bytes)
+                print(f"{lines:>9} {size:>6.1f} {name:>7} {n_tokens:>9} {seconds:>8.3f} {peak / (1 << 20):>9.2f}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,218 @@
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+
+from benchmarks.corpus import CORPORA, infix_and_postfix, variable_bindings
+from components.evaluator import evaluate_postfix, evaluate_prefix, prefix_to_ast
+from components.lexica import MyLexer
+from components.memory import default_memory
+from components.parsers import MyParser
+
+    # -------------------------------------------
+    #   Reproducible benchmark suite.
+    #
+    #   For every corpus (benchmarks/corpus.py CORPORA) and size, the prefix expression
+    #   is converted to infix and postfix once (by a corpus helper, not by the code under
+    #   test), then every stage is timed on the form it reads:
+    #
+    #       lex                 MyLexer.tokenize on the infix form
+    #       parse               MyParser.parse on the pre-lexed infix tokens
+    #       infix_to_prefix     \
+    #       infix_to_postfix     |  MyParser converters
+    #       prefix_to_infix      |
+    #       prefix_to_postfix   /
+    #       ast_build / ast_run prefix_to_ast and Expression.run
+    #       evaluate_prefix / evaluate_postfix
+    #
+    #   A stage that fails (e.g. recursion depth, names a converter does not accept) is
+    #   recorded with its error instead of stopping the run. Results are written as JSON
+    #   and two result files can be compared; `compare` exits with status 1 when a stage
+    #   got slower than the threshold, so it can gate a CI job.
+    #
+    #   Run from `compiler-starter-project/`:
+    #       python -m benchmarks.suite run --output before.json
+    #       python -m benchmarks.suite run --output after.json
+    #       python -m benchmarks.suite compare before.json after.json
+    # -------------------------------------------
+
+FORMAT_VERSION = 1
+SIZES = [10, 100, 1_000, 10_000]            # Operators per expression
+
+
+def _raise_syntax_error(token):
+    raise ValueError(f"Syntax error at {token}")
+
+
+def prepare(prefix:str) -> dict:
+    """The prefix / infix / postfix forms of one expression and the stage functions that run on them."""
+    parser = MyParser()
+    parser.error = _raise_syntax_error
+    lexer = MyLexer()
+    infix, postfix = infix_and_postfix(prefix)
+    forms = {"prefix": prefix, "infix": infix, "postfix": postfix, "infix_tokens": list(lexer.tokenize(infix))}
+
+    def tree():
+        if "tree" not in forms:
+            forms["tree"] = prefix_to_ast(prefix)
+        return forms["tree"]
+
+    return {
+        "lex": lambda: list(lexer.tokenize(forms["infix"])),
+        "parse": lambda: parser.parse(iter(forms["infix_tokens"])),
+        "infix_to_prefix": lambda: parser.infix_to_prefix(forms["infix"]),
+        "infix_to_postfix": lambda: parser.infix_to_postfix(forms["infix"]),
+        "prefix_to_infix": lambda: parser.prefix_to_infix(prefix),
+        "prefix_to_postfix": lambda: parser.prefix_to_postfix(prefix),
+        "ast_build": lambda: prefix_to_ast(prefix),
+        "ast_run": lambda: tree().run(),
+        "evaluate_prefix": lambda: evaluate_prefix(prefix),
+        "evaluate_postfix": lambda: evaluate_postfix(forms["postfix"]),
+    }
+
+
+def measure(function, repeat:int, min_seconds:float) -> float:
+    """Best time per call: calls are batched until a batch takes `min_seconds`, best of `repeat` batches."""
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            function()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_seconds or loops >= 1 << 20:
+            break
+        loops *= 2
+    best = elapsed
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(loops):
+            function()
+        best = min(best, time.perf_counter() - start)
+    return best / loops
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(corpora:list, sizes:list, stages:list = None, repeat:int = 5, min_seconds:float = 0.01, seed:int = 0) -> dict:
+    memory = default_memory()
+    for name, value in variable_bindings().items():
+        memory.set(variable_name=name, value=value, data_type=int, overwrite=True)
+
+    results = []
+    for corpus in corpora:
+        for size in sizes:
+            prefix = CORPORA[corpus](size, seed)
+            stage_functions = prepare(prefix)
+            n_tokens = len(prefix.split())
+            for stage, function in stage_functions.items():
+                if stages and stage not in stages:
+                    continue
+                record = {"corpus": corpus, "size": size, "stage": stage, "tokens": n_tokens,
+                          "seconds": None, "ns_per_token": None, "error": None}
+                try:
+                    seconds = measure(function, repeat, min_seconds)
+                    record["seconds"] = seconds
+                    record["ns_per_token"] = seconds / n_tokens * 1e9
+                except (ValueError, AssertionError, ArithmeticError, RecursionError) as error:
+                    record["error"] = f"{type(error).__name__}: {error}"[:200]
+                results.append(record)
+                _print_record(record)
+
+    return {
+        "format": FORMAT_VERSION,
+        "meta": {
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "machine": platform.machine(),
+            "system": platform.system(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "repeat": repeat,
+            "min_seconds": min_seconds,
+            "seed": seed,
+        },
+        "results": results,
+    }
+
+
+def _print_record(record:dict) -> None:
+    if record["error"]:
+        timing = f"{'-':>12} {'-':>10}  {record['error'][:60]}"
+    else:
+        timing = f"{record['seconds'] * 1e3:>12.4f} {record['ns_per_token']:>10.1f}"
+    print(f"{record['corpus']:>14} {record['size']:>7} {record['stage']:>18} {timing}", flush=True)
+
+
+def compare(baseline:dict, current:dict, threshold:float = 1.25) -> list:
+    """
+    Returns (key, old seconds, new seconds, ratio) for every stage that got slower than `threshold`
+    times the baseline, or that worked in the baseline and fails now.
+    """
+    old = {(r["corpus"], r["size"], r["stage"]): r for r in baseline["results"]}
+    regressions = []
+    for record in current["results"]:
+        key = (record["corpus"], record["size"], record["stage"])
+        before = old.get(key)
+        if before is None or before["seconds"] is None:
+            continue
+        if record["seconds"] is None:
+            regressions.append((key, before["seconds"], None, float("inf")))
+            continue
+        ratio = record["seconds"] / before["seconds"]
+        if ratio > threshold:
+            regressions.append((key, before["seconds"], record["seconds"], ratio))
+    return regressions
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(prog="python -m benchmarks.suite", description="benchmark suite")
+    commands = arg_parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run the suite")
+    run_parser.add_argument("--corpora", nargs="+", choices=tuple(CORPORA), default=list(CORPORA))
+    run_parser.add_argument("--sizes", type=int, nargs="+", default=SIZES, help="operators per expression")
+    run_parser.add_argument("--stages", nargs="+", default=None, help="only these stages")
+    run_parser.add_argument("--repeat", type=int, default=5)
+    run_parser.add_argument("--seed", type=int, default=0, help="seed of the random corpora")
+    run_parser.add_argument("--min-seconds", type=float, default=0.01, help="minimum duration of one timed batch")
+    run_parser.add_argument("--output", "-o", default=None, help="write the results as JSON")
+
+    compare_parser = commands.add_parser("compare", help="compare two result files")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=1.25, help="slowdown ratio that counts as a regression")
+    args = arg_parser.parse_args(argv)
+
+    if args.command == "run":
+        # Deep corpora go through the recursive Expression.run
+        sys.setrecursionlimit(max(sys.getrecursionlimit(), 10_000))
+        print(f"{'corpus':>14} {'size':>7} {'stage':>18} {'ms/call':>12} {'ns/token':>10}")
+        results = run(args.corpora, args.sizes, args.stages, args.repeat, args.min_seconds, args.seed)
+        if args.output:
+            with open(args.output, "w") as file:
+                json.dump(results, file, indent=1)
+        return 0
+
+    with open(args.baseline) as file:
+        baseline = json.load(file)
+    with open(args.current) as file:
+        current = json.load(file)
+    regressions = compare(baseline, current, args.threshold)
+    print(f"baseline {baseline['meta']['commit']}  current {current['meta']['commit']}  threshold {args.threshold}x")
+    for (corpus, size, stage), before, after, ratio in regressions:
+        after_text = "failed" if after is None else f"{after * 1e3:.4f} ms"
+        print(f"REGRESSION {corpus:>14} {size:>7} {stage:>18}  {before * 1e3:.4f} ms -> {after_text}  ({ratio:.2f}x)")
+    if not regressions:
+        print("no regressions")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
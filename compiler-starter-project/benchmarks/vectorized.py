@@ -0,0 +1,51 @@
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from components.ast.compiler import compile_expression
+from components.ast.vectorized import evaluate_batch
+
+    # -------------------------------------------
+    #   Benchmark: one formula over many rows.
+    #
+    #       - scalar : CompiledExpression.run once per row
+    #       - batch  : evaluate_batch once over whole columns
+    #
+    #   Run from `compiler-starter-project/`:
+    #       python -m benchmarks.vectorized
+    # -------------------------------------------
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="vectorized batch benchmark")
+    arg_parser.add_argument("--rows", type=int, default=1_000_000)
+    arg_parser.add_argument("--scalar-rows", type=int, default=100_000,
+                            help="rows evaluated by the scalar loop (the rest is extrapolated)")
+    arg_parser.add_argument("--expression", default="+ * x 2 / y 3")   # x * 2 + y / 3
+    args = arg_parser.parse_args(argv)
+
+    rng = np.random.default_rng(0)
+    columns = {"x": rng.integers(1, 1000, args.rows), "y": rng.integers(1, 1000, args.rows)}
+    program = compile_expression(args.expression)
+
+    start = time.perf_counter()
+    batch = evaluate_batch(program, columns)
+    batch_time = time.perf_counter() - start
+
+    scalar_rows = min(args.scalar_rows, args.rows)
+    xs = columns["x"][:scalar_rows].tolist()
+    ys = columns["y"][:scalar_rows].tolist()
+    start = time.perf_counter()
+    scalar = [program.run({"x": x, "y": y}) for x, y in zip(xs, ys)]
+    scalar_time = (time.perf_counter() - start) * args.rows / scalar_rows
+
+    assert np.allclose(batch[:scalar_rows], scalar)
+    print(f"rows                 : {args.rows}")
+    print(f"scalar (extrapolated): {scalar_time:.3f} s")
+    print(f"batch                : {batch_time:.3f} s")
+    print(f"speedup              : {scalar_time / batch_time:.1f}x")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,120 @@
+import argparse
+import sys
+
+from components.batch import WRITERS, evaluate_lines, evaluate_parallel, read_lines
+from components.diagnostics import BulkParser
+from components.engine import MODES, Engine
+from components.numeric import BACKENDS
+from components.profiling import profiler
+from components.program import Program
+from components.streaming import evaluate_statements, read_statements
+
+    # -------------------------------------------
+    #   Headless entry point.
+    #
+    #   Streams expressions (one per line) from files or stdin through the calculator
+    #   engine and writes one result record per line as NDJSON or CSV. Lines are read,
+    #   evaluated and written one at a time, so memory stays flat for any input size.
+    #   `--workers N` spreads the input over N processes (output order is kept).
+    #   `--program` reads the input as one script of `name = expression` definitions
+    #   instead, right-hand sides in `--mode` prefix or infix (see components/program.py).
+    #   Infix input is tokenized in `--chunk-bytes` blocks (see components/streaming.py).
+    #   `--diagnostics FILE` keeps going past malformed lines and writes a JSON report of
+    #   every lexical, syntax and evaluation error (see components/diagnostics.py).
+    #   PyQt6 is only imported for `--gui`.
+    #
+    #   Run from `compiler-starter-project/`:
+    #       echo "+ 3 * 4 5" | python -m cli
+    #       python -m cli --mode infix --format csv expressions.txt
+    #       python -m cli --numeric decimal --precision 50 expressions.txt
+    # -------------------------------------------
+
+def run_gui() -> int:
+    # Qt is only needed here; headless runs never import it
+    from PyQt6.QtWidgets import QApplication
+    from main import MainWindow
+
+    app = QApplication(sys.argv[:1])
+    window = MainWindow()
+    window.show()
+    return app.exec()
+
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    arg_parser = argparse.ArgumentParser(prog="python -m cli", description="Evaluate expressions line by line.")
+    arg_parser.add_argument("files", nargs="*", help="input files, '-' or nothing for stdin")
+    arg_parser.add_argument("--mode", choices=MODES, default="prefix", help="notation of the input lines")
+    arg_parser.add_argument("--program", action="store_true",
+                            help="evaluate the input as one script of 'name = expression' definitions (prefix or infix --mode)")
+    arg_parser.add_argument("--numeric", choices=tuple(BACKENDS), default="float", help="numeric backend")
+    arg_parser.add_argument("--precision", type=int, default=None, help="significant digits for --numeric decimal")
+    arg_parser.add_argument("--format", choices=tuple(WRITERS), default="ndjson", help="output format")
+    arg_parser.add_argument("--output", "-o", default="-", help="output file, '-' for stdout")
+    arg_parser.add_argument("--workers", "-j", type=int, default=1, help="worker processes, 0 for one per core; infix input runs in one process "
+                                 "from its first assignment on, so results never depend on the split")
+    arg_parser.add_argument("--chunk-bytes", type=int, default=1 << 20, help="input bytes per parallel / streamed chunk")
+    arg_parser.add_argument("--diagnostics", default=None, metavar="FILE",
+                            help="write a JSON report of every bad line (infix or prefix, one worker)")
+    arg_parser.add_argument("--profile", choices=("time", "alloc"), default=None,
+                            help="print per-stage statistics (Prometheus text) to stderr at the end")
+    arg_parser.add_argument("--gui", action="store_true", help="open the PyQt6 calculator instead")
+    return arg_parser
+
+
+def main(argv=None) -> int:
+    arg_parser = build_arg_parser()
+    args = arg_parser.parse_args(argv)
+    if args.gui:
+        return run_gui()
+    if args.diagnostics and (args.program or args.mode == "postfix" or args.workers != 1):
+        arg_parser.error("--diagnostics needs --mode infix or prefix, one worker and no --program")
+    if args.program and args.mode == "postfix":
+        arg_parser.error("--program needs --mode infix or prefix")
+
+    if args.profile:
+        profiler.enable(allocations=args.profile == "alloc")
+    output = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8", newline="")
+    try:
+        writer = WRITERS[args.format](output)
+        if args.program:
+            program = Program(mode=args.mode, backend=args.numeric, precision=args.precision)
+            try:
+                program.load(read_lines(args.files))
+            except ValueError as error:             # Syntax error or circular definition
+                print(error, file=sys.stderr)
+                return 1
+            for record in program.records():
+                writer.write(record)
+        elif args.diagnostics:
+            bulk = BulkParser(mode=args.mode, backend=args.numeric, precision=args.precision)
+            for record in bulk.evaluate_files(args.files, args.chunk_bytes):
+                writer.write(record)
+            with open(args.diagnostics, "w", encoding="utf-8") as report:
+                report.write(bulk.report.to_json(limit=len(bulk.report)))
+        elif args.workers == 1:
+            engine = Engine(mode=args.mode, backend=args.numeric, precision=args.precision)
+            if args.mode == "infix":
+                # Files are tokenized in mmap'd blocks and parsed straight from the tokens
+                records = evaluate_statements(engine, read_statements(args.files, args.chunk_bytes))
+            else:
+                records = evaluate_lines(engine, read_lines(args.files))
+            for record in records:
+                writer.write(record)
+        else:
+            for text in evaluate_parallel(args.files, args.mode, args.format, workers=args.workers or None,
+                                          chunk_bytes=args.chunk_bytes, backend=args.numeric, precision=args.precision):
+                output.write(text)
+    except BrokenPipeError:
+        # e.g. `python -m cli big.txt | head`
+        return 0
+    finally:
+        if output is not sys.stdout:
+            output.close()
+        if profiler.enabled:
+            # Only this process is measured, not --workers processes
+            sys.stderr.write(profiler.prometheus())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
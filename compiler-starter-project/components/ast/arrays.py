@@ -0,0 +1,273 @@
+from array import array
+
+from components.evaluator import parse_number, reduce_prefix
+from components.lexica import MyLexer
+from components.memory import UNBOUND, Memory, default_memory
+from components.numeric import Backend, get_backend
+from components.parsers import MyParser
+
+    # -------------------------------------------
+    #   Struct-of-arrays AST.
+    #
+    #   Nodes are rows of three parallel arrays instead of Python objects:
+    #
+    #       opcodes[i]   CONST, NAME, ADD, SUB, MUL, DIV or NEG        (1 byte)
+    #       left[i]      constant / name index, or the left child row  (8 bytes)
+    #       right[i]     right child row (-1 for leaves and NEG)       (8 bytes)
+    #
+    #   plus a constant pool and a name pool shared by all rows. Rows are appended
+    #   bottom-up, so every child row is smaller than its parent row: evaluation is one
+    #   forward loop over the rows, and no traversal needs recursion.
+    #
+    #   `ArrayAST.builder()` is a numeric Backend whose + - * / and NUMBER append rows,
+    #   so MyParser's own rule actions build the tree (see `parse_infix`).
+    # -------------------------------------------
+
+CONST, NAME, ADD, SUB, MUL, DIV, NEG = range(7)
+SYMBOLS = {ADD: '+', SUB: '-', MUL: '*', DIV: '/'}
+_OPCODES = {'+': ADD, '-': SUB, '*': MUL, '/': DIV}
+
+
+class ArrayAST:
+    __slots__ = ("opcodes", "left", "right", "constants", "names", "_constant_index", "_name_index", "root", "_bound")
+
+    def __init__(self) -> None:
+        self.opcodes:array = array('B')
+        self.left:array = array('q')
+        self.right:array = array('q')
+        self.constants:list = []            # Constant pool
+        self.names:list = []                # Variable name pool
+        self._constant_index:dict = {}      # (type, value) -> constant pool index
+        self._name_index:dict = {}          # name -> name pool index
+        self.root:int = -1                  # Row of the last complete expression
+        self._bound:tuple = None            # (memory, slot of every name in that memory)
+
+    # ------------------------ Building ------------------------ #
+
+    def _append(self, opcode:int, left:int, right:int) -> int:
+        self.opcodes.append(opcode)
+        self.left.append(left)
+        self.right.append(right)
+        self.root = len(self.opcodes) - 1
+        return self.root
+
+    def constant(self, value) -> int:
+        key = (type(value), value)
+        index = self._constant_index.get(key)
+        if index is None:
+            index = self._constant_index[key] = len(self.constants)
+            self.constants.append(value)
+        return self._append(CONST, index, -1)
+
+    def variable(self, name:str) -> int:
+        index = self._name_index.get(name)
+        if index is None:
+            index = self._name_index[name] = len(self.names)
+            self.names.append(name)
+        return self._append(NAME, index, -1)
+
+    def binary(self, opcode:int, left:int, right:int) -> int:
+        return self._append(opcode, left, right)
+
+    def negate(self, child:int) -> int:
+        return self._append(NEG, child, -1)
+
+    def builder(self) -> Backend:
+        """A numeric Backend that appends rows instead of computing, for MyParser rule actions (NAME included)."""
+        return Backend("ast", self.constant,
+                       lambda left, right: self._append(ADD, left, right),
+                       lambda left, right: self._append(SUB, left, right),
+                       lambda left, right: self._append(MUL, left, right),
+                       lambda left, right: self._append(DIV, left, right),
+                       self.negate, load=self.variable)
+
+    # ------------------------ Evaluation ------------------------ #
+
+    def evaluate(self, root:int = None, backend:Backend = None, bindings:dict = None, memory:Memory = None) -> object:
+        """
+        Evaluates rows 0..root in one forward pass (children always come before parents).
+        Names are read from `bindings` when given, otherwise from `memory`.
+        """
+        root = self.root if root is None else root
+        backend = get_backend(backend)
+        operations = backend.operations
+        neg = backend.neg
+        constants = self.constants if backend.number is None else [backend.number(value) for value in self.constants]
+        if self.names:
+            if bindings is None:
+                names = self.resolve(default_memory() if memory is None else memory)
+            else:
+                names = [bindings[name] for name in self.names]
+
+        opcodes, left, right = self.opcodes, self.left, self.right
+        values = [None] * (root + 1)
+        for row in range(root + 1):
+            opcode = opcodes[row]
+            if opcode == CONST:
+                values[row] = constants[left[row]]
+            elif opcode == NAME:
+                values[row] = names[left[row]]
+            elif opcode == NEG:
+                values[row] = neg(values[left[row]])
+            else:
+                values[row] = operations[opcode - ADD](values[left[row]], values[right[row]])
+        return values[root]
+
+    def resolve(self, memory:Memory) -> list:
+        """Current value of every name, by Memory slot (slots are looked up once per Memory scope)."""
+        bound = self._bound
+        if bound is None or bound[0] is not memory or len(bound[1]) != len(self.names):
+            bound = self._bound = (memory, [memory.slot(name) for name in self.names])
+        stored = memory.values
+        values = [stored[slot] for slot in bound[1]]
+        for position, value in enumerate(values):
+            if value is UNBOUND:
+                raise AssertionError(f"variable_name={self.names[position]!r} not exist in Memory")
+        return values
+
+    # ------------------------ Conversion ------------------------ #
+
+    def _leaf(self, row:int) -> str:
+        opcode = self.opcodes[row]
+        if opcode == CONST:
+            return str(self.constants[self.left[row]])
+        return self.names[self.left[row]]
+
+    def to_prefix(self, root:int = None) -> str:
+        """
+        Example:
+        Input: rows of "3 + 4 * 5"
+        Output: "+ 3 * 4 5"
+        """
+        output = []
+        stack = [self.root if root is None else root]
+        opcodes, left, right = self.opcodes, self.left, self.right
+        while stack:
+            row = stack.pop()
+            opcode = opcodes[row]
+            if opcode <= NAME:
+                output.append(self._leaf(row))
+            elif opcode == NEG:
+                if opcodes[left[row]] == CONST:
+                    output.append(f"-{self._leaf(left[row])}")      # Negative literal, like "-5"
+                else:
+                    output.append("-")                              # - 0 x
+                    output.append("0")
+                    stack.append(left[row])
+            else:
+                output.append(SYMBOLS[opcode])
+                stack.append(right[row])
+                stack.append(left[row])
+        return " ".join(output)
+
+    def to_postfix(self, root:int = None) -> str:
+        """
+        Example:
+        Input: rows of "3 + 4 * 5"
+        Output: "3 4 5 * +"
+        """
+        output = []
+        stack = [(self.root if root is None else root, False)]
+        opcodes, left, right = self.opcodes, self.left, self.right
+        while stack:
+            row, children_done = stack.pop()
+            opcode = opcodes[row]
+            if opcode <= NAME:
+                output.append(self._leaf(row))
+            elif opcode == NEG:
+                if opcodes[left[row]] == CONST:
+                    output.append(f"-{self._leaf(left[row])}")
+                elif children_done:
+                    output.append("-")
+                else:
+                    output.append("0")                              # 0 x -
+                    stack.append((row, True))
+                    stack.append((left[row], False))
+            elif children_done:
+                output.append(SYMBOLS[opcode])
+            else:
+                stack.append((row, True))
+                stack.append((right[row], False))
+                stack.append((left[row], False))
+        return " ".join(output)
+
+    def to_infix(self, root:int = None) -> str:
+        """
+        Fully parenthesized, like MyParser.prefix_to_infix.
+        Example:
+        Input: rows of "3 + 4 * 5"
+        Output: "(3 + (4 * 5))"
+        """
+        output = []
+        stack = [self.root if root is None else root]
+        opcodes, left, right = self.opcodes, self.left, self.right
+        while stack:
+            item = stack.pop()
+            if type(item) is str:               # Pending text: an operator or ')'
+                output.append(item)
+                continue
+            opcode = opcodes[item]
+            if opcode <= NAME:
+                output.append(self._leaf(item))
+            elif opcode == NEG:
+                if opcodes[left[item]] == CONST:
+                    output.append(f"-{self._leaf(left[item])}")
+                else:
+                    output.append("(-")
+                    stack.append(")")
+                    stack.append(left[item])
+            else:
+                output.append("(")
+                stack.append(")")
+                stack.append(right[item])
+                stack.append(f" {SYMBOLS[opcode]} ")
+                stack.append(left[item])
+        return "".join(output)
+
+    # ------------------------ Size ------------------------ #
+
+    def __len__(self) -> int:
+        return len(self.opcodes)
+
+    def nbytes(self) -> int:
+        """Bytes held by the row arrays (the pools are counted separately by the caller)."""
+        return sum(column.itemsize * len(column) for column in (self.opcodes, self.left, self.right))
+
+    def __repr__(self) -> str:
+        return f"ArrayAST({len(self)} rows, {len(self.constants)} constants, {len(self.names)} names)"
+
+
+def parse_infix(text:str, lexer:MyLexer = None) -> ArrayAST:
+    """
+    Parses an infix expression with MyParser straight into an ArrayAST.
+    Assignments are parsed for their expression; nothing is stored in Memory.
+    Example:
+    Input: "3 + 4 * 5"
+    Output: ArrayAST(5 rows, 3 constants, 0 names)
+    """
+    tree = ArrayAST()
+    parser = MyParser(memory=Memory(), backend=tree.builder())
+    parser.parse((lexer or MyLexer()).tokenize(text))
+    return tree
+
+
+def from_prefix(tokens) -> ArrayAST:
+    """Builds an ArrayAST from a prefix expression (string or token list), without a parser."""
+    if isinstance(tokens, str):
+        tokens = tokens.split()
+    tree = ArrayAST()
+    reduce_prefix(
+        tokens,
+        lambda token: tree.constant(parse_number(token)) if token.lstrip('-').isdigit() else tree.variable(token),
+        lambda op, left, right: tree.binary(_OPCODES[op], left, right),
+    )
+    return tree
+
+
+if __name__ == "__main__":
+    tree = parse_infix("3 + 4 * -(5 - x) / 6")
+    print(tree)
+    print(tree.to_prefix())
+    print(tree.to_infix())
+    print(tree.to_postfix())
+    print(tree.evaluate(bindings={"x": 2}), tree.evaluate(bindings={"x": 2}, backend="fraction"))
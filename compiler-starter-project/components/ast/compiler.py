@@ -0,0 +1,312 @@
+import operator
+from enum import IntEnum
+
+from components.ast.statement import Expression, Expression_math, Expression_number, Expression_variable, Operations
+from components.evaluator import reduce_prefix, tokenize_prefix
+from components.memory import UNBOUND, Memory, default_memory
+from components.numeric import Backend, get_backend
+
+    # -------------------------------------------
+    #   Expression compiler + stack VM.
+    #
+    #       - Lowers an Expression tree (or a prefix expression) into a flat list of
+    #         (opcode, argument) pairs with a constant pool and a variable name table.
+    #       - Constant + - * subtrees are folded at compile time when the target backend
+    #         keeps ints as they are (float, int, fraction): int arithmetic is exact, so
+    #         the result is the one run time would give. A rounding backend (decimal)
+    #         rounds every step, so nothing is folded for it. Division is always left to
+    #         run time, where the numeric backend decides what it means.
+    #       - Every subexpression gets a value number keyed on (operation, operand numbers),
+    #         so repeated subexpressions are computed once and reloaded from a temp slot.
+    #       - `CompiledExpression.run(bindings)` is a single loop over the instruction list.
+    #         The same program runs under any numeric backend (components/numeric.py).
+    # -------------------------------------------
+
+class Opcode(IntEnum):
+    CONST:int = 0           # push constants[arg]
+    LOAD:int = 1            # push the value of variable names[arg]
+    BINARY:int = 2          # pop right, replace top with BINARY_OPERATIONS[arg](top, right)
+    STORE_TEMP:int = 3      # copy top of stack into temps[arg] (the value stays on the stack)
+    LOAD_TEMP:int = 4       # push temps[arg]
+
+# Indexed by Operations.value
+BINARY_OPERATIONS = (operator.add, operator.sub, operator.mul, operator.truediv)
+BINARY_SYMBOLS = ('+', '-', '*', '/')
+
+_COMMUTATIVE = {Operations.PLUS.value, Operations.TIMES.value}
+
+
+class CompiledExpression:
+    def __init__(self, code:list, constants:list, names:list, n_temps:int, folded:bool = False) -> None:
+        self.code:list = code               # [(opcode, argument), ...]
+        self.constants:list = constants     # Constant pool
+        self.names:list = names             # Variable names, LOAD argument -> name
+        self.n_temps:int = n_temps          # Number of temp slots used by common subexpressions
+        self.folded:bool = folded           # Constants were folded with int arithmetic (see `exact_for`)
+        self._bound:tuple = None            # (memory, slot of every name in that memory)
+        self._converted:tuple = None        # (backend, constants converted by backend.number)
+
+    def slots(self, memory:Memory) -> list:
+        """Memory slot of every variable, looked up once per Memory scope."""
+        bound = self._bound
+        if bound is None or bound[0] is not memory:
+            bound = self._bound = (memory, [memory.slot(name) for name in self.names])
+        return bound[1]
+
+    def resolve(self, bindings:dict = None, memory:Memory = None) -> list:
+        """Current value of every variable, from `bindings` when given, otherwise by slot from Memory."""
+        if bindings is not None:
+            return [bindings[name] for name in self.names]
+        if memory is None:
+            memory = default_memory()
+        stored = memory.values
+        values = [stored[slot] for slot in self.slots(memory)]
+        for position, value in enumerate(values):
+            if value is UNBOUND:
+                raise AssertionError(f"variable_name={self.names[position]!r} not exist in Memory")
+        return values
+
+    def exact_for(self, backend:Backend) -> bool:
+        """False when constants were folded and `backend` rounds (a program compiled for it is needed)."""
+        return not self.folded or get_backend(backend).number is None
+
+    def constants_for(self, backend:Backend) -> list:
+        """The constant pool as values of `backend`, converted once per backend."""
+        if backend.number is None:
+            return self.constants
+        converted = self._converted
+        if converted is None or converted[0] is not backend:
+            converted = self._converted = (backend, [backend.number(constant) for constant in self.constants])
+        return converted[1]
+
+    def run(self, bindings:dict = None, memory:Memory = None, backend:Backend = None) -> object:
+        """
+        Evaluates the program. Variables are resolved once per run, from `bindings`
+        when given, otherwise from `memory` (the default scope when omitted).
+        `backend` picks the numeric backend (float semantics when omitted).
+        """
+        values = self.resolve(bindings, memory)
+
+        if backend is None:
+            constants = self.constants
+            binary = BINARY_OPERATIONS
+        else:
+            backend = get_backend(backend)
+            constants = self.constants_for(backend)
+            binary = backend.operations
+        temps = [None] * self.n_temps
+        stack = []
+        push = stack.append
+        pop = stack.pop
+
+        for op, arg in self.code:
+            if op == 2:             # BINARY
+                right = pop()
+                stack[-1] = binary[arg](stack[-1], right)
+            elif op == 0:           # CONST
+                push(constants[arg])
+            elif op == 1:           # LOAD
+                push(values[arg])
+            elif op == 4:           # LOAD_TEMP
+                push(temps[arg])
+            else:                   # STORE_TEMP
+                temps[arg] = stack[-1]
+        return stack[-1]
+
+    def __len__(self) -> int:
+        return len(self.code)
+
+    def __repr__(self) -> str:
+        string = ""
+        for position, (op, arg) in enumerate(self.code):
+            op = Opcode(op)
+            if op == Opcode.CONST:
+                detail = repr(self.constants[arg])
+            elif op == Opcode.LOAD:
+                detail = self.names[arg]
+            elif op == Opcode.BINARY:
+                detail = BINARY_SYMBOLS[arg]
+            else:
+                detail = f"t{arg}"
+            string += f"{position:>4} {op.name:<10} {detail}\n"
+        return string
+
+
+class Compiler:
+    """
+    Builds a value-numbered DAG of the expression and emits it as a CompiledExpression.
+    Nodes are tuples: (CONST, value), (LOAD, name) or (BINARY, operation, left, right),
+    where left/right are value numbers (indexes into `self.nodes`).
+    Constants are folded only for a backend that keeps ints (`backend.number` is None).
+    """
+    def __init__(self, backend:Backend = None, fold:bool = True) -> None:
+        self.nodes:list = []
+        self.numbers:dict = {}              # key -> value number
+        self.fold:bool = fold and get_backend(backend).number is None
+        self.folded:bool = False            # At least one subtree was folded
+
+    def _number(self, key:tuple, node:tuple) -> int:
+        number = self.numbers.get(key)
+        if number is None:
+            number = self.numbers[key] = len(self.nodes)
+            self.nodes.append(node)
+        return number
+
+    def constant(self, value) -> int:
+        # type() is part of the key so 1, 1.0 and True stay different constants
+        return self._number((Opcode.CONST, type(value), value), (Opcode.CONST, value))
+
+    def variable(self, name:str) -> int:
+        return self._number((Opcode.LOAD, name), (Opcode.LOAD, name))
+
+    def operation(self, operation:int, left:int, right:int) -> int:
+        left_node = self.nodes[left]
+        right_node = self.nodes[right]
+        # Constant folding of + - * (exact on ints, like the backends that keep ints). Division
+        # is backend-specific (float, exact, rounded) and may fail, so it stays for run time.
+        if (self.fold and left_node[0] == Opcode.CONST and right_node[0] == Opcode.CONST
+                and operation != Operations.DIVIDE.value):
+            self.folded = True
+            return self.constant(BINARY_OPERATIONS[operation](left_node[1], right_node[1]))
+        # a + b and b + a are the same subexpression
+        if operation in _COMMUTATIVE and right < left:
+            left, right = right, left
+        return self._number((Opcode.BINARY, operation, left, right), (Opcode.BINARY, operation, left, right))
+
+    def builder(self) -> Backend:
+        """
+        A numeric Backend whose + - * / and NUMBER / NAME number nodes instead of computing,
+        so MyParser's rule actions compile infix (like ArrayAST.builder). -x becomes -1 * x.
+        """
+        operation = self.operation
+        plus, minus, times, divide = (member.value for member in Operations)
+        return Backend("compiler", self.constant,
+                       lambda left, right: operation(plus, left, right),
+                       lambda left, right: operation(minus, left, right),
+                       lambda left, right: operation(times, left, right),
+                       lambda left, right: operation(divide, left, right),
+                       lambda child: operation(times, self.constant(-1), child), load=self.variable)
+
+    def lower(self, tree:Expression) -> int:
+        """
+        Numbers every node of an Expression tree (iteratively, so deep trees are fine).
+        A node shared by several parents (NodePool DAGs) is numbered once.
+        """
+        stack = [(tree, False)]
+        results = []
+        numbered = {}                       # id(Expression_math) -> value number
+        while stack:
+            node, children_done = stack.pop()
+            if isinstance(node, Expression_math):
+                number = numbered.get(id(node))
+                if number is not None:
+                    results.append(number)
+                elif children_done:
+                    right = results.pop()
+                    left = results.pop()
+                    numbered[id(node)] = self.operation(node.operation.value, left, right)
+                    results.append(numbered[id(node)])
+                else:
+                    stack.append((node, True))
+                    stack.append((node.parameter2, False))
+                    stack.append((node.parameter1, False))
+            elif isinstance(node, Expression_number):
+                results.append(self.constant(node.value))
+            elif isinstance(node, Expression_variable):
+                results.append(self.variable(node.name))
+            else:
+                raise TypeError(f"Cannot compile {node!r}")
+        return results[0]
+
+    def emit(self, root:int) -> CompiledExpression:
+        nodes = self.nodes
+
+        # Count how many parents use each reachable node. Children always have smaller
+        # value numbers than their parents, so one descending sweep is a topological order.
+        uses = [0] * (root + 1)
+        uses[root] = 1
+        for number in range(root, -1, -1):
+            node = nodes[number]
+            if uses[number] and node[0] == Opcode.BINARY:
+                uses[node[2]] += 1
+                uses[node[3]] += 1
+
+        code = []
+        constants = []
+        constant_index = {}
+        names = []
+        name_index = {}
+        temp_of = {}
+
+        stack = [(root, False)]
+        while stack:
+            number, children_done = stack.pop()
+            node = nodes[number]
+            kind = node[0]
+            if kind == Opcode.CONST:
+                key = (type(node[1]), node[1])
+                if key not in constant_index:
+                    constant_index[key] = len(constants)
+                    constants.append(node[1])
+                code.append((int(Opcode.CONST), constant_index[key]))
+            elif kind == Opcode.LOAD:
+                if node[1] not in name_index:
+                    name_index[node[1]] = len(names)
+                    names.append(node[1])
+                code.append((int(Opcode.LOAD), name_index[node[1]]))
+            elif number in temp_of:
+                code.append((int(Opcode.LOAD_TEMP), temp_of[number]))
+            elif not children_done:
+                stack.append((number, True))
+                stack.append((node[3], False))
+                stack.append((node[2], False))
+            else:
+                code.append((int(Opcode.BINARY), node[1]))
+                if uses[number] > 1:
+                    temp_of[number] = len(temp_of)
+                    code.append((int(Opcode.STORE_TEMP), temp_of[number]))
+
+        return CompiledExpression(code, constants, names, len(temp_of), self.folded)
+
+
+def _prefix_leaf(compiler:Compiler, token:str) -> int:
+    if token.lstrip('-').isdigit():
+        return compiler.constant(int(token))
+    if token.isidentifier():
+        return compiler.variable(token)
+    raise ValueError(f"❌ Invalid character in expression: {token}")
+
+
+_PREFIX_OPERATIONS = {symbol: index for index, symbol in enumerate(BINARY_SYMBOLS)}
+
+
+def compile_expression(source, backend:Backend = None, fold:bool = True) -> CompiledExpression:
+    """
+    Compiles an Expression tree, a prefix string or a prefix token list for `backend`
+    (float when omitted; the program also runs under the other int-keeping backends).
+    Prefix input is numbered straight from the token stream, without building a tree.
+    Example:
+    Input: "+ * x 2 * x 2"
+    Output: LOAD x, CONST 2, BINARY *, STORE_TEMP t0, LOAD_TEMP t0, BINARY +
+    """
+    compiler = Compiler(backend, fold)
+    if isinstance(source, Expression):
+        root = compiler.lower(source)
+    else:
+        tokens = tokenize_prefix(source) if isinstance(source, str) else source
+        root = reduce_prefix(
+            tokens,
+            lambda token: _prefix_leaf(compiler, token),
+            lambda op, left, right: compiler.operation(_PREFIX_OPERATIONS[op], left, right),
+        )
+    return compiler.emit(root)
+
+
+if __name__ == "__main__":
+    program = compile_expression("+ * + x 1 * 2 3 * + x 1 * 2 3")
+    print(program)
+    print(program.run({"x": 4}))
+    print(program.run({"x": 5}))
+    print(compile_expression("/ x 3").run({"x": 4}, backend="fraction"))
+    decimal = get_backend("decimal", precision=5)
+    print(compile_expression("- 100001 1", decimal).run({}, backend=decimal))
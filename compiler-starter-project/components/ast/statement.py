@@ -1,5 +1,25 @@
 from enum import Enum
 from abc import ABC, abstractmethod
+from itertools import count
+
+from components.memory import UNBOUND, Memory, default_memory
+from components.numeric import Backend
+from components.tracing import channel
+
+_trace = channel("ast")
+
+    # -------------------------------------------
+    #   Trees and DAGs.
+    #
+    #   Nodes built with NodePool are hash-consed: a node is keyed on its operation and
+    #   the ids of its children, so an equal subexpression is the same object and a tree
+    #   with repeated subtrees becomes a DAG.
+    #   `run()` walks the nodes iteratively in postorder and stamps every Expression_math
+    #   with the id of the current run; a node already stamped is skipped: each unique
+    #   subexpression is computed once per run, however many parents share it.
+    # -------------------------------------------
+
+_runs = count(1)                        # Run ids; a top-level run() takes the next one
 
 class Statement:
     """What is statement?
@@ -24,7 +44,7 @@ class Expression(ABC):
         pass
 
     @abstractmethod
-    def run(self) -> None:
+    def run(self, backend:Backend = None, epoch:int = None) -> None:
         pass
 
 class Expression_math(Expression):
@@ -33,22 +53,51 @@ class Expression_math(Expression):
         self.operation:Operations = operation
         self.parameter1:Expression = parameter1
         self.parameter2:Expression = parameter2
-        self.signature:str = ""
         self.value:int = None
+        self.epoch:int = 0              # Run that computed `value`
         # Checking Logic
         assert operation in Operations
 
         # Create a children
         self.children = [self.parameter1, self.parameter2]
-        
-    def run(self) -> None:
-        # evaluate child first
-        for child in self.children:
-            child.run()
-            # print(child)
-
-        # print(f"Calculating: {self.operation.name=} {self.parameter1=} {self.parameter2=}")
-        if(self.operation == Operations.PLUS):
+
+    @property
+    def signature(self) -> str:
+        # Built when asked for, not on every run
+        return f"Expression: {self.operation.name} {self.parameter1.value} {self.parameter2.value}"
+
+    def run(self, backend:Backend = None, epoch:int = None) -> None:
+        if epoch is None:
+            epoch = next(_runs)
+        elif self.epoch == epoch:
+            return                      # Shared node, already computed in this run
+        # Iterative postorder walk (children left to right, then the node), so deep trees
+        # cannot hit the recursion limit. A math node is stamped when it is pushed; a
+        # stamped node is either done or still below us on the stack, never needed twice
+        self.epoch = epoch
+        stack = [(self, False)]
+        while stack:
+            node, expanded = stack.pop()
+            if expanded:
+                node.compute(backend)
+                continue
+            if not isinstance(node, Expression_math):
+                node.run(backend, epoch)
+                continue
+            stack.append((node, True))
+            for child in reversed(node.children):
+                if isinstance(child, Expression_math):
+                    if child.epoch == epoch:
+                        continue
+                    child.epoch = epoch
+                stack.append((child, False))
+
+    def compute(self, backend:Backend = None) -> None:
+        # This node only; the children already hold their values
+        if backend is not None:
+            # Numeric backend (components/numeric.py) picks what the operation means
+            self.value = backend.operations[self.operation.value](self.parameter1.value, self.parameter2.value)
+        elif(self.operation == Operations.PLUS):
             self.value = self.parameter1.value + self.parameter2.value
         elif(self.operation == Operations.MINUS):
             self.value = self.parameter1.value - self.parameter2.value
@@ -58,28 +107,100 @@ class Expression_math(Expression):
             self.value = self.parameter1.value / self.parameter2.value
         else:
             raise ValueError(f"{self.operation=} is not support. Please use class Statement.Operations. Actually, this should not happen.")
-        
-        self.signature = f"Expression: {self.operation.name} {self.parameter1.value} {self.parameter2.value}"
-        print(self)
+
+        if _trace.level:
+            _trace.emit("node", operation=self.operation.name, operands=(self.parameter1.value, self.parameter2.value), value=self.value)
 
     def __repr__(self) -> str:
         return self.signature
 
 class Expression_number(Expression):
     def __init__(self, number:int) -> None:
+        self.number:int = number
         self.value:int = number
         self.signature:str= str(number)
         
-    def run(self) -> None:
-        print(self)
+    def run(self, backend:Backend = None, epoch:int = None) -> None:
+        self.value = self.number if backend is None or backend.number is None else backend.number(self.number)
+        if _trace.level:
+            _trace.emit("node", operation="NUMBER", value=self.value)
 
     def __repr__(self) -> str:
         return f"Expression_number:{self.signature}"
 
+class Expression_variable(Expression):
+    def __init__(self, name:str, memory:Memory = None) -> None:
+        self.name:str = name
+        self.value:int = None
+        self.signature:str = name
+        # Bound once to a slot of the Memory scope (the default scope when omitted),
+        # so `run` is a list read instead of a name lookup
+        self.memory:Memory = default_memory() if memory is None else memory
+        self.slot:int = self.memory.slot(name)
+
+    def run(self, backend:Backend = None, epoch:int = None) -> None:
+        value = self.memory.values[self.slot]
+        if value is UNBOUND:
+            raise AssertionError(f"variable_name={self.name!r} not exist in Memory")
+        self.value = value
+        if _trace.level:
+            _trace.emit("node", operation="NAME", name=self.name, value=self.value)
+
+    def __repr__(self) -> str:
+        return f"Expression_variable:{self.signature}"
+
+class NodePool:
+    """
+    Interning constructors for AST nodes. Equal subexpressions come back as the same node.
+    Example:
+    Input: pool.math(Operations.PLUS, pool.number(2), pool.number(2))
+    Output: Expression_math whose parameter1 and parameter2 are one Expression_number(2)
+    """
+    __slots__ = ("memory", "nodes")
+
+    def __init__(self, memory:Memory = None) -> None:
+        self.memory:Memory = memory         # Scope the variables bind to
+        # key -> node. Keeping every node alive is what makes child ids safe to use in keys
+        self.nodes:dict = {}
+
+    def number(self, number:int) -> Expression_number:
+        # type() is part of the key so 1, 1.0 and True stay different nodes
+        key = ("NUMBER", type(number), number)
+        node = self.nodes.get(key)
+        if node is None:
+            node = self.nodes[key] = Expression_number(number=number)
+        return node
+
+    def variable(self, name:str) -> Expression_variable:
+        key = ("NAME", name)
+        node = self.nodes.get(key)
+        if node is None:
+            node = self.nodes[key] = Expression_variable(name, self.memory)
+        return node
+
+    def math(self, operation:Operations, parameter1:Expression, parameter2:Expression) -> Expression_math:
+        key = (operation, id(parameter1), id(parameter2))
+        node = self.nodes.get(key)
+        if node is None:
+            node = self.nodes[key] = Expression_math(operation, parameter1=parameter1, parameter2=parameter2)
+        return node
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+
 if __name__ == "__main__":
+    from components.tracing import enable
+    enable("ast")
     number1 = Expression_number(number=8)
     number2 = Expression_number(number=9)
     expr = Expression_math(Operations.MINUS, parameter1=number1, parameter2=number2)
     expr.run()
     # print(expr.hshow())
-    print(expr.value)
\ No newline at end of file
+    print(expr.value)
+
+    pool = NodePool()
+    shared = pool.math(Operations.TIMES, pool.number(3), pool.number(4))
+    expr = pool.math(Operations.PLUS, shared, pool.math(Operations.TIMES, pool.number(3), pool.number(4)))
+    expr.run()
+    print(expr.value, expr.parameter1 is expr.parameter2, len(pool))
\ No newline at end of file
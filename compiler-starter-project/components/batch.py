@@ -0,0 +1,196 @@
+import csv
+import io
+import json
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from components.engine import EVALUATION_ERRORS, Engine
+
+    # -------------------------------------------
+    #   Batch evaluation: line streams, record writers and a process pool.
+    #
+    #       - `read_lines` / `evaluate_lines` stream one expression per line.
+    #       - `NDJSONWriter` / `CSVWriter` turn records into output lines.
+    #       - `evaluate_parallel` splits input files into byte ranges (cut at line ends)
+    #         and evaluates them in worker processes. Every worker has its own Engine,
+    #         so its own lexer, parser, cache and Memory. Workers return formatted
+    #         output, and chunks are written back in input order.
+    #
+    #   Parallel evaluation never changes results. Chunks are independent only while no
+    #   line has assigned anything (a worker unbinds its Memory and clears its cache before
+    #   every chunk), so the first infix chunk containing an assignment ends the parallel
+    #   part: the pending chunks are written, and that chunk and everything after it are
+    #   evaluated in this process, on one Engine, exactly as with one worker.
+    # -------------------------------------------
+
+CSV_FIELDS = ["line", "input", "result", "error"]
+
+
+def clean_lines(numbered_lines):
+    """Strips lines and drops blank lines and # comments."""
+    for number, line in numbered_lines:
+        line = line.strip()
+        if line and not line.startswith("#"):
+            yield number, line
+
+
+def read_lines(paths:list):
+    """Yields (line number, expression) pairs from files, '-' meaning stdin."""
+    for path in paths or ["-"]:
+        file = sys.stdin if path == "-" else open(path, encoding="utf-8")
+        try:
+            yield from clean_lines(enumerate(file, start=1))
+        finally:
+            if file is not sys.stdin:
+                file.close()
+
+
+def evaluate_lines(engine:Engine, lines):
+    """Yields one record per line; bad lines become records with an `error` instead of stopping the stream."""
+    for number, line in lines:
+        try:
+            yield {"line": number, "input": line, "result": engine.evaluate(line), "error": None}
+        except EVALUATION_ERRORS as error:
+            yield {"line": number, "input": line, "result": None, "error": str(error) or type(error).__name__}
+
+
+class NDJSONWriter:
+    def __init__(self, stream, header:bool = True) -> None:
+        self.stream = stream
+
+    def write(self, record:dict) -> None:
+        # default=str keeps non-JSON numbers (e.g. Fraction, Decimal) readable
+        self.stream.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+
+
+class CSVWriter:
+    def __init__(self, stream, header:bool = True) -> None:
+        self.writer = csv.DictWriter(stream, fieldnames=CSV_FIELDS, lineterminator="\n")
+        if header:
+            self.writer.writeheader()
+
+    def write(self, record:dict) -> None:
+        self.writer.writerow(record)
+
+
+WRITERS = {"ndjson": NDJSONWriter, "csv": CSVWriter}
+
+
+# ------------------------ Parallel evaluation ------------------------ #
+
+def plan_chunks(path:str, chunk_bytes:int):
+    """
+    Splits a file into byte ranges of about `chunk_bytes`, each ending at a line end.
+    Yields (path, start, end, first line number). The file is read once, sequentially,
+    only to find the cut points and count lines; the text is not kept.
+    """
+    with open(path, "rb") as file:
+        start = 0
+        first_line = 1
+        while True:
+            block = file.read(chunk_bytes)
+            if not block:
+                break
+            if not block.endswith(b"\n"):
+                block += file.readline()        # Finish the line that straddles the cut
+            end = start + len(block)
+            yield path, start, end, first_line
+            first_line += block.count(b"\n")
+            start = end
+
+
+_worker_engine:Engine = None
+_worker_format:str = None
+
+
+def _init_worker(mode:str, output_format:str, backend:str = None, precision:int = None) -> None:
+    # Runs once per worker process: a private Engine (lexer, parser, cache, Memory)
+    global _worker_engine, _worker_format
+    _worker_engine = Engine(mode=mode, backend=backend, precision=precision)
+    _worker_format = output_format
+
+
+def _evaluate_numbered(numbered_lines, engine:Engine = None, output_format:str = None) -> str:
+    if engine is None:
+        # Worker: nothing from an earlier chunk on this worker may be visible to this one
+        engine = _worker_engine
+        engine.memory.reset()
+        engine.cache.clear()
+    buffer = io.StringIO()
+    writer = WRITERS[output_format or _worker_format](buffer, header=False)
+    for record in evaluate_lines(engine, clean_lines(numbered_lines)):
+        writer.write(record)
+    return buffer.getvalue()
+
+
+def _read_range(path:str, start:int, end:int) -> str:
+    with open(path, "rb") as file:
+        file.seek(start)
+        return file.read(end - start).decode("utf-8")
+
+
+def _evaluate_range(path:str, start:int, end:int, first_line:int, engine:Engine = None, output_format:str = None) -> str:
+    text = _read_range(path, start, end)
+    # Only "\n" ends a line, as in plan_chunks (str.splitlines also cuts at \r, \f, ...)
+    return _evaluate_numbered(enumerate(text.split("\n"), start=first_line), engine, output_format)
+
+
+def _evaluate_batch(numbered_lines:list, engine:Engine = None, output_format:str = None) -> str:
+    return _evaluate_numbered(numbered_lines, engine, output_format)
+
+
+def _assigns(function, arguments:tuple) -> bool:
+    # Whether an infix chunk may contain an assignment ('=' only appears in ASSIGN)
+    if function is _evaluate_batch:
+        return any("=" in line for _, line in arguments[0])
+    path, start, end, _ = arguments
+    return "=" in _read_range(path, start, end)
+
+
+def _stdin_batches(batch_lines:int):
+    batch = []
+    for number, line in enumerate(sys.stdin, start=1):
+        batch.append((number, line))
+        if len(batch) >= batch_lines:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def evaluate_parallel(paths:list, mode:str = "prefix", output_format:str = "ndjson", workers:int = None,
+                      chunk_bytes:int = 1 << 20, batch_lines:int = 10_000, backend:str = None, precision:int = None):
+    """
+    Evaluates files (or stdin) on a process pool and yields formatted output text, one
+    string per chunk, in input order. At most 2 chunks per worker are in flight, so memory
+    stays bounded however large the input is. `backend` is a numeric backend name
+    (components/numeric.py), so it can be sent to the workers.
+    From the first infix chunk with an assignment on, chunks run here, in order, on one
+    Engine, so the output is the same as with a single worker.
+    """
+    workers = workers or os.cpu_count() or 1
+    max_pending = workers * 2
+    pending = deque()
+    sequential = None                       # Engine of the in-process run, once an assignment was seen
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(mode, output_format, backend, precision)) as pool:
+        for path in paths or ["-"]:
+            if path == "-":
+                jobs = ((_evaluate_batch, batch) for batch in _stdin_batches(batch_lines))
+            else:
+                jobs = ((_evaluate_range, *chunk) for chunk in plan_chunks(path, chunk_bytes))
+            for function, *arguments in jobs:
+                if sequential is None and mode == "infix" and _assigns(function, arguments):
+                    while pending:
+                        yield pending.popleft().result()
+                    sequential = Engine(mode=mode, backend=backend, precision=precision)
+                if sequential is not None:
+                    yield function(*arguments, engine=sequential, output_format=output_format)
+                    continue
+                pending.append(pool.submit(function, *arguments))
+                if len(pending) >= max_pending:
+                    yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
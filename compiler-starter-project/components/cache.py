@@ -0,0 +1,166 @@
+import sys
+from collections import OrderedDict
+
+from components.ast.compiler import CompiledExpression, compile_expression
+from components.memory import Memory, default_memory
+from components.numeric import Backend, get_backend
+from components.parsers import MyParser
+
+    # -------------------------------------------
+    #   LRU cache for prefix expressions.
+    #
+    #       - Keyed on whitespace-normalized source ("+  1   2" and "+ 1 2" share an entry).
+    #       - Each entry keeps the token list and compiled program, and fills in the infix,
+    #         postfix and result on first use.
+    #       - Bounded by entry count and by estimated bytes; least recently used entries go first.
+    #       - A cached result remembers the Memory version of every variable it read and is
+    #         recomputed when one of them changes.
+    #       - Results are cached for the cache's numeric backend; evaluating under another
+    #         backend reuses the compiled program but not the result (a program with folded
+    #         constants is recompiled for a rounding backend, see CompiledExpression.exact_for).
+    # -------------------------------------------
+
+class CacheEntry:
+    __slots__ = ("key", "tokens", "program", "infix", "postfix", "result", "versions", "size")
+
+    def __init__(self, key:str, tokens:list, program:CompiledExpression) -> None:
+        self.key:str = key                  # Normalized source
+        self.tokens:list = tokens
+        self.program:CompiledExpression = program
+        self.infix:str = None
+        self.postfix:str = None
+        self.result:object = None
+        self.versions:tuple = None          # Memory versions of program.names when `result` was computed
+        self.size:int = 0
+
+
+class CacheStats:
+    __slots__ = ("hits", "misses", "evictions", "invalidations")
+
+    def __init__(self) -> None:
+        self.hits:int = 0
+        self.misses:int = 0
+        self.evictions:int = 0
+        self.invalidations:int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def __repr__(self) -> str:
+        return (f"CacheStats(hits={self.hits}, misses={self.misses}, evictions={self.evictions}, "
+                f"invalidations={self.invalidations}, hit_rate={self.hit_rate:.2%})")
+
+
+def normalize(source:str) -> str:
+    """
+    Collapses all whitespace runs into a single space.
+    Example:
+    Input: "  +  3\t4 "
+    Output: "+ 3 4"
+    """
+    return " ".join(source.split())
+
+
+def _estimate_size(entry:CacheEntry) -> int:
+    # Rough byte count: strings and lists exactly, instructions/constants/result by getsizeof
+    size = sys.getsizeof(entry.key) + sys.getsizeof(entry.tokens) + sum(sys.getsizeof(token) for token in entry.tokens)
+    program = entry.program
+    size += sys.getsizeof(program.code) + len(program.code) * 64
+    size += sum(sys.getsizeof(constant) for constant in program.constants)
+    if entry.infix is not None:
+        size += sys.getsizeof(entry.infix)
+    if entry.postfix is not None:
+        size += sys.getsizeof(entry.postfix)
+    if entry.versions is not None:
+        # A big int, Fraction or Decimal result can outweigh the rest of the entry
+        size += sys.getsizeof(entry.result) + sys.getsizeof(entry.versions)
+    return size
+
+
+class ExpressionCache:
+    def __init__(self, max_entries:int = 1024, max_bytes:int = 32 * 1024 * 1024, memory:Memory = None,
+                 backend:Backend = None) -> None:
+        self.max_entries:int = max_entries
+        self.max_bytes:int = max_bytes
+        self.entries:OrderedDict = OrderedDict()
+        self.bytes:int = 0
+        self.stats:CacheStats = CacheStats()
+        self.memory:Memory = default_memory() if memory is None else memory
+        self.backend:Backend = get_backend(backend)
+        self.parser:MyParser = MyParser(memory=self.memory, backend=self.backend)
+
+    def entry(self, source:str) -> CacheEntry:
+        """Returns the cache entry of a prefix expression, tokenizing and compiling it on a miss."""
+        key = normalize(source)
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.stats.hits += 1
+            self.entries.move_to_end(key)
+            return entry
+
+        self.stats.misses += 1
+        tokens = key.split()
+        entry = CacheEntry(key, tokens, compile_expression(tokens, self.backend))  # Raises ValueError on bad input
+        self.entries[key] = entry
+        self._resize(entry)
+        return entry
+
+    def infix(self, source:str) -> str:
+        entry = self.entry(source)
+        if entry.infix is None:
+            entry.infix = self.parser.prefix_to_infix(entry.tokens)
+            self._resize(entry)
+        return entry.infix
+
+    def postfix(self, source:str) -> str:
+        entry = self.entry(source)
+        if entry.postfix is None:
+            entry.postfix = self.parser.prefix_to_postfix(entry.tokens)
+            self._resize(entry)
+        return entry.postfix
+
+    def evaluate(self, source:str, backend:Backend = None) -> object:
+        entry = self.entry(source)
+        if backend is not None and get_backend(backend) is not self.backend:
+            program = entry.program if entry.program.exact_for(backend) else compile_expression(entry.tokens, backend)
+            return program.run(memory=self.memory, backend=backend)
+        memory_versions = self.memory.versions
+        versions = tuple(memory_versions[slot] for slot in entry.program.slots(self.memory))
+        if entry.versions != versions:
+            if entry.versions is not None:
+                self.stats.invalidations += 1
+            entry.result = entry.program.run(memory=self.memory, backend=self.backend)
+            entry.versions = versions
+            self._resize(entry)
+        return entry.result
+
+    def clear(self) -> None:
+        self.entries.clear()
+        self.bytes = 0
+
+    def _resize(self, entry:CacheEntry) -> None:
+        # Re-account the entry, then evict from the least recently used end
+        self.bytes -= entry.size
+        entry.size = _estimate_size(entry)
+        self.bytes += entry.size
+        while len(self.entries) > 1 and (len(self.entries) > self.max_entries or self.bytes > self.max_bytes):
+            _, evicted = self.entries.popitem(last=False)
+            self.bytes -= evicted.size
+            self.stats.evictions += 1
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __repr__(self) -> str:
+        return f"ExpressionCache({len(self.entries)}/{self.max_entries} entries, {self.bytes}/{self.max_bytes} bytes, {self.stats})"
+
+
+if __name__ == "__main__":
+    cache = ExpressionCache(max_entries=2)
+    print(cache.evaluate("+ 3 * 4 5"), cache.infix("+  3 * 4   5"))
+    print(cache.evaluate("* x 2") if cache.memory.version("x") else "x not bound yet")
+    cache.memory.set(variable_name="x", value=21, data_type=int)
+    print(cache.evaluate("* x 2"))
+    print(cache)
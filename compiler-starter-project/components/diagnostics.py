@@ -0,0 +1,306 @@
+import json
+import re
+from array import array
+from typing import NamedTuple
+
+from components.engine import EVALUATION_ERRORS, MODES
+from components.evaluator import OPERATORS, load_variable, parse_number, reduce_prefix
+from components.memory import Memory
+from components.numeric import Backend, get_backend
+from components.parsers import MyParser
+from components.streaming import Statement, read_statements, stream_statements
+
+    # -------------------------------------------
+    #   Error-recovering bulk parsing.
+    #
+    #   BulkParser evaluates a stream of statements (components/streaming.py) and never
+    #   stops or prints on bad input. Every problem becomes a Diagnostic:
+    #
+    #       line, column    1-based, column in bytes from the start of the line
+    #       kind            lexical (illegal character), syntax, or evaluation
+    #       token           the offending token ('' at the end of the line)
+    #       expected        the terminals the parser would have accepted there
+    #
+    #   Recovery is at statement boundaries: the first syntax error ends its statement
+    #   (MyParser.error is overridden on the instance and raises), and the next line starts
+    #   from a fresh parser state. A line with illegal characters is reported and skipped
+    #   without being parsed, so it cannot assign anything.
+    #   For infix, the expected set is read from the LALR action table of the state the
+    #   parser was in, and cached per state.
+    #
+    #   Diagnostics are kept column-wise in a DiagnosticReport (a few arrays per batch);
+    #   messages are only formatted when the report is read.
+    # -------------------------------------------
+
+LEXICAL, SYNTAX, EVALUATION = range(3)
+KINDS = ("lexical", "syntax", "evaluation")
+
+END = "$end"
+# Grammar terminals as they are shown in messages
+_DISPLAY = {END: "end of line", "NUMBER": "number", "NAME": "name", "+": "'+'", "MINUS": "'-'", "TIMES": "'*'",
+            "DIVIDE": "'/'", "LPAREN": "'('", "RPAREN": "')'", "ASSIGN": "'='"}
+
+# Expected sets of the prefix reader
+_PREFIX_START = ("OPERATOR",)
+_PREFIX_OPERAND = ("NUMBER", "NAME", "OPERATOR")
+_PREFIX_DONE = (END,)
+_DISPLAY["OPERATOR"] = "operator"
+
+# Order of the terminals in an expected set: operands, operators, brackets, end
+_ORDER = {terminal: position for position, terminal in enumerate(
+    ("NUMBER", "NAME", "OPERATOR", "+", "MINUS", "TIMES", "DIVIDE", "LPAREN", "RPAREN", "ASSIGN", END))}
+
+_PREFIX_TOKEN = re.compile(rb'\S+')
+
+
+class Diagnostic(NamedTuple):
+    line:int
+    column:int
+    kind:str
+    token:str
+    expected:tuple
+
+    @property
+    def message(self) -> str:
+        if self.kind == "evaluation":
+            return f"❌ Line {self.line}: {self.token}"
+        if self.kind == "lexical":
+            return f"❌ Line {self.line}, column {self.column}: illegal character {self.token!r}"
+        found = f"token {self.token!r}" if self.token else "end of line"
+        expected = ", ".join(_DISPLAY.get(terminal, terminal) for terminal in self.expected)
+        return f"❌ Line {self.line}, column {self.column}: unexpected {found}, expected {expected}"
+
+    def as_dict(self) -> dict:
+        return {"line": self.line, "column": self.column, "kind": self.kind, "token": self.token,
+                "expected": list(self.expected), "message": self.message}
+
+
+class DiagnosticReport:
+    __slots__ = ("statements", "failed", "lines", "columns", "kinds", "texts", "expected", "_expected_sets", "_expected_index")
+
+    def __init__(self) -> None:
+        self.statements:int = 0             # Statements read
+        self.failed:int = 0                 # Statements with at least one diagnostic
+        self.lines:array = array('I')
+        self.columns:array = array('I')
+        self.kinds:array = array('B')
+        self.texts:list = []                # Token, or the error text of an evaluation diagnostic
+        self.expected:array = array('H')    # Index into _expected_sets
+        self._expected_sets:list = [()]     # Distinct expected sets (most errors share a few)
+        self._expected_index:dict = {(): 0}
+
+    def add(self, line:int, column:int, kind:int, text:str, expected:tuple = ()) -> None:
+        index = self._expected_index.get(expected)
+        if index is None:
+            index = self._expected_index[expected] = len(self._expected_sets)
+            self._expected_sets.append(expected)
+        self.lines.append(line)
+        self.columns.append(column)
+        self.kinds.append(kind)
+        self.texts.append(text)
+        self.expected.append(index)
+
+    def __len__(self) -> int:
+        return len(self.kinds)
+
+    def __getitem__(self, position:int) -> Diagnostic:
+        return Diagnostic(self.lines[position], self.columns[position], KINDS[self.kinds[position]],
+                          self.texts[position], self._expected_sets[self.expected[position]])
+
+    def __iter__(self):
+        for position in range(len(self.kinds)):
+            yield self[position]
+
+    def counts(self) -> dict:
+        return {kind: self.kinds.count(code) for code, kind in enumerate(KINDS)}
+
+    def as_dict(self, limit:int = 100) -> dict:
+        """Summary plus the first `limit` diagnostics."""
+        return {
+            "statements": self.statements,
+            "failed": self.failed,
+            "diagnostics": len(self),
+            "by_kind": self.counts(),
+            "first": [self[position].as_dict() for position in range(min(limit, len(self)))],
+        }
+
+    def to_json(self, limit:int = 100) -> str:
+        return json.dumps(self.as_dict(limit), ensure_ascii=False)
+
+    def __repr__(self) -> str:
+        return f"DiagnosticReport({self.statements} statements, {self.failed} failed, {self.counts()})"
+
+
+class _StatementFailed(Exception):
+    # Ends the current statement; the diagnostic is already in the report
+    def __init__(self, message:str) -> None:
+        super().__init__(message)
+
+
+class BulkParser:
+    def __init__(self, mode:str = "infix", memory:Memory = None, backend:Backend = None, precision:int = None) -> None:
+        if mode not in ("infix", "prefix"):
+            raise ValueError(f"{mode=} must be one of {MODES[:2]}")
+        self.mode:str = mode
+        self.memory:Memory = Memory() if memory is None else memory
+        self.backend:Backend = get_backend(backend, precision)
+        self.parser:MyParser = MyParser(memory=self.memory, backend=self.backend)
+        self.parser.error = self._syntax_error          # Instance attribute shadows SLY's printing handler
+        self.report:DiagnosticReport = DiagnosticReport()
+        self._statement:Statement = None
+        self._expected_by_state:dict = {}
+
+    def take_report(self) -> DiagnosticReport:
+        """Returns the report of the batch so far and starts a new one."""
+        report, self.report = self.report, DiagnosticReport()
+        return report
+
+    # ------------------------ Statements ------------------------ #
+
+    def evaluate(self, statements):
+        """
+        Yields one record per statement, shaped like components.batch records; bad
+        statements get `result` None and the message of their first diagnostic.
+        """
+        evaluate_one = self._infix if self.mode == "infix" else self._prefix
+        for statement in statements:
+            if statement.text.lstrip().startswith(b"#"):
+                continue
+            report = self.report
+            report.statements += 1
+            text = statement.text.decode(errors="replace").strip()
+            try:
+                if statement.errors:
+                    self._lexical_errors(statement)
+                result = evaluate_one(statement)
+            except _StatementFailed as failure:
+                report.failed += 1
+                yield {"line": statement.lineno, "input": text, "result": None, "error": str(failure)}
+                continue
+            except EVALUATION_ERRORS as error:
+                message = (str(error) or type(error).__name__).removeprefix("❌ ")
+                report.add(statement.lineno, 1, EVALUATION, message)
+                report.failed += 1
+                yield {"line": statement.lineno, "input": text, "result": None, "error": f"❌ Line {statement.lineno}: {message}"}
+                continue
+            yield {"line": statement.lineno, "input": text, "result": result, "error": None}
+
+    def evaluate_text(self, data:bytes):
+        """Records of an in-memory script (bytes or str)."""
+        if isinstance(data, str):
+            data = data.encode()
+        return self.evaluate(stream_statements([data], with_tokens=self.mode == "infix"))
+
+    def evaluate_files(self, paths:list, chunk_bytes:int = 1 << 16):
+        return self.evaluate(read_statements(paths, chunk_bytes, with_tokens=self.mode == "infix"))
+
+    def _lexical_errors(self, statement:Statement) -> None:
+        text = statement.text
+        for offset in statement.errors:
+            column = offset - statement.index
+            character = text[column:column + 1].decode(errors="replace")
+            self.report.add(statement.lineno, column + 1, LEXICAL, character)
+        first = self.report[len(self.report) - len(statement.errors)]
+        raise _StatementFailed(first.message)
+
+    # ------------------------ Infix ------------------------ #
+
+    def _infix(self, statement:Statement) -> object:
+        self._statement = statement
+        return self.parser.parse(iter(statement.tokens))
+
+    def _syntax_error(self, token) -> None:
+        statement = self._statement
+        state = self.parser.state
+        expected = self._expected_by_state.get(state)
+        if expected is None:
+            actions = self.parser._lrtable.lr_action[state]
+            terminals = [terminal for terminal in actions if terminal != "error"]
+            expected = self._expected_by_state[state] = tuple(sorted(terminals, key=lambda terminal: _ORDER.get(terminal, len(_ORDER))))
+        if token is None:
+            column = len(statement.text.rstrip()) + 1
+            text = ""
+        else:
+            column = token.index - statement.index + 1
+            text = str(token.value)
+        self.report.add(statement.lineno, column, SYNTAX, text, expected)
+        raise _StatementFailed(self.report[len(self.report) - 1].message)
+
+    # ------------------------ Prefix ------------------------ #
+
+    def _prefix(self, statement:Statement) -> object:
+        # evaluator.reduce_prefix does the fold. Only when it fails is the line scanned
+        # again, to find where the syntax error is (and whether there is one at all)
+        symbols = self.backend.symbols
+        number = self.backend.number
+        memory = self.memory
+
+        def operand(token:str) -> object:
+            if token.isidentifier():
+                return load_variable(memory, token)
+            if token.lstrip('-').isdigit():
+                return parse_number(token) if number is None else number(parse_number(token))
+            raise ValueError(token)
+
+        # Lines with illegal characters never get here, so these tokens line up with _PREFIX_TOKEN matches
+        tokens = statement.text.decode(errors="replace").split()
+        try:
+            return reduce_prefix(tokens, operand, lambda op, left, right: symbols[op](left, right))
+        except ValueError:
+            position, expected = _prefix_syntax(tokens)
+            if expected is None:
+                raise                       # Well-formed: arithmetic failed (e.g. "int" division)
+            if position is None:
+                self._prefix_error(statement, None, expected)
+            matches = _PREFIX_TOKEN.finditer(statement.text)
+            for _ in range(position + 1):
+                match = next(matches)
+            self._prefix_error(statement, match, expected)
+
+    def _prefix_error(self, statement:Statement, match, expected:tuple) -> None:
+        if match is None:
+            column, text = len(statement.text.rstrip()) + 1, ""
+        else:
+            column, text = match.start() + 1, match.group().decode(errors="replace")
+        self.report.add(statement.lineno, column, SYNTAX, text, expected)
+        raise _StatementFailed(self.report[len(self.report) - 1].message)
+
+
+def _prefix_syntax(tokens:list) -> tuple:
+    """
+    Where a prefix line first goes wrong: (token index, expected), (None, expected) at
+    the end of the line, or (None, None) when it is well-formed.
+    Example:
+    Input: ["+", "1", "2", "3"]
+    Output: (3, ("$end",))
+    """
+    if not tokens:
+        return None, _PREFIX_START
+    pending = 1                             # Operands still needed to complete the expression
+    for index, token in enumerate(tokens):
+        if not pending:
+            return index, _PREFIX_DONE
+        if token in OPERATORS:
+            pending += 1
+        elif not index:
+            return index, _PREFIX_START
+        elif token.isidentifier() or token.lstrip('-').isdigit():
+            pending -= 1
+        else:
+            return index, _PREFIX_OPERAND
+    if pending:
+        return None, _PREFIX_OPERAND
+    return None, None
+
+
+if __name__ == "__main__":
+    bulk = BulkParser()
+    script = "x = 4\n3 + * 2\n(1 + 2\ny = 2 $ 3\nx / 0\nx * (2 + 3)\n"
+    for record in bulk.evaluate_text(script):
+        print(record)
+    print(bulk.report)
+    print(bulk.report.to_json(limit=2))
+
+    bulk = BulkParser(mode="prefix")
+    for record in bulk.evaluate_text("+ 1 2\n1 + 2\n+ 1\n+ 1 2 3\n* 2 ?\n"):
+        print(record)
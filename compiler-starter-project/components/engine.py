@@ -0,0 +1,107 @@
+from components.cache import ExpressionCache
+from components.evaluator import OPERATORS, evaluate_postfix
+from components.lexica import MyLexer
+from components.memory import Memory
+from components.numeric import Backend, get_backend
+from components.parsers import MyParser
+from components.profiling import profiler
+
+    # -------------------------------------------
+    #   Headless calculator engine.
+    #
+    #   Owns one lexer, one parser and one expression cache, and evaluates a single line
+    #   in prefix, infix or postfix notation. No Qt import anywhere on this path.
+    #   Each Engine is a session with its own Memory scope unless one is passed in, and
+    #   its own numeric backend (float, int, fraction, decimal), which a single
+    #   `evaluate` call may override.
+    #   Bad input raises instead of printing, so callers can report it per line.
+    #   With components.profiling enabled, every stage of `evaluate` is timed.
+    # -------------------------------------------
+
+MODES = ("prefix", "infix", "postfix")
+
+# Exceptions that mean "this line is bad", not "the engine is broken"
+EVALUATION_ERRORS = (ValueError, ArithmeticError, AssertionError, KeyError)
+
+
+class Engine:
+    def __init__(self, mode:str = "prefix", memory:Memory = None, backend:Backend = None, precision:int = None) -> None:
+        if mode not in MODES:
+            raise ValueError(f"{mode=} must be one of {MODES}")
+        self.mode:str = mode
+        self.memory:Memory = Memory() if memory is None else memory
+        self.backend:Backend = get_backend(backend, precision)
+        self.lexer:MyLexer = MyLexer()
+        self.parser:MyParser = MyParser(memory=self.memory, backend=self.backend)
+        self.cache:ExpressionCache = ExpressionCache(memory=self.memory, backend=self.backend)
+
+        # SLY prints lexing/syntax errors and keeps going; for one-line evaluation we want
+        # them as exceptions. Instance attributes shadow the class methods SLY calls.
+        self.lexer.error = self._lexer_error
+        self.parser.error = self._syntax_error
+
+    def evaluate(self, text:str, mode:str = None, backend:Backend = None) -> object:
+        """Evaluates one expression. Infix assignments (x = 1 + 2) return None."""
+        mode = mode or self.mode
+        if profiler.enabled:
+            return self._evaluate_profiled(text, mode, backend)
+        if mode == "prefix":
+            return self.cache.evaluate(text, backend)
+        if mode == "infix":
+            return self._parse(self.lexer.tokenize(text), backend)
+        if mode == "postfix":
+            return evaluate_postfix(text, backend or self.backend, self.memory)
+        raise ValueError(f"{mode=} must be one of {MODES}")
+
+    def _parse(self, tokens, backend:Backend = None) -> object:
+        if backend is None or get_backend(backend) is self.backend:
+            return self.parser.parse(tokens)
+        numeric = self.parser.numeric
+        self.parser.numeric = get_backend(backend)
+        try:
+            return self.parser.parse(tokens)
+        finally:
+            self.parser.numeric = numeric
+
+    def _evaluate_profiled(self, text:str, mode:str, backend:Backend) -> object:
+        # Same as `evaluate`, split into stages. Infix tokens are materialized so that
+        # lexing and parsing are timed separately (normally the parser pulls them lazily).
+        if mode == "infix":
+            with profiler.stage("infix.tokenize") as stage:
+                tokens = list(self.lexer.tokenize(text))
+                stage.tokens = len(tokens)
+            with profiler.stage("infix.parse") as stage:
+                reductions = self.parser.reductions
+                try:
+                    return self._parse(iter(tokens), backend)
+                finally:
+                    stage.tokens = len(tokens)
+                    stage.reductions = self.parser.reductions - reductions
+        with profiler.stage(f"{mode}.evaluate") as stage:
+            tokens = text.split()
+            stage.tokens = len(tokens)
+            # Every operator of a prefix / postfix expression is one reduction
+            stage.reductions = sum(1 for token in tokens if token in OPERATORS)
+            if mode == "prefix":
+                return self.cache.evaluate(text, backend)
+            if mode == "postfix":
+                return evaluate_postfix(tokens, backend or self.backend, self.memory)
+            raise ValueError(f"{mode=} must be one of {MODES}")
+
+    def _lexer_error(self, token):
+        raise ValueError(f"❌ Illegal character '{token.value[0]}' at index {token.index}")
+
+    def _syntax_error(self, token):
+        if token is None:
+            raise ValueError("❌ Unexpected end of input")
+        raise ValueError(f"❌ Syntax error at index {token.index}, unexpected token {token.type}")
+
+
+if __name__ == "__main__":
+    engine = Engine()
+    print(engine.evaluate("+ 3 * 4 5"))
+    print(engine.evaluate("3 + 4 * 5", mode="infix"))
+    print(engine.evaluate("3 4 5 * +", mode="postfix"))
+    print(engine.evaluate("/ 1 3", backend="fraction"))
+    engine.evaluate("x = 6 * 7", mode="infix")
+    print(engine.evaluate("x / 2", mode="infix"), engine.evaluate("- x 2"), engine.evaluate("x 2 *", mode="postfix"))
@@ -0,0 +1,199 @@
+import operator
+
+from components.ast.statement import Expression, Expression_math, Expression_number, Expression_variable, NodePool, Operations
+from components.memory import UNBOUND, Memory, default_memory
+from components.numeric import Backend, get_backend
+
+    # -------------------------------------------
+    #   Direct prefix evaluator.
+    #
+    #       - Reads a prefix token stream from left to right in a single pass.
+    #       - Produces either the final value or an AST (Expression_math / Expression_number)
+    #         without going through prefix -> infix -> MyLexer -> MyParser.
+    #       - Accepts any iterable of tokens, so it also works on generators.
+    #       - `evaluate_postfix` does the same for postfix input.
+    #       - Both take an optional numeric backend (see components/numeric.py).
+    #       - Operands are numbers or variable names. Every distinct operand is converted or
+    #         resolved (by Memory slot) once per evaluation, then reused for each occurrence.
+    # -------------------------------------------
+
+OPERATORS = {                           # Prefix operator symbol -> Python implementation
+    '+': operator.add,
+    '-': operator.sub,
+    '*': operator.mul,
+    '/': operator.truediv,              # Same semantics as MyParser's DIVIDE rule
+}
+
+OPERATIONS = {                          # Prefix operator symbol -> AST operation
+    '+': Operations.PLUS,
+    '-': Operations.MINUS,
+    '*': Operations.TIMES,
+    '/': Operations.DIVIDE,
+}
+
+_MISSING = object()                     # Marks an operator that is still waiting for its left operand
+
+
+def tokenize_prefix(expression:str) -> list:
+    """
+    Splits a prefix expression into tokens.
+    Example:
+    Input: "+ 3 * 4 5"
+    Output: ['+', '3', '*', '4', '5']
+    """
+    return expression.split()
+
+
+def parse_number(token:str) -> int:
+    # Accept the same operands as MyParser.prefix_to_infix (digits, optionally negative)
+    if token.lstrip('-').isdigit():
+        return int(token)
+    raise ValueError(f"❌ Invalid character in expression: {token}")
+
+
+def reduce_prefix(tokens, number, combine):
+    """
+    Folds a prefix token stream with the given `number(token)` and `combine(op, left, right)` callbacks.
+
+    Every operator opens a frame [op, left]. An operand either fills the left slot of the
+    top frame or completes it, in which case the frame is combined and the result keeps
+    bubbling up. Each token is touched once, so the whole pass is O(n).
+    """
+    stack = []                          # Open operator frames: [op, left]
+    result = _MISSING
+    count = 0
+
+    for token in tokens:
+        count += 1
+        if result is not _MISSING:
+            raise ValueError(f"❌ Invalid prefix expression (unexpected token '{token}' after a complete expression)")
+
+        if token in OPERATORS:
+            stack.append([token, _MISSING])
+            continue
+
+        if count == 1:
+            raise ValueError(f"❌ Prefix expression must start with an operator: {token}")
+
+        value = number(token)
+        while stack:
+            frame = stack[-1]
+            if frame[1] is _MISSING:
+                frame[1] = value
+                break
+            stack.pop()
+            value = combine(frame[0], frame[1], value)
+        else:
+            result = value
+
+    if count == 0:
+        raise ValueError("❌ Prefix expression is empty")
+    if stack:
+        raise ValueError(f"❌ Invalid prefix expression (Operator '{stack[-1][0]}' has fewer than 2 operands)")
+    return result
+
+
+def _number_parser(backend:Backend):
+    if backend.number is None:
+        return parse_number
+    convert = backend.number
+    return lambda token: convert(parse_number(token))
+
+
+def load_variable(memory:Memory, name:str) -> object:
+    """Current value of a variable, read by slot. Raises AssertionError when it is not bound."""
+    slot = memory.index.get(name)
+    value = UNBOUND if slot is None else memory.values[slot]
+    if value is UNBOUND:
+        raise AssertionError(f"variable_name={name!r} not exist in Memory")
+    return value
+
+
+def _operand_reader(number, memory:Memory):
+    # token -> value, memoized for one evaluation: a repeated literal or name costs one dict lookup
+    values = {}
+
+    def read(token):
+        value = values.get(token, _MISSING)
+        if value is _MISSING:
+            if token.isidentifier():
+                value = load_variable(default_memory() if memory is None else memory, token)
+            else:
+                value = number(token)
+            values[token] = value
+        return value
+    return read
+
+
+def evaluate_prefix(tokens, backend:Backend = None, memory:Memory = None):
+    """
+    Evaluates a prefix expression straight into a number.
+    Variables are read from `memory` (the default scope when omitted).
+    Example:
+    Input: ['+', '3', '*', '4', '5']
+    Output: 23
+    """
+    if isinstance(tokens, str):
+        tokens = tokenize_prefix(tokens)
+    operators = OPERATORS if backend is None else get_backend(backend).symbols
+    number = parse_number if backend is None else _number_parser(get_backend(backend))
+    return reduce_prefix(tokens, _operand_reader(number, memory), lambda op, left, right: operators[op](left, right))
+
+
+def prefix_to_ast(tokens, memory:Memory = None, pool:NodePool = None) -> Expression:
+    """
+    Builds an AST from a prefix expression. Variables are bound to their slot in `memory`.
+    With a NodePool, repeated subexpressions become one shared node (a DAG); the pool's
+    own memory is used then.
+    Example:
+    Input: "- 8 9"
+    Output: Expression_math(Operations.MINUS, Expression_number(8), Expression_number(9))
+    """
+    if isinstance(tokens, str):
+        tokens = tokenize_prefix(tokens)
+    if pool is not None:
+        return reduce_prefix(
+            tokens,
+            lambda token: pool.variable(token) if token.isidentifier() else pool.number(parse_number(token)),
+            lambda op, left, right: pool.math(OPERATIONS[op], left, right),
+        )
+    return reduce_prefix(
+        tokens,
+        lambda token: Expression_variable(token, memory) if token.isidentifier() else Expression_number(number=parse_number(token)),
+        lambda op, left, right: Expression_math(OPERATIONS[op], parameter1=left, parameter2=right),
+    )
+
+
+def evaluate_postfix(tokens, backend:Backend = None, memory:Memory = None):
+    """
+    Evaluates a postfix expression straight into a number.
+    Variables are read from `memory` (the default scope when omitted).
+    Example:
+    Input: ['3', '4', '5', '*', '+']
+    Output: 23
+    """
+    if isinstance(tokens, str):
+        tokens = tokens.split()
+    operators = OPERATORS if backend is None else get_backend(backend).symbols
+    number = _operand_reader(parse_number if backend is None else _number_parser(get_backend(backend)), memory)
+    stack = []
+    for token in tokens:
+        if token in operators:
+            if len(stack) < 2:
+                raise ValueError(f"❌ Invalid postfix expression (Operator '{token}' has fewer than 2 operands)")
+            right = stack.pop()
+            stack[-1] = operators[token](stack[-1], right)
+        else:
+            stack.append(number(token))
+    if len(stack) != 1:
+        raise ValueError(f"❌ Invalid postfix expression ({len(stack)} values left on the stack)")
+    return stack[0]
+
+
+if __name__ == "__main__":
+    print(evaluate_prefix("+ 3 * 4 5"))
+    print(evaluate_postfix("3 4 5 * +"))
+    print(evaluate_prefix("/ 1 3", backend="fraction"))
+    tree = prefix_to_ast("- 8 9")
+    tree.run()
+    print(tree.value)
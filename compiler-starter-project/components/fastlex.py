@@ -0,0 +1,161 @@
+import re
+from array import array
+from bisect import bisect_right
+
+import sly
+
+    # -------------------------------------------
+    #   Table-driven lexer backend.
+    #
+    #   Produces the same token types as MyLexer (NAME, NUMBER, ASSIGN, MINUS, TIMES,
+    #   DIVIDE, LPAREN, RPAREN, '+') without a Python callback or a Token object per token:
+    #
+    #       - the input is a bytes-like buffer (str is UTF-8 encoded first, so offsets are
+    #         byte offsets; they equal character offsets for ASCII input)
+    #       - a 256-entry character-class table decides what starts at each position,
+    #         NUMBER and NAME runs are measured with one regex match each
+    #       - tokens are stored as parallel arrays: type codes, start/end offsets and
+    #         int64 values (NUMBERs that do not fit are kept in a side dict)
+    #       - newline offsets are recorded so line numbers can be computed on demand
+    #       - illegal characters are skipped (like MyLexer.error) and their offsets collected
+    # -------------------------------------------
+
+# Token type codes, TOKEN_TYPES[code] is the SLY token type
+NAME, NUMBER, ASSIGN, MINUS, TIMES, DIVIDE, LPAREN, RPAREN, PLUS = range(9)
+TOKEN_TYPES = ('NAME', 'NUMBER', 'ASSIGN', 'MINUS', 'TIMES', 'DIVIDE', 'LPAREN', 'RPAREN', '+')
+
+# Character classes
+_OTHER, _SPACE, _NEWLINE, _DIGIT, _ALPHA, _SINGLE = range(6)
+
+CHAR_CLASS = bytearray([_OTHER]) * 256
+SINGLE_TOKEN = bytearray([255]) * 256       # byte -> token code of a one-character token
+for _byte in b' \t\r':                       # \r: CRLF line ends
+    CHAR_CLASS[_byte] = _SPACE
+CHAR_CLASS[ord('\n')] = _NEWLINE
+for _byte in b'0123456789':
+    CHAR_CLASS[_byte] = _DIGIT
+for _byte in b'abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ_':
+    CHAR_CLASS[_byte] = _ALPHA
+for _char, _code in (('=', ASSIGN), ('-', MINUS), ('*', TIMES), ('/', DIVIDE), ('(', LPAREN), (')', RPAREN), ('+', PLUS)):
+    CHAR_CLASS[ord(_char)] = _SINGLE
+    SINGLE_TOKEN[ord(_char)] = _code
+
+_NUMBER_RUN = re.compile(rb'[0-9]+')
+_NAME_RUN = re.compile(rb'[a-zA-Z_][a-zA-Z0-9_]*')
+_INT64_MAX = (1 << 63) - 1
+
+
+class TokenArrays:
+    """Tokens of one buffer as parallel arrays (index i is the i-th token)."""
+    __slots__ = ("source", "types", "starts", "ends", "values", "big_values", "newlines", "errors", "first_lineno")
+
+    def __init__(self, source, first_lineno:int = 1) -> None:
+        self.source = source                    # The scanned buffer
+        self.types:array = array('B')           # Token type codes
+        self.starts:array = array('q')          # Start offsets
+        self.ends:array = array('q')            # End offsets (exclusive)
+        self.values:array = array('q')          # NUMBER values (0 for other tokens)
+        self.big_values:dict = {}               # token index -> NUMBER value that does not fit in int64
+        self.newlines:array = array('q')        # Offsets of every newline
+        self.errors:list = []                   # Offsets of illegal characters
+        self.first_lineno:int = first_lineno
+
+    def __len__(self) -> int:
+        return len(self.types)
+
+    def type(self, i:int) -> str:
+        return TOKEN_TYPES[self.types[i]]
+
+    def text(self, i:int) -> str:
+        return bytes(self.source[self.starts[i]:self.ends[i]]).decode()
+
+    def value(self, i:int):
+        """Token value as MyLexer would produce it: int for NUMBER, the text otherwise."""
+        code = self.types[i]
+        if code == NUMBER:
+            return self.big_values.get(i, self.values[i])
+        return self.text(i)
+
+    def lineno(self, i:int) -> int:
+        return self.first_lineno + bisect_right(self.newlines, self.starts[i])
+
+    def sly_tokens(self):
+        """Yields sly Token objects, so the arrays can be fed to MyParser.parse."""
+        for i in range(len(self.types)):
+            token = sly.lex.Token()
+            token.type = TOKEN_TYPES[self.types[i]]
+            token.value = self.value(i)
+            token.lineno = self.lineno(i)
+            token.index = self.starts[i]
+            token.end = self.ends[i]
+            yield token
+
+
+def tokenize_fast(data, lineno:int = 1) -> TokenArrays:
+    """
+    Scans a str / bytes / bytearray / memoryview buffer into TokenArrays.
+    Example:
+    Input: "x = 12 + 3"
+    Output: types NAME ASSIGN NUMBER + NUMBER, values 0 0 12 0 3
+    """
+    if isinstance(data, str):
+        data = data.encode()
+    tokens = TokenArrays(data, lineno)
+
+    # Local names keep attribute lookups out of the loop
+    char_class = CHAR_CLASS
+    single_token = SINGLE_TOKEN
+    number_run = _NUMBER_RUN.match
+    name_run = _NAME_RUN.match
+    types_append = tokens.types.append
+    starts_append = tokens.starts.append
+    ends_append = tokens.ends.append
+    values_append = tokens.values.append
+    newlines_append = tokens.newlines.append
+    big_values = tokens.big_values
+
+    index = 0
+    length = len(data)
+    while index < length:
+        byte = data[index]
+        kind = char_class[byte]
+        if kind == _SPACE:
+            index += 1
+        elif kind == _SINGLE:
+            types_append(single_token[byte])
+            starts_append(index)
+            index += 1
+            ends_append(index)
+            values_append(0)
+        elif kind == _DIGIT:
+            end = number_run(data, index).end()
+            value = int(data[index:end])
+            if value > _INT64_MAX:
+                big_values[len(tokens.types)] = value
+                value = 0
+            types_append(NUMBER)
+            starts_append(index)
+            ends_append(end)
+            values_append(value)
+            index = end
+        elif kind == _ALPHA:
+            end = name_run(data, index).end()
+            types_append(NAME)
+            starts_append(index)
+            ends_append(end)
+            values_append(0)
+            index = end
+        elif kind == _NEWLINE:
+            newlines_append(index)
+            index += 1
+        else:
+            tokens.errors.append(index)
+            index += 1
+    return tokens
+
+
+if __name__ == "__main__":
+    tokens = tokenize_fast("x1 + 1as! * ()\ny = 99999999999999999999")
+    for i in range(len(tokens)):
+        print(tokens.type(i), repr(tokens.value(i)), tokens.lineno(i), tokens.starts[i], tokens.ends[i])
+    print("errors at", tokens.errors)
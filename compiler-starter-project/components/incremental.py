@@ -0,0 +1,229 @@
+import re
+import time
+from bisect import bisect_right
+
+from components.evaluator import OPERATORS, load_variable, parse_number
+from components.memory import Memory, default_memory
+
+    # -------------------------------------------
+    #   Incremental prefix evaluation for the calculator UI.
+    #
+    #   The input changes a few characters at a time, so instead of re-reading it on
+    #   every change we keep, for every token, the parser state *before* that token:
+    #
+    #       - the open operator frames, as an immutable linked list (op, left, parent),
+    #         so a saved state is just a reference and is never copied
+    #       - the result (once the expression is complete) or the first error
+    #       - how many infix fragments had been produced ('(', operands, ' op ', ')')
+    #
+    #   `update(text)` finds the first token the edit touched, rewinds to the state saved
+    #   before it and only re-reads the tokens after that point. Typing at the end or
+    #   deleting the last characters therefore costs O(changed tokens), not O(n).
+    #   Variable names are read from Memory; when one of them is rebound, the next
+    #   update also rewinds to the first token that read it.
+    #
+    #   `update` can be given a Budget (cancellation callback, time limit, token limit),
+    #   checked every CHECK_EVERY tokens. An interrupted update keeps what it has read, as
+    #   if the text ended there, so the next update resumes instead of starting over.
+    # -------------------------------------------
+
+_MISSING = object()                     # Left operand of a frame that has not been read yet
+
+CHECK_EVERY = 1024                      # Tokens read between two Budget checks
+
+_TOKEN = re.compile(r'\S+')
+
+
+# A saved state: (top frame, result, error, number of infix fragments)
+_EMPTY = (None, _MISSING, None, 0)
+
+
+class Budget:
+    """
+    When `update` has to stop early: `cancelled()` returned True (e.g. the input changed
+    again), `seconds` elapsed, or more than `tokens` tokens were read. `reason` says which.
+    """
+    __slots__ = ("cancelled", "deadline", "tokens", "reason")
+
+    def __init__(self, cancelled = None, seconds:float = None, tokens:int = None) -> None:
+        self.cancelled = cancelled
+        self.deadline:float = None if seconds is None else time.monotonic() + seconds
+        self.tokens:int = tokens
+        self.reason:str = None
+
+    def exhausted(self, read:int) -> bool:
+        if self.cancelled is not None and self.cancelled():
+            self.reason = "cancelled"
+        elif self.deadline is not None and time.monotonic() > self.deadline:
+            self.reason = "timeout"
+        elif self.tokens is not None and read > self.tokens:
+            self.reason = "token budget"
+        return self.reason is not None
+
+
+class IncrementalPrefix:
+    def __init__(self, memory:Memory = None) -> None:
+        self.memory:Memory = default_memory() if memory is None else memory
+        self.reset()
+
+    def reset(self) -> None:
+        self.text:str = ""
+        self.tokens:list = []               # Token strings
+        self.starts:list = []               # Offset of every token in `text`
+        self.states:list = [_EMPTY]         # states[i] = state before tokens[i]; states[-1] = current state
+        self.fragments:list = []            # Infix output so far, in pieces
+        self.reads:list = []                # (token index, Memory slot, version) of every variable read
+
+    # ------------------------ Results ------------------------ #
+
+    @property
+    def complete(self) -> bool:
+        return self.states[-1][1] is not _MISSING and self.states[-1][2] is None
+
+    @property
+    def result(self) -> object:
+        """Value of the expression, None while it is incomplete or invalid."""
+        return self.states[-1][1] if self.complete else None
+
+    @property
+    def error(self) -> str:
+        return self.states[-1][2]
+
+    @property
+    def infix(self) -> str:
+        """Infix form of everything read so far (open parentheses stay open while incomplete)."""
+        return ''.join(self.fragments)
+
+    def infix_prefix(self, limit:int) -> str:
+        """
+        The first `limit` characters of `infix`, followed by '…' when there is more.
+        Joins only the fragments it shows, so the cost does not grow with the input.
+        """
+        pieces = []
+        size = 0
+        for fragment in self.fragments:
+            pieces.append(fragment)
+            size += len(fragment)
+            if size > limit:
+                return ''.join(pieces)[:limit] + "…"
+        return ''.join(pieces)
+
+    # ------------------------ Editing ------------------------ #
+
+    def update(self, text:str, budget:Budget = None) -> bool:
+        """
+        Brings the state up to date with the new input text.
+        Returns False when `budget` stopped it early (see Budget.reason).
+        Example:
+        Input: "+ 3 4" then "+ 3 45"
+        Output: only the token "4" is rewound and "45" is read, result 48
+        """
+        old = self.text
+        if text.startswith(old):
+            changed = len(old)
+        elif old.startswith(text):
+            changed = len(text)
+        else:
+            changed = 0
+            for changed, (a, b) in enumerate(zip(old, text)):
+                if a != b:
+                    break
+            else:
+                changed = min(len(old), len(text))
+
+        # First token that ends at or after the change (a token touched at its end may grow)
+        first = bisect_right(self.starts, changed)
+        if first and self.starts[first - 1] + len(self.tokens[first - 1]) >= changed:
+            first -= 1
+        # A variable rebound since it was read invalidates every state after it
+        versions = self.memory.versions
+        for index, slot, version in self.reads:
+            if index >= first:
+                break
+            if versions[slot] != version:
+                first = index
+                break
+        self._rewind(first)
+
+        position = self.starts[first - 1] + len(self.tokens[first - 1]) if first else 0
+        self.text = text
+        if budget is None:
+            for token, start in _split(text, position):
+                self._read(token, start)
+            return True
+
+        read = 0
+        for token, start in _split(text, position):
+            self._read(token, start)
+            read += 1
+            # Stopping only makes sense while tokens remain
+            if read % CHECK_EVERY == 0 and _TOKEN.search(text, start + len(token)) and budget.exhausted(read):
+                # Keep the tokens read so far, as if the text ended after the last one
+                self.text = text[:start + len(token)]
+                return False
+        return True
+
+    def _rewind(self, count:int) -> None:
+        # Drops tokens[count:] and restores the state saved before tokens[count]
+        del self.tokens[count:]
+        del self.starts[count:]
+        reads = self.reads
+        while reads and reads[-1][0] >= count:
+            reads.pop()
+        del self.states[count + 1:]
+        del self.fragments[self.states[-1][3]:]
+
+    def _read(self, token:str, start:int) -> None:
+        top, result, error, n_fragments = self.states[-1]
+        fragments = self.fragments
+
+        if error is not None:
+            pass                                # The first error sticks until it is edited away
+        elif result is not _MISSING:
+            error = f"❌ Invalid prefix expression (unexpected token '{token}' after a complete expression)"
+        elif token in OPERATORS:
+            top = (token, _MISSING, top)
+            fragments.append('(')
+        elif not self.tokens:
+            error = f"❌ Prefix expression must start with an operator: {token}"
+        else:
+            try:
+                if token.isidentifier():
+                    memory = self.memory
+                    slot = memory.slot(token)
+                    self.reads.append((len(self.tokens), slot, memory.versions[slot]))
+                    value = load_variable(memory, token)
+                else:
+                    value = parse_number(token)
+                fragments.append(token)
+                # Same fold as reduce_prefix, on immutable frames
+                while top is not None:
+                    op, left, parent = top
+                    if left is _MISSING:
+                        top = (op, value, parent)
+                        fragments.append(f" {op} ")
+                        break
+                    value = OPERATORS[op](left, value)
+                    fragments.append(')')
+                    top = parent
+                else:
+                    result = value
+            except (ValueError, ZeroDivisionError, AssertionError) as exception:
+                error = str(exception)
+
+        self.tokens.append(token)
+        self.starts.append(start)
+        self.states.append((top, result, error, len(fragments)))
+
+
+def _split(text:str, position:int):
+    # Yields (token, offset) for the whitespace separated tokens of text[position:]
+    for match in _TOKEN.finditer(text, position):
+        yield match.group(), match.start()
+
+
+if __name__ == "__main__":
+    live = IncrementalPrefix()
+    for text in ["+", "+ 3", "+ 3 * ", "+ 3 * 4", "+ 3 * 4 5", "+ 3 * 4 56", "+ 3 * 4 5", "+ 3 * 4 5 6", "- 1 2"]:
+        live.update(text)
+        print(f"{text!r:16} infix={live.infix!r:22} result={live.result!r:6} error={live.error}")
@@ -1,6 +1,10 @@
 from sly import Lexer
 import sly
 
+from components.tracing import channel
+
+_trace = channel("lexer")
+
 class MyLexer(Lexer):
     """
     MyLexer is a class that inherits from sly.Lexer
@@ -34,8 +38,6 @@ class MyLexer(Lexer):
     def NUMBER(self, token):
         # Note that this function set parse token.value to integer
         token.value = int(token.value)
-        # Extra print for debug
-        print(f"==== Print from NUMBER function: {token.type=} | {token.value=} | {type(token.value)=}")
         return token
 
     # Try uncomment this and run to see the differences between `token` and `literal`
@@ -53,6 +55,18 @@ class MyLexer(Lexer):
         # https://sly.readthedocs.io/en/latest/sly.html#line-numbers-and-position-tracking
         self.lineno += t.value.count('\n')
 
+    def tokenize(self, text, lineno=1, index=0):
+        tokens = super().tokenize(text, lineno, index)
+        # Only wrap the generator when tracing is on, so the normal path stays untouched
+        if _trace.level:
+            return self._traced(tokens)
+        return tokens
+
+    def _traced(self, tokens):
+        for token in tokens:
+            _trace.emit("token", type=token.type, value=token.value, lineno=token.lineno, index=token.index)
+            yield token
+
     def error(self, t):
         self.index += 1
         print(f"ERROR: Illegal character '{t.value[0]}' at line {self.lineno}")
@@ -1,40 +1,127 @@
-def singleton(cls):
-    instances = {}
-    def getinstance(*args, **kwargs):
-        if cls not in instances:
-            instances[cls] = cls(*args, **kwargs)
-        return instances[cls]
-    return getinstance
-
-@singleton
+import threading
+
+    # -------------------------------------------
+    #   Variable storage.
+    #
+    #       - Every `Memory()` is an independent scope (one per session / engine / worker).
+    #         `default_memory()` is the process-wide scope the GUI uses.
+    #       - Names are interned into slot numbers once; values, data types and versions
+    #         live in parallel lists indexed by slot. Slots are never reused, so a slot
+    #         number stays valid for the life of the scope and compiled code can keep it.
+    #       - Reads take no lock (plain list indexing). Writes take the scope's lock, and a
+    #         new slot is published in the name index only after its lists are filled.
+    # -------------------------------------------
+
+class _Unbound:
+    def __repr__(self) -> str:
+        return "UNBOUND"
+
+UNBOUND = _Unbound()                    # Value of a slot that has no binding (yet / any more)
+
+
 class Memory:
+    __slots__ = ("index", "names", "values", "data_types", "versions", "_lock")
 
     def __init__(self) -> None:
-        self.memory:dict = dict({})
-    
+        self.index:dict = dict({})      # variable name -> slot
+        self.names:list = []            # slot -> variable name
+        self.values:list = []           # slot -> value (UNBOUND when not set)
+        self.data_types:list = []       # slot -> data type
+        self.versions:list = []         # slot -> number of times it was set or cleared
+        self._lock = threading.Lock()
+
+    def slot(self, variable_name:str) -> int:
+        """Returns the slot of a name, reserving an unbound slot the first time it is seen."""
+        slot = self.index.get(variable_name)
+        if slot is None:
+            with self._lock:
+                slot = self.index.get(variable_name)
+                if slot is None:
+                    slot = len(self.names)
+                    self.names.append(variable_name)
+                    self.values.append(UNBOUND)
+                    self.data_types.append(None)
+                    self.versions.append(0)
+                    self.index[variable_name] = slot
+        return slot
+
     def get(self, variable_name:str) -> object:
-        assert variable_name in self.memory, f"{variable_name=} not exist in Memory"
-        return self.memory[variable_name]
-    
-    def set(self, variable_name:str, value:object, data_type:str):
-        # I decide to crash when variable name is exist in the memory
-        assert variable_name not in self.memory
-        self.memory[variable_name] = {"value": value, "data_type": data_type}
+        value = self.value(variable_name)
+        return {"value": value, "data_type": self.data_types[self.index[variable_name]]}
+
+    def value(self, variable_name:str) -> object:
+        slot = self.index.get(variable_name)
+        assert slot is not None and self.values[slot] is not UNBOUND, f"{variable_name=} not exist in Memory"
+        return self.values[slot]
+
+    def set(self, variable_name:str, value:object, data_type:str, overwrite:bool = False):
+        # I decide to crash when variable name is exist in the memory (unless overwrite=True)
+        slot = self.slot(variable_name)
+        with self._lock:
+            assert overwrite or self.values[slot] is UNBOUND, f"{variable_name=} already exist in Memory"
+            self.data_types[slot] = data_type
+            self.values[slot] = value
+            self.versions[slot] += 1
+
+    def version(self, variable_name:str) -> int:
+        # 0 means "never set", caches compare this to notice new bindings
+        slot = self.index.get(variable_name)
+        return 0 if slot is None else self.versions[slot]
+
+    def unset(self, variable_name:str) -> None:
+        """Unbinds one variable (no-op when it is not bound). Its slot stays valid."""
+        slot = self.index.get(variable_name)
+        if slot is None:
+            return
+        with self._lock:
+            if self.values[slot] is not UNBOUND:
+                self.values[slot] = UNBOUND
+                self.data_types[slot] = None
+                self.versions[slot] += 1
+
+    def reset(self) -> None:
+        """Unbinds every variable. Slots (and compiled references to them) stay valid."""
+        with self._lock:
+            for slot in range(len(self.names)):
+                if self.values[slot] is not UNBOUND:
+                    self.values[slot] = UNBOUND
+                    self.data_types[slot] = None
+                    self.versions[slot] += 1
+
+    def __contains__(self, variable_name:str) -> bool:
+        slot = self.index.get(variable_name)
+        return slot is not None and self.values[slot] is not UNBOUND
 
     def __repr__(self) -> str:
         string = ""
         string += f"Name\tValue\tData Type\n"
         string += "-"*30+"\n"
-        for var, data in self.memory.items():
-            value = data["value"]
-            data_type = data["data_type"]
-            string += f"{var}\t{value}\t{data_type}\n"
+        for var, value, data_type in zip(self.names, self.values, self.data_types):
+            if value is not UNBOUND:
+                string += f"{var}\t{value}\t{data_type}\n"
         string += "-"*30+"\n"
         return string
 
+
+_default:Memory = None
+_default_lock = threading.Lock()
+
+
+def default_memory() -> Memory:
+    """The process-wide scope (what `Memory()` used to return as a singleton)."""
+    global _default
+    if _default is None:
+        with _default_lock:
+            if _default is None:
+                _default = Memory()
+    return _default
+
+
 if __name__ == "__main__":
     memory = Memory()
     memory.set(variable_name='a', value=10, data_type=int)
     memory.set(variable_name='b', value="20", data_type=str)
     print(memory)
-    print(memory.get(variable_name='b'))
\ No newline at end of file
+    print(memory.get(variable_name='b'))
+    session = Memory()
+    print('a' in memory, 'a' in session)
@@ -0,0 +1,113 @@
+import decimal
+import operator
+from fractions import Fraction
+from functools import lru_cache
+
+    # -------------------------------------------
+    #   Numeric backends.
+    #
+    #   A backend decides what a NUMBER literal becomes and what + - * / do:
+    #
+    #       - float     the original behaviour: ints until a division, `/` gives a float
+    #       - int       exact integers, a division that leaves a remainder is an error
+    #       - fraction  exact rationals; stays on plain ints (C arithmetic, no conversion)
+    #                   until a division does not come out even, only then uses Fraction
+    #       - decimal   decimal.Decimal rounded to a configurable number of digits
+    #
+    #   `operations` is indexed by Operations.value, like compiler.BINARY_OPERATIONS,
+    #   and `symbols` maps '+', '-', '*', '/' like evaluator.OPERATORS.
+    # -------------------------------------------
+
+class Backend:
+    __slots__ = ("name", "number", "add", "sub", "mul", "div", "neg", "load", "operations", "symbols")
+
+    def __init__(self, name:str, number, add, sub, mul, div, neg = operator.neg, load = None) -> None:
+        self.name:str = name
+        self.number = number                # int literal -> backend value (None: use the int as it is)
+        self.add = add
+        self.sub = sub
+        self.mul = mul
+        self.div = div
+        self.neg = neg                      # Unary minus
+        self.load = load                    # Variable name -> value (None: read the parser's Memory)
+        self.operations:tuple = (add, sub, mul, div)
+        self.symbols:dict = {'+': add, '-': sub, '*': mul, '/': div}
+
+    def __repr__(self) -> str:
+        return f"Backend({self.name})"
+
+
+def _int_div(left, right):
+    if not right:
+        raise ZeroDivisionError("division by zero")
+    quotient, remainder = divmod(left, right)
+    if remainder:
+        raise ValueError(f"❌ {left} / {right} is not an integer")
+    return quotient
+
+
+def _rational_div(left, right):
+    if not right:
+        raise ZeroDivisionError("division by zero")
+    # Fast path: both ints and the division is exact -> stay an int
+    if type(left) is int and type(right) is int:
+        quotient, remainder = divmod(left, right)
+        if not remainder:
+            return quotient
+        return Fraction(left, right)
+    value = Fraction(left) / right
+    return value.numerator if value.denominator == 1 else value
+
+
+FLOAT = Backend("float", None, operator.add, operator.sub, operator.mul, operator.truediv)
+INT = Backend("int", None, operator.add, operator.sub, operator.mul, _int_div)
+FRACTION = Backend("fraction", None, operator.add, operator.sub, operator.mul, _rational_div)
+
+BACKENDS = {"float": FLOAT, "int": INT, "fraction": FRACTION, "decimal": None}
+DEFAULT_PRECISION = 28                      # Same as decimal's default context
+
+
+@lru_cache(maxsize=32)
+def decimal_backend(precision:int = DEFAULT_PRECISION) -> Backend:
+    """
+    Decimal arithmetic rounded to `precision` significant digits (its own Context, not the thread's).
+    Memoized: every caller asking for the same precision shares one Backend.
+    """
+    context = decimal.Context(prec=precision, traps=[decimal.DivisionByZero, decimal.InvalidOperation, decimal.Overflow])
+    divide = context.divide
+
+    def div(left, right):
+        # Same message as the other backends instead of "[<class 'decimal.DivisionByZero'>]"
+        if not right:
+            raise ZeroDivisionError("division by zero")
+        return divide(left, right)
+
+    return Backend(f"decimal({precision})", context.create_decimal,
+                   context.add, context.subtract, context.multiply, div, context.minus)
+
+
+def get_backend(backend = None, precision:int = None) -> Backend:
+    """
+    Returns a Backend from a name ("float", "int", "fraction", "decimal") or passes a Backend through.
+    Example:
+    Input: "decimal", precision=50
+    Output: Backend(decimal(50))
+    """
+    if backend is None:
+        return FLOAT
+    if isinstance(backend, Backend):
+        return backend
+    if backend not in BACKENDS:
+        raise ValueError(f"{backend=} must be one of {tuple(BACKENDS)}")
+    if backend == "decimal":
+        return decimal_backend(DEFAULT_PRECISION if precision is None else precision)
+    return BACKENDS[backend]
+
+
+if __name__ == "__main__":
+    for name in BACKENDS:
+        backend = get_backend(name, precision=10)
+        try:
+            print(backend, backend.div(backend.add(1, 2), 7))
+        except ValueError as error:
+            print(backend, error)
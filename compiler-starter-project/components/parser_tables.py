@@ -0,0 +1,136 @@
+import hashlib
+import marshal
+import os
+import sys
+
+import sly
+from sly.yacc import YaccError
+
+from components.tracing import channel
+
+    # -------------------------------------------
+    #   On-disk cache of the SLY LALR tables.
+    #
+    #   SLY builds the grammar and the LALR(1) tables when the Parser class is created.
+    #   The grammar itself is cheap; the table construction is what grows with the grammar.
+    #   `build(cls, definitions)` replaces sly.Parser._build:
+    #
+    #       1. build the grammar as usual (rule functions are needed at parse time anyway)
+    #       2. hash the grammar text, precedence, tokens, SLY and Python versions
+    #       3. load the action/goto tables for that hash from the cache directory,
+    #          or compute them and store them for the next process
+    #       4. write the debug file only when `debugfile` is set (CALC_PARSER_DEBUG)
+    #
+    #   Cache directory: $CALC_CACHE_DIR, else $XDG_CACHE_HOME/compiler-starter-project,
+    #   else ~/.cache/compiler-starter-project. CALC_PARSER_CACHE=0 disables the cache.
+    # -------------------------------------------
+
+FORMAT_VERSION = 1
+
+_trace = channel("parser")
+
+
+class CachedLRTable:
+    """The parts of sly.yacc.LRTable that Parser.parse reads."""
+    def __init__(self, grammar, lr_action:dict, lr_goto:dict, defaulted_states:dict) -> None:
+        self.grammar = grammar
+        self.lr_productions = grammar.Productions
+        self.lr_action:dict = lr_action
+        self.lr_goto:dict = lr_goto
+        self.defaulted_states:dict = defaulted_states
+        self.sr_conflicts:list = []
+        self.rr_conflicts:list = []
+
+
+def cache_dir() -> str:
+    if os.environ.get("CALC_CACHE_DIR"):
+        return os.environ["CALC_CACHE_DIR"]
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "compiler-starter-project")
+
+
+def grammar_key(cls) -> str:
+    # Anything that changes the tables (or the marshal format) must be part of the key
+    material = "\n".join([
+        f"format={FORMAT_VERSION}",
+        f"sly={sly.__version__}",
+        f"python={sys.version_info[0]}.{sys.version_info[1]}",
+        f"class={cls.__module__}.{cls.__qualname__}",
+        f"start={getattr(cls, 'start', None)}",
+        f"tokens={sorted(cls.tokens)}",
+        f"precedence={getattr(cls, 'precedence', ())}",
+        str(cls._grammar),
+    ])
+    return hashlib.sha256(material.encode()).hexdigest()[:32]
+
+
+def table_path(cls, key:str) -> str:
+    return os.path.join(cache_dir(), f"{cls.__qualname__}-{key}.lrtab")
+
+
+def load(path:str, key:str):
+    try:
+        with open(path, "rb") as file:
+            data = marshal.load(file)
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    if not isinstance(data, dict) or data.get("format") != FORMAT_VERSION or data.get("key") != key:
+        return None
+    return data
+
+
+def save(path:str, key:str, lrtable) -> None:
+    data = {
+        "format": FORMAT_VERSION,
+        "key": key,
+        "action": lrtable.lr_action,
+        "goto": lrtable.lr_goto,
+        "defaulted": lrtable.defaulted_states,
+    }
+    import tempfile                         # Only needed on a cache miss, keep it off the warm start path
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write to a temp file and rename, so a concurrent start never reads half a file
+        descriptor, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(descriptor, "wb") as file:
+            marshal.dump(data, file)
+        os.replace(temp_path, path)
+    except OSError as error:
+        # A read-only cache directory only costs the next start a rebuild
+        if _trace.level:
+            _trace.emit("table_cache", action="save_failed", path=path, error=str(error))
+
+
+def build(cls, definitions) -> None:
+    """Drop-in replacement for sly.Parser._build that reuses cached LALR tables."""
+    # Same steps as sly.Parser._build up to the table construction
+    rules = cls._Parser__collect_rules(definitions)
+    if not cls._Parser__validate_specification():
+        raise YaccError('Invalid parser specification')
+    cls._Parser__build_grammar(rules)
+
+    use_cache = os.environ.get("CALC_PARSER_CACHE", "1") != "0" and not cls.debugfile
+    if use_cache:
+        key = grammar_key(cls)
+        path = table_path(cls, key)
+        data = load(path, key)
+        if data is not None:
+            cls._lrtable = CachedLRTable(cls._grammar, data["action"], data["goto"], data["defaulted"])
+            if _trace.level:
+                _trace.emit("table_cache", action="hit", path=path)
+            return
+
+    if not cls._Parser__build_lrtables():
+        raise YaccError('Can\'t build parsing tables')
+
+    if use_cache:
+        save(path, key, cls._lrtable)
+        if _trace.level:
+            _trace.emit("table_cache", action="miss", path=path)
+
+    if cls.debugfile:
+        with open(cls.debugfile, 'w') as f:
+            f.write(str(cls._grammar))
+            f.write('\n')
+            f.write(str(cls._lrtable))
+        cls.log.info('Parser debugging for %s written to %s', cls.__qualname__, cls.debugfile)
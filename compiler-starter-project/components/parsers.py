@@ -1,6 +1,14 @@
 from components.lexica import MyLexer
-from components.memory import Memory
+from components.memory import UNBOUND, Memory, default_memory
+from components.numeric import Backend, get_backend
+from components import parser_tables
+from components.tracing import Level, channel
 from sly import Parser
+import os
+import re
+
+_trace = channel("parser")
+_trace_converter = channel("converter")
     # -------------------------------------------
     #   MyParser is a class that defines a syntax parser for evaluating arithmetic expressions.
     #   It uses the SLY library (Python's version of lex & yacc).
@@ -8,9 +16,10 @@ from sly import Parser
     #       - It supports basic arithmetic operations: addition (+), subtraction (-), multiplication (*), and division (/).
     #       - It follows standard operator precedence (multiplication/division before addition/subtraction).
     #       - It converts expressions into prefix and postfix notation.
+    #       - Variable names read the value stored by an earlier assignment (x = 5, then x * 2).
     # -------------------------------------------
 class MyParser(Parser):
-    debugfile = 'parser.out'            # Debug file
+    debugfile = os.environ.get("CALC_PARSER_DEBUG")  # Debug file, e.g. CALC_PARSER_DEBUG=parser.out
     start = 'statement'                 # Starting rule (entry point for the parser)
     
     tokens = MyLexer.tokens             # Get the list of tokens from the lexer (MyLexer)
@@ -20,28 +29,41 @@ class MyParser(Parser):
         ('right', UMINUS),              # Unary minus (-x) (highest precedence)
         )
 
-    def __init__(self):
+    @classmethod
+    def _build(cls, definitions):
+        # Called by SLY when the class is created: load the LALR tables from the on-disk cache
+        parser_tables.build(cls, definitions)
+
+    def __init__(self, memory:Memory = None, backend:Backend = None):
         # Initialize parser with a memory store for variable assignments.
-        self.memory:Memory = Memory()   # Stores variable values
+        self.memory:Memory = default_memory() if memory is None else memory   # Stores variable values
+        self.numeric:Backend = get_backend(backend)                           # What NUMBER and + - * / mean
+        self.reductions:int = 0                                               # Rule actions run so far (for profiling)
 
     @_('NAME ASSIGN expr')              # Rule: Assigning a value to a variable (e.g., x = 5 + 3)
     def statement(self, p):
+        self.reductions += 1
         # Handles variable assignment (e.g., x = 5 + 3).
         var_name = p.NAME               
         value = p.expr
         self.memory.set(variable_name=var_name,value=value, data_type=type(value))
+        if _trace.level:
+            _trace.emit("reduce", rule="statement : NAME ASSIGN expr", name=var_name, value=value)
         # No return statement since this stores a variable in memory.
 
     @_('expr')                          # Rule: An expression by itself is a valid statement (e.g., "5 + 3")
     # S -> E
     def statement(self, p) -> int:      
         # ⭐️ Handles standalone expressions (e.g., "5 + 3").
+        if _trace.level:
+            _trace.emit("reduce", rule="statement : expr", value=p.expr)
         return p.expr
 
     # The example with literals
     @_('expr "+" expr')                 
     # E -> E + E
     def expr(self, p):
+        self.reductions += 1
         # You can refer to the token 2 ways
         # Way1: using array
         # print(p[0], p[1], p[2])
@@ -51,243 +73,324 @@ class MyParser(Parser):
         # You have to indiciate the number at the end.
 
         # ⭐️ Handles addition (e.g., 5 + 3). 
-        return p.expr0 + p.expr1
+        value = self.numeric.add(p.expr0, p.expr1)
+        if _trace.level:
+            _trace.emit("reduce", rule="expr : expr + expr", operands=(p.expr0, p.expr1), value=value)
+        return value
 
     # The example with normal token
     @_('expr MINUS expr')
     def expr(self, p):
-        print(p[0], p[1], p[2])
+        self.reductions += 1
         # ⭐️ Handles subtraction (e.g., 5 - 3).
-        return p.expr0 - p.expr1
+        value = self.numeric.sub(p.expr0, p.expr1)
+        if _trace.level:
+            _trace.emit("reduce", rule="expr : expr MINUS expr", operands=(p.expr0, p.expr1), value=value)
+        return value
 
     @_('expr TIMES expr')
     def expr(self, p):
+        self.reductions += 1
         # ⭐️ Handles multiplication (e.g., 5 * 3).
-        return p.expr0 * p.expr1
+        value = self.numeric.mul(p.expr0, p.expr1)
+        if _trace.level:
+            _trace.emit("reduce", rule="expr : expr TIMES expr", operands=(p.expr0, p.expr1), value=value)
+        return value
 
     @_('expr DIVIDE expr')
     def expr(self, p):
+        self.reductions += 1
         # ⭐️ Handles division (e.g., 6 / 3).
-        return p.expr0 / p.expr1
+        value = self.numeric.div(p.expr0, p.expr1)
+        if _trace.level:
+            _trace.emit("reduce", rule="expr : expr DIVIDE expr", operands=(p.expr0, p.expr1), value=value)
+        return value
 
     # https://sly.readthedocs.io/en/latest/sly.html#dealing-with-ambiguous-grammars
     # `%prec UMINUS` is the way to override the `precedence` of MINUS to UMINUS.
     @_('MINUS expr %prec UMINUS')
     def expr(self, p):
+        self.reductions += 1
         # ⭐️ Handles negative numbers (e.g., -5).
-        return -p.expr
+        value = self.numeric.neg(p.expr)
+        if _trace.level:
+            _trace.emit("reduce", rule="expr : MINUS expr", operands=(p.expr,), value=value)
+        return value
 
     @_('LPAREN expr RPAREN')
     def expr(self, p):
+        self.reductions += 1
         # ⭐️ Handles expressions inside parentheses (e.g., (5 + 3)).
         return p.expr
 
+    @_('NAME')
+    def expr(self, p):
+        self.reductions += 1
+        # ⭐️ Handles variable references (e.g., x). Read by slot, without Memory.value's asserts.
+        load = self.numeric.load
+        if load is not None:
+            value = load(p.NAME)
+        else:
+            memory = self.memory
+            slot = memory.index.get(p.NAME)
+            value = UNBOUND if slot is None else memory.values[slot]
+            if value is UNBOUND:
+                raise AssertionError(f"variable_name={p.NAME!r} not exist in Memory")
+        if _trace.level:
+            _trace.emit("reduce", rule="expr : NAME", name=p.NAME, value=value)
+        return value
+
     @_('NUMBER')
     def expr(self, p):
+        self.reductions += 1
         # ⭐️ Handles integer numbers (e.g., 42).
-        return int(p.NUMBER)
+        if _trace.level:
+            _trace.emit("reduce", rule="expr : NUMBER", value=p.NUMBER)
+        number = self.numeric.number
+        return int(p.NUMBER) if number is None else number(int(p.NUMBER))
 
 # ------------------------ Input = Infix / Output = Prefix, Postfix, Answer ------------------------ #
 
+    # All converters below work on token lists and only join the output once at the end,
+    # so they run in O(n) time and memory and never recurse (no recursion-depth limit).
+
     # -------------------------------------------
     #  Infix to Prefix
     # -------------------------------------------
     def infix_to_prefix(self, input_text):
-        print(f"==== Prefix Notation")
         """
-        Converts an infix expression into prefix notation.
+        Converts an infix expression (string or token list) into prefix notation.
+        Example:
+        Input: "3 + 4 * 5"
+        Output: "+ 3 * 4 5"
+        Errors (unbalanced parentheses included) are returned as "ERROR: <message>".
         """
         try:
-            print(f"🔹 Original Infix Expression: {input_text}")  # Debug
-            
             # ✅ Step 1: Tokenize while keeping multi-digit numbers
-            tokens = input_text.split()
-            print(f"🔹 Tokenized Input: {tokens}")  # Debug
-            
-            # ✅ Step 2: Reverse token list and swap parentheses
-            reversed_tokens = []
-            for token in reversed(tokens):
-                if token == '(':
-                    reversed_tokens.append(')')
-                elif token == ')':
-                    reversed_tokens.append('(')
-                else:
-                    reversed_tokens.append(token)
+            tokens = split_infix(input_text)
+            debug = _trace_converter.level >= Level.DEBUG
 
-            print(f"🔹 Reversed Tokens: {' '.join(reversed_tokens)}")  # Debug
-
-            # ✅ Step 3: Convert reversed infix to postfix
+            # ✅ Step 2 + 3: Walk the tokens backwards (parentheses swapped) and convert to postfix
             operator_stack = []
             prefix = []
-            precedence = {'+': 1, '-': 1, '*': 2, '/': 2}
-
-            print(f"🔹 Converting to Postfix...")  # Debug
+            precedence = PRECEDENCE
 
-            for token in reversed_tokens:
-                if token.isdigit():
-                    prefix.append(token)  # Append numbers directly
-                    print(f"✅ Added Number: {token} → Prefix (Postfix Order): {' '.join(prefix)}")
-                elif token == ')':
-                    operator_stack.append(token)
-                    print(f"⚫️ Pushed ')': Stack: {operator_stack}")
-                elif token == '(':
+            for token in reversed(tokens):
+                if is_operand(token):
+                    prefix.append(token)  # Append numbers and variable names directly
+                elif token == '(':        # '(' read backwards acts as ')'
                     while operator_stack and operator_stack[-1] != ')':
-                        popped = operator_stack.pop()
-                        prefix.append(popped)
-                        print(f"🔴 Popped Operator '{popped}' → Prefix (Postfix Order): {' '.join(prefix)}")
+                        prefix.append(operator_stack.pop())
+                        if debug:
+                            _trace_converter.emit("stack", op="pop", token=prefix[-1], depth=len(operator_stack))
+                    if not operator_stack:
+                        raise unbalanced(input_text)
                     operator_stack.pop()  # Remove ')'
-                    print(f"🧹 Removed ')': Stack: {operator_stack}")
+                    if debug:
+                        _trace_converter.emit("stack", op="pop", token=')', depth=len(operator_stack))
+                elif token == ')':        # ')' read backwards acts as '('
+                    operator_stack.append(token)
+                    if debug:
+                        _trace_converter.emit("stack", op="push", token=token, depth=len(operator_stack))
                 elif token in precedence:
-                    while operator_stack and precedence.get(operator_stack[-1], 0) > precedence.get(token, 0):
-                        popped = operator_stack.pop()
-                        prefix.append(popped)
-                        print(f"🔴 Popped Operator '{popped}' (Higher Precedence) → Prefix (Postfix Order): {' '.join(prefix)}")
+                    # Strictly greater, so equal precedence stays left-associative after the reverse
+                    while operator_stack and precedence.get(operator_stack[-1], 0) > precedence[token]:
+                        prefix.append(operator_stack.pop())
+                        if debug:
+                            _trace_converter.emit("stack", op="pop", token=prefix[-1], depth=len(operator_stack))
                     operator_stack.append(token)
-                    print(f"⚫️ Pushed Operator '{token}' → Stack: {operator_stack}")
+                    if debug:
+                        _trace_converter.emit("stack", op="push", token=token, depth=len(operator_stack))
 
             while operator_stack:
-                popped = operator_stack.pop()
-                prefix.append(popped)
-                print(f"🔴 Popped Remaining '{popped}' → Prefix (Postfix Order): {' '.join(prefix)}")
-
-            print(f"🔹 Postfix Before Reverse: {' '.join(prefix)}")  # Debug
+                if operator_stack[-1] == ')':
+                    raise unbalanced(input_text)
+                prefix.append(operator_stack.pop())
+                if debug:
+                    _trace_converter.emit("stack", op="pop", token=prefix[-1], depth=len(operator_stack))
 
             # ✅ Step 4: Reverse postfix result to get correct prefix
             prefix.reverse()
             final_prefix = ' '.join(prefix)
-            
-            print(f"✅ Final Prefix Expression: {final_prefix}\n")  # Debug
-            
+            if _trace_converter.level:
+                _trace_converter.emit("result", converter="infix_to_prefix", output=final_prefix)
             return final_prefix
 
         except Exception as e:
             return f"ERROR: {e}"
-    
+
     # -------------------------------------------
     # Infix to Postfix
     # -------------------------------------------
     def infix_to_postfix(self, expression):
-        print(f"==== Prefix Notation")
         """
-        Converts an infix expression into postfix notation.
+        Converts an infix expression (string or token list) into postfix notation.
+        Example:
+        Input: "3 + 4 * 5"
+        Output: "3 4 5 * +"
+        Raises ValueError on unbalanced parentheses.
         """
-
-        def isOperator(c):
-            return c in {"+", "-", "*", "/"}
-
-        def precedence(op):
-            if op in {'+', '-'}:
-                return 1
-            elif op in {'*', '/'}:
-                return 2
-            return 0
-
+        debug = _trace_converter.level >= Level.DEBUG
+        precedence = PRECEDENCE
         stack = []
         postfix = []
-        tokens = expression.split()
-
-        print(f"🔹 Original Infix Expression: {expression}")
-        print(f"🔹 Tokens: {tokens}")
 
-        for token in tokens:
-            if token.isdigit():  # If it's a number, add it to output
+        for token in split_infix(expression):
+            if is_operand(token):  # If it's a number or a variable, add it to output
                 postfix.append(token)
-                print(f"✅ Added Number: {token} → Postfix: {' '.join(postfix)}")
             elif token == '(':  # Left Parenthesis: Push to stack
                 stack.append(token)
-                print(f"⚫️ Pushed '(': Stack: {stack}")
+                if debug:
+                    _trace_converter.emit("stack", op="push", token=token, depth=len(stack))
             elif token == ')':  # Right Parenthesis: Pop until '('
                 while stack and stack[-1] != '(':
-                    popped = stack.pop()
-                    postfix.append(popped)
-                    print(f"🔴 Popped Operator '{popped}' → Postfix: {' '.join(postfix)}")
+                    postfix.append(stack.pop())
+                    if debug:
+                        _trace_converter.emit("stack", op="pop", token=postfix[-1], depth=len(stack))
+                if not stack:
+                    raise unbalanced(expression)
                 stack.pop()  # Remove '('
-                print(f"🧹 Removed '(': Stack: {stack}")
-            elif isOperator(token):  # If it's an operator
-                while (stack and precedence(stack[-1]) >= precedence(token)):
-                    popped = stack.pop()
-                    postfix.append(popped)
-                    print(f"🔴 Popped Operator '{popped}' (Higher Precedence) → Postfix: {' '.join(postfix)}")
+                if debug:
+                    _trace_converter.emit("stack", op="pop", token='(', depth=len(stack))
+            elif token in precedence:  # If it's an operator
+                while stack and precedence.get(stack[-1], 0) >= precedence[token]:
+                    postfix.append(stack.pop())
+                    if debug:
+                        _trace_converter.emit("stack", op="pop", token=postfix[-1], depth=len(stack))
                 stack.append(token)
-                print(f"⚫️ Pushed Operator '{token}' → Stack: {stack}")
+                if debug:
+                    _trace_converter.emit("stack", op="push", token=token, depth=len(stack))
 
         # Pop remaining operators
         while stack:
-            popped = stack.pop()
-            postfix.append(popped)
-            print(f"🔴 Popped Remaining '{popped}' → Postfix: {' '.join(postfix)}")
+            if stack[-1] == '(':
+                raise unbalanced(expression)
+            postfix.append(stack.pop())
+            if debug:
+                _trace_converter.emit("stack", op="pop", token=postfix[-1], depth=len(stack))
 
         final_postfix = ' '.join(postfix)
-        print(f"✅ Final Postfix Expression: {final_postfix}\n")
-
+        if _trace_converter.level:
+            _trace_converter.emit("result", converter="infix_to_postfix", output=final_postfix)
         return final_postfix
+
 # ------------------------ Input = Prefix / Output = Infix, Postfix, Answer ------------------------ #
     # -------------------------------------------
     # Prefix to Infix
     # -------------------------------------------
     def prefix_to_infix(self, expression):
         """
-        Converts a prefix expression into an infix expression.
+        Converts a prefix expression (string or token list) into an infix expression.
         Example:
         Input: "+ 3 * 4 5"
         Output: "(3 + (4 * 5))"
         """
-        stack = []
-        tokens = expression.strip().split()
+        output = []
+
+        for event, token in walk_prefix(expression):
+            if event == OPEN:
+                output.append('(')
+            elif event == OPERAND:
+                output.append(token)
+            elif event == MIDDLE:
+                output.append(f" {token} ")
+            else:
+                output.append(')')
 
-        # ✅ Ensure the prefix expression starts with an operator
-        if not tokens[0] in {'+', '-', '*', '/'}:
-            raise ValueError(f"❌ Prefix expression must start with an operator: {expression}")
+        return ''.join(output)  # The final infix expression
+
+    # -------------------------------------------
+    # Prefix to Postfix
+    # -------------------------------------------
+    def prefix_to_postfix(self, expression):
+        """
+        Converts a prefix expression (string or token list) into a postfix expression.
+        Example:
+        Input: "+ 3 * 4 5"
+        Output: "3 4 5 * +"
+        """
+        postfix = [token for event, token in walk_prefix(expression) if event == OPERAND or event == CLOSE]
+        return ' '.join(postfix)  # The final postfix expression
 
-        # Reverse the token list for processing
-        tokens.reverse()
 
-        print(f"🟠 Tokens (Reversed): {tokens}")    # Debugging
+# ------------------------ Helpers ------------------------ #
 
-        for token in tokens:
-            if token.isdigit():                     # If it's a number, push it onto the stack
-                stack.append(token)
-            elif token.lstrip('-').isdigit():       # Handle negative numbers
-                stack.append(token)
-            elif token in {'+', '-', '*', '/'}:     # If operator, pop two operands and construct expression
-                if len(stack) < 2:
-                    print(f"❌ Operator '{token}' is missing operands. Stack before error: {stack}")
-                    raise ValueError(f"❌ Invalid prefix expression: {expression} (Operator '{token}' has fewer than 2 operands)")
+PRECEDENCE = {'+': 1, '-': 1, '*': 2, '/': 2}
 
-                op1 = stack.pop()
-                op2 = stack.pop()
-                new_expr = f"({op1} {token} {op2})"  # Construct infix expression
-                stack.append(new_expr)
+_INFIX_TOKEN = re.compile(r'\d+|[A-Za-z_][A-Za-z0-9_]*|\S')
 
-                print(f"🔹 Processed Operator '{token}': {new_expr}")  # Debugging
-            else:
-                raise ValueError(f"❌ Invalid character in expression: {token}")
+# Events produced by `walk_prefix`
+OPEN, OPERAND, MIDDLE, CLOSE = range(4)
 
-        if len(stack) != 1:
-            raise ValueError(f"❌ Invalid prefix expression: {expression} (Stack leftover: {stack})")
 
-        return stack[0]  # The final infix expression
-    
-    # -------------------------------------------
-    # Prefix to Postfix
-    # -------------------------------------------
-    # def prefix_to_postfix(self, expression):
-    #     """
-    #     Converts a prefix expression into a postfix expression.
-    #     Example:
-    #     Input: "+ 3 * 4 5"
-    #     Output: "3 4 5 * +"
-    #     """
-    #     stack = []
-    #     tokens = expression.split()[::-1]  # Reverse the input
-
-    #     for token in tokens:
-    #         if token.isdigit():  # If number, push onto stack
-    #             stack.append(token)
-    #         else:  # If operator, pop two operands and combine them
-    #             op1 = stack.pop()
-    #             op2 = stack.pop()
-    #             new_expr = f"{op1} {op2} {token}"  # Construct postfix
-    #             stack.append(new_expr)
-
-    #     return stack[0]  # The final postfix expression
\ No newline at end of file
+def is_operand(token:str) -> bool:
+    # A number, optionally negative, or a variable name
+    return token.lstrip('-').isdigit() or token.isidentifier()
+
+
+def unbalanced(expression) -> ValueError:
+    # The error both infix converters raise for a bracket without its partner
+    if not isinstance(expression, str):
+        expression = ' '.join(expression)
+    return ValueError(f"❌ Unbalanced parentheses in expression: {expression}")
+
+
+def split_infix(expression) -> list:
+    # Token lists are used as they are; strings are split so that "(1+2)" also works
+    if isinstance(expression, str):
+        return _INFIX_TOKEN.findall(expression)
+    return list(expression)
+
+
+def walk_prefix(expression):
+    """
+    Reads a prefix expression (string or token list) left to right and yields (event, token)
+    pairs in infix order. Every operator opens a frame [operator, left operand done?]; an
+    operand either finishes the left side of the top frame (MIDDLE) or closes it (CLOSE),
+    and a closed frame keeps bubbling up the stack. Each token is visited once, no recursion.
+    Example:
+    Input: "+ 3 4"
+    Output: (OPEN, '+'), (OPERAND, '3'), (MIDDLE, '+'), (OPERAND, '4'), (CLOSE, '+')
+    """
+    tokens = expression.split() if isinstance(expression, str) else expression
+    debug = _trace_converter.level >= Level.DEBUG
+    stack = []
+    started = False
+    done = False
+
+    for token in tokens:
+        if done:
+            raise ValueError(f"❌ Invalid prefix expression: {expression} (Unexpected token '{token}' after a complete expression)")
+
+        if token in PRECEDENCE:
+            started = True
+            stack.append([token, False])
+            if debug:
+                _trace_converter.emit("stack", op="push", token=token, depth=len(stack))
+            yield OPEN, token
+            continue
+
+        # ✅ Ensure the prefix expression starts with an operator
+        if not started:
+            raise ValueError(f"❌ Prefix expression must start with an operator: {expression}")
+        if not is_operand(token):               # Numbers (including negative numbers) and variable names
+            raise ValueError(f"❌ Invalid character in expression: {token}")
+
+        yield OPERAND, token
+        while stack:
+            frame = stack[-1]
+            if not frame[1]:
+                frame[1] = True
+                yield MIDDLE, frame[0]
+                break
+            stack.pop()
+            if debug:
+                _trace_converter.emit("stack", op="pop", token=frame[0], depth=len(stack))
+            yield CLOSE, frame[0]
+        else:
+            done = True
+
+    if not started:
+        raise ValueError(f"❌ Prefix expression must start with an operator: {expression}")
+    if stack:
+        raise ValueError(f"❌ Invalid prefix expression: {expression} (Operator '{stack[-1][0]}' has fewer than 2 operands)")
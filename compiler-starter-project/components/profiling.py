@@ -0,0 +1,271 @@
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from bisect import bisect_left
+
+    # -------------------------------------------
+    #   Per-stage latency instrumentation.
+    #
+    #       - Code is split into named stages (tokenize, parse, evaluate, ...). A stage is
+    #         timed with `with profiler.stage("parse") as stage:`; when profiling is off
+    #         `stage()` returns a shared do-nothing object, so the cost is one call.
+    #       - Every stage keeps call count, total wall time, a latency histogram (p50/p99),
+    #         token and reduction counts, and optionally allocations: the net change in
+    #         allocated blocks and the tracemalloc peak while the stage ran.
+    #       - `snapshot()` returns the numbers as a dict, `prometheus()` as Prometheus
+    #         text exposition format.
+    #       - Stages may run on several threads (the GUI times its worker and its UI thread):
+    #         stats are updated under a lock, and nesting is tracked per thread.
+    #       - `CALC_PROFILE=1` enables it from the environment, `CALC_PROFILE=alloc` also
+    #         tracks allocations (tracemalloc slows everything down several times).
+    # -------------------------------------------
+
+# Histogram upper bounds in seconds: 1us .. ~16s, four buckets per power of ten
+BUCKETS = tuple(10 ** (exponent / 4) * 1e-6 for exponent in range(30))
+
+
+class Histogram:
+    __slots__ = ("bounds", "counts", "count", "sum")
+
+    def __init__(self, bounds:tuple = BUCKETS) -> None:
+        self.bounds:tuple = bounds
+        self.counts:list = [0] * (len(bounds) + 1)     # Last bucket is +Inf
+        self.count:int = 0
+        self.sum:float = 0.0
+
+    def observe(self, value:float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q:float) -> float:
+        """Estimated q-quantile, interpolated linearly inside the bucket it falls in (like Prometheus)."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            if seen + count >= rank and count:
+                if index == len(self.bounds):
+                    return self.bounds[-1]
+                lower = self.bounds[index - 1] if index else 0.0
+                return lower + (self.bounds[index] - lower) * (rank - seen) / count
+            seen += count
+        return self.bounds[-1]
+
+
+class StageStats:
+    __slots__ = ("name", "calls", "seconds", "histogram", "tokens", "reductions", "blocks", "peak_bytes")
+
+    def __init__(self, name:str) -> None:
+        self.name:str = name
+        self.calls:int = 0
+        self.seconds:float = 0.0
+        self.histogram:Histogram = Histogram()
+        self.tokens:int = 0
+        self.reductions:int = 0
+        self.blocks:int = 0                 # Net change in allocated blocks
+        self.peak_bytes:int = 0             # Highest tracemalloc peak seen in one call
+
+    @property
+    def p50(self) -> float:
+        return self.histogram.quantile(0.50)
+
+    @property
+    def p99(self) -> float:
+        return self.histogram.quantile(0.99)
+
+    def as_dict(self) -> dict:
+        return {
+            "calls": self.calls, "seconds": self.seconds, "p50": self.p50, "p99": self.p99,
+            "tokens": self.tokens, "reductions": self.reductions,
+            "blocks": self.blocks, "peak_bytes": self.peak_bytes,
+        }
+
+    def __repr__(self) -> str:
+        return (f"StageStats({self.name}, calls={self.calls}, seconds={self.seconds:.6f}, "
+                f"p50={self.p50 * 1e6:.1f}us, p99={self.p99 * 1e6:.1f}us, tokens={self.tokens}, reductions={self.reductions})")
+
+
+class Stage:
+    """One timed run of a stage. Callers may set `tokens` / `reductions` before it exits."""
+    __slots__ = ("profiler", "name", "tokens", "reductions", "started", "blocks", "peak")
+
+    def __init__(self, profiler, name:str) -> None:
+        self.profiler = profiler
+        self.name:str = name
+        self.tokens:int = 0
+        self.reductions:int = 0
+
+    def __enter__(self):
+        if self.profiler.allocations:
+            self.blocks = sys.getallocatedblocks()
+            # reset_peak() below also wipes the peak of the enclosing stage: keep it first
+            self.peak:int = 0               # Highest peak of this stage before its own last reset
+            open_stages = self.profiler.open_stages()
+            if open_stages:
+                parent = open_stages[-1]
+                parent.peak = max(parent.peak, tracemalloc.get_traced_memory()[1])
+            open_stages.append(self)
+            tracemalloc.reset_peak()
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        seconds = time.perf_counter() - self.started
+        profiler = self.profiler
+        tracked = profiler.allocations and hasattr(self, "peak")     # Allocation tracking was on at __enter__
+        if tracked:
+            blocks = sys.getallocatedblocks() - self.blocks
+            peak = max(self.peak, tracemalloc.get_traced_memory()[1])
+            # Remove this stage's own entry (wherever it is) and pass its peak to the stage it was in
+            open_stages = profiler.open_stages()
+            for position in range(len(open_stages) - 1, -1, -1):
+                if open_stages[position] is self:
+                    del open_stages[position]
+                    if position:
+                        parent = open_stages[position - 1]
+                        parent.peak = max(parent.peak, peak)
+                    break
+        with profiler.lock:
+            stats = profiler.stats(self.name)
+            stats.calls += 1
+            stats.seconds += seconds
+            stats.histogram.observe(seconds)
+            stats.tokens += self.tokens
+            stats.reductions += self.reductions
+            if tracked:
+                stats.blocks += blocks
+                stats.peak_bytes = max(stats.peak_bytes, peak)
+
+
+class _NullStage:
+    # Returned while profiling is off: accepts the same attribute writes and does nothing
+    tokens = 0
+    reductions = 0
+
+    def __bool__(self) -> bool:
+        return False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        pass
+
+    def __setattr__(self, name, value) -> None:
+        pass
+
+_NULL_STAGE = _NullStage()
+
+
+class Profiler:
+    def __init__(self) -> None:
+        self.enabled:bool = False
+        self.allocations:bool = False
+        self.stages:dict = {}               # name -> StageStats, in first-seen order
+        self.lock = threading.Lock()        # Guards `stages` and every StageStats
+        self._local = threading.local()     # Per thread: stages running with allocation tracking
+
+    def open_stages(self) -> list:
+        """Stages of the calling thread running with allocation tracking, innermost last."""
+        stages = getattr(self._local, "stages", None)
+        if stages is None:
+            stages = self._local.stages = []
+        return stages
+
+    def enable(self, allocations:bool = False) -> None:
+        self.enabled = True
+        self.allocations = allocations
+        if allocations and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def disable(self) -> None:
+        self.enabled = False
+        if self.allocations and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self.allocations = False
+
+    def reset(self) -> None:
+        with self.lock:
+            self.stages.clear()
+
+    def stage(self, name:str):
+        """Context manager timing one run of `name` (a no-op object when profiling is off)."""
+        if not self.enabled:
+            return _NULL_STAGE
+        return Stage(self, name)
+
+    def stats(self, name:str) -> StageStats:
+        # Callers updating the stats hold `lock`
+        stats = self.stages.get(name)
+        if stats is None:
+            stats = self.stages[name] = StageStats(name)
+        return stats
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            return {name: stats.as_dict() for name, stats in self.stages.items()}
+
+    def prometheus(self, prefix:str = "calc") -> str:
+        """
+        Prometheus text exposition of every stage.
+        Example:
+        Output: calc_stage_seconds_bucket{stage="parse",le="1e-05"} 3 ...
+        """
+        with self.lock:
+            return self._prometheus(prefix)
+
+    def _prometheus(self, prefix:str) -> str:
+        lines = [
+            f"# HELP {prefix}_stage_seconds Wall time per stage run.",
+            f"# TYPE {prefix}_stage_seconds histogram",
+        ]
+        for name, stats in self.stages.items():
+            histogram = stats.histogram
+            cumulative = 0
+            for bound, count in zip(histogram.bounds, histogram.counts):
+                cumulative += count
+                lines.append(f'{prefix}_stage_seconds_bucket{{stage="{name}",le="{bound:.3g}"}} {cumulative}')
+            lines.append(f'{prefix}_stage_seconds_bucket{{stage="{name}",le="+Inf"}} {histogram.count}')
+            lines.append(f'{prefix}_stage_seconds_sum{{stage="{name}"}} {histogram.sum:.9f}')
+            lines.append(f'{prefix}_stage_seconds_count{{stage="{name}"}} {histogram.count}')
+
+        for field, help_text in (("tokens", "Tokens read per stage."), ("reductions", "Grammar reductions per stage.")):
+            lines.append(f"# HELP {prefix}_stage_{field}_total {help_text}")
+            lines.append(f"# TYPE {prefix}_stage_{field}_total counter")
+            for name, stats in self.stages.items():
+                lines.append(f'{prefix}_stage_{field}_total{{stage="{name}"}} {getattr(stats, field)}')
+        if self.allocations:
+            # `blocks` is summed over runs like tokens; `peak_bytes` is a maximum, so a gauge
+            for metric, field, kind, help_text in (
+                    (f"{prefix}_stage_blocks_total", "blocks", "counter", "Net change in allocated blocks, summed over runs."),
+                    (f"{prefix}_stage_peak_bytes", "peak_bytes", "gauge", "Highest tracemalloc peak during one run.")):
+                lines.append(f"# HELP {metric} {help_text}")
+                lines.append(f"# TYPE {metric} {kind}")
+                for name, stats in self.stages.items():
+                    lines.append(f'{metric}{{stage="{name}"}} {getattr(stats, field)}')
+        return "\n".join(lines) + "\n"
+
+    def __repr__(self) -> str:
+        with self.lock:
+            return "\n".join(repr(stats) for stats in self.stages.values())
+
+
+profiler = Profiler()                       # Process-wide profiler used by the components
+
+# CALC_PROFILE=1 (timings and counts) or CALC_PROFILE=alloc (+ allocations)
+if os.environ.get("CALC_PROFILE", "0") not in ("", "0"):
+    profiler.enable(allocations=os.environ["CALC_PROFILE"] == "alloc")
+
+
+if __name__ == "__main__":
+    profiler.enable(allocations=True)
+    for size in (10, 1000, 100000):
+        with profiler.stage("build") as stage:
+            data = list(range(size))
+            stage.tokens = size
+    print(profiler)
+    print(profiler.prometheus())
@@ -0,0 +1,309 @@
+import re
+
+from components.ast.compiler import CompiledExpression, Compiler, _prefix_leaf, compile_expression
+from components.batch import clean_lines
+from components.engine import EVALUATION_ERRORS, MODES, Engine
+from components.lexica import MyLexer
+from components.memory import Memory
+from components.numeric import Backend, get_backend
+
+    # -------------------------------------------
+    #   Program mode: a sheet of `name = expression` definitions.
+    #
+    #       - A whole script is parsed in one pass; every right-hand side is an
+    #         expression in the program's mode (prefix, or infix read by the engine's
+    #         MyParser) compiled once (components/ast/compiler.py), and the names it
+    #         loads are its dependencies. Names follow the lexer's NAME rule.
+    #       - `dependents[name]` is the reverse edge set. Changing definitions recomputes
+    #         only what is downstream of them, in topological order (Kahn's algorithm
+    #         restricted to the affected names). A definition whose inputs all kept their
+    #         value is skipped, so a change that does not alter a value stops there.
+    #       - A change that would close a cycle raises CycleError and is rolled back, so
+    #         the graph is always acyclic.
+    #       - Values live in the program's own Memory, rebound in place. A definition that
+    #         fails (division by zero, undefined name) keeps its error and leaves its name
+    #         unbound, so everything downstream reports the missing name.
+    #
+    #   Example:
+    #       x = 3
+    #       y = * x 2
+    #       z = + x y          -> x=3, y=6, z=9;  update("x = 4") recomputes x, y, z only
+    # -------------------------------------------
+
+_NAME = re.compile(MyLexer.NAME)           # Same names as infix input accepts
+
+
+class CycleError(ValueError):
+    def __init__(self, cycle:list) -> None:
+        self.cycle:list = cycle             # [a, b, ..., a]
+        super().__init__(f"❌ Circular definition: {' -> '.join(cycle)}")
+
+
+class Definition:
+    __slots__ = ("name", "lineno", "source", "program", "dependencies", "value", "error")
+
+    def __init__(self, name:str, lineno:int, source:str, program:CompiledExpression) -> None:
+        self.name:str = name
+        self.lineno:int = lineno
+        self.source:str = source                            # Right-hand side as written
+        self.program:CompiledExpression = program
+        self.dependencies:tuple = tuple(program.names)      # Names it reads (each once)
+        self.value:object = None
+        self.error:str = None
+
+    def __repr__(self) -> str:
+        outcome = f"error={self.error!r}" if self.error else f"value={self.value!r}"
+        return f"Definition({self.name} = {self.source}, {outcome})"
+
+
+def parse_definition(lineno:int, line:str, backend:Backend = None, engine:Engine = None) -> Definition:
+    """
+    Parses one definition; the right-hand side is infix when `engine` is in infix mode, prefix otherwise.
+    Example:
+    Input: 3, "total = + price tax"
+    Output: Definition(total = + price tax), dependencies ('price', 'tax')
+    """
+    name, assign, expression = line.partition("=")
+    name = name.strip()
+    if not assign or not _NAME.fullmatch(name):
+        raise ValueError(f"❌ Line {lineno}: expected 'name = expression', got {line!r}")
+    tokens = expression.split()
+    try:
+        if engine is not None and engine.mode == "infix":
+            # MyParser's own rule actions number the nodes (Compiler.builder); the engine's
+            # error handlers turn lexing and syntax errors into ValueError
+            compiler = Compiler(backend)
+            root = engine.evaluate(expression, backend=compiler.builder())
+            if root is None:
+                raise ValueError(f"expected an expression after '=', got {expression.strip()!r}")
+            program = compiler.emit(root)
+        elif len(tokens) == 1:
+            # A lone number or name (reduce_prefix wants an operator first)
+            compiler = Compiler()
+            program = compiler.emit(_prefix_leaf(compiler, tokens[0]))
+        else:
+            program = compile_expression(tokens, backend)
+        for dependency in program.names:
+            if not _NAME.fullmatch(dependency):
+                raise ValueError(f"Invalid name in expression: {dependency}")
+    except (ValueError, AssertionError, IndexError) as error:
+        raise ValueError(f"❌ Line {lineno}: {str(error).removeprefix('❌ ')}") from None
+    expression = " ".join(tokens)
+    return Definition(name, lineno, expression, program)
+
+
+def parse_program(lines, backend:Backend = None, engine:Engine = None) -> list:
+    """Parses a script (a string or numbered lines) into definitions; a name may be defined once."""
+    if isinstance(lines, str):
+        lines = enumerate(lines.splitlines(), start=1)
+    definitions = []
+    seen = {}
+    for lineno, line in clean_lines(lines):
+        definition = parse_definition(lineno, line, backend, engine)
+        if definition.name in seen:
+            raise ValueError(f"❌ Line {lineno}: {definition.name!r} is already defined on line {seen[definition.name]}")
+        seen[definition.name] = lineno
+        definitions.append(definition)
+    return definitions
+
+
+class Program:
+    def __init__(self, mode:str = "prefix", memory:Memory = None, backend:Backend = None, precision:int = None) -> None:
+        if mode not in ("prefix", "infix"):
+            raise ValueError(f"{mode=} must be one of {MODES[:2]}")
+        self.mode:str = mode
+        self.memory:Memory = Memory() if memory is None else memory
+        self.backend:Backend = get_backend(backend, precision)
+        # Reads right-hand sides; its own Memory, so nothing a script parses lands in `memory`
+        self.engine:Engine = Engine(mode=mode, memory=Memory(), backend=self.backend)
+        self.definitions:dict = {}          # name -> Definition, in definition order
+        self.dependents:dict = {}           # name -> set of names whose definition reads it
+        self.evaluations:int = 0            # Definitions evaluated so far
+
+    def load(self, script) -> list:
+        """
+        Replaces the whole program with `script`. Returns the names evaluated, in order.
+        On a cycle the previous program is kept.
+        """
+        definitions = parse_program(script, self.backend, self.engine)
+        previous = (self.definitions, self.dependents)
+        self.definitions, self.dependents = {}, {}
+        try:
+            order = self._plan(definitions, removed=())
+        except CycleError:
+            self.definitions, self.dependents = previous
+            raise
+        for name in previous[0]:
+            self.memory.unset(name)
+        return self._recompute(order, roots={definition.name for definition in definitions}, changed=set())
+
+    def update(self, script) -> list:
+        """
+        Adds or replaces the definitions of `script` and recomputes what depends on them.
+        Returns the names evaluated, in topological order.
+        """
+        return self._apply(parse_program(script, self.backend, self.engine), removed=())
+
+    def define(self, name:str, expression:str) -> list:
+        return self.update(f"{name} = {expression}")
+
+    def remove(self, *names:str) -> list:
+        """Removes definitions; their dependents are recomputed (and report the missing name)."""
+        return self._apply([], removed=[name for name in names if name in self.definitions])
+
+    def value(self, name:str) -> object:
+        definition = self.definitions.get(name)
+        assert definition is not None, f"{name=} is not defined"
+        if definition.error:
+            raise ValueError(definition.error)
+        return definition.value
+
+    # ------------------------ Graph ------------------------ #
+
+    def _link(self, definition:Definition) -> None:
+        for dependency in definition.dependencies:
+            self.dependents.setdefault(dependency, set()).add(definition.name)
+
+    def _unlink(self, definition:Definition) -> None:
+        for dependency in definition.dependencies:
+            dependents = self.dependents.get(dependency)
+            if dependents is not None:
+                dependents.discard(definition.name)
+
+    def _replace(self, name:str, definition:Definition) -> Definition:
+        """Swaps the definition of `name` (None removes it) and returns the old one."""
+        old = self.definitions.pop(name, None) if definition is None else self.definitions.get(name)
+        if old is not None:
+            self._unlink(old)
+        if definition is not None:
+            self.definitions[name] = definition
+            self._link(definition)
+        return old
+
+    def _downstream(self, names) -> set:
+        affected = set(names)
+        stack = list(affected)
+        while stack:
+            for dependent in self.dependents.get(stack.pop(), ()):
+                if dependent not in affected:
+                    affected.add(dependent)
+                    stack.append(dependent)
+        return affected
+
+    def _order(self, affected:set) -> list:
+        """Topological order of `affected` (dependencies first). Raises CycleError."""
+        definitions = self.definitions
+        waiting = {}                        # name -> number of its dependencies still to evaluate
+        ready = []
+        for name in affected:
+            definition = definitions.get(name)
+            count = 0 if definition is None else sum(1 for dependency in definition.dependencies if dependency in affected)
+            waiting[name] = count
+            if count == 0:
+                ready.append(name)
+
+        order = []
+        while ready:
+            name = ready.pop()
+            order.append(name)
+            for dependent in self.dependents.get(name, ()):
+                if dependent in waiting:
+                    waiting[dependent] -= 1
+                    if waiting[dependent] == 0:
+                        ready.append(dependent)
+
+        if len(order) < len(affected):
+            raise CycleError(self._find_cycle({name for name, count in waiting.items() if count}))
+        return order
+
+    def _find_cycle(self, stuck:set) -> list:
+        # Every stuck name still waits on a stuck dependency, so following those edges must loop
+        name = min(stuck)
+        path = []
+        position = {}
+        while name not in position:
+            position[name] = len(path)
+            path.append(name)
+            name = min(dependency for dependency in self.definitions[name].dependencies if dependency in stuck)
+        cycle = path[position[name]:] + [name]
+        cycle.reverse()                     # Read as "a uses b uses ... uses a"
+        return cycle
+
+    # ------------------------ Recomputation ------------------------ #
+
+    def _apply(self, definitions:list, removed) -> list:
+        order = self._plan(definitions, removed)
+        for name in removed:
+            self.memory.unset(name)
+        return self._recompute(order, roots={definition.name for definition in definitions}, changed=set(removed))
+
+    def _plan(self, definitions:list, removed) -> list:
+        """Applies the changes to the graph and returns what to recompute; rolls back on a cycle."""
+        previous = {}                       # name -> definition before this change (None: new)
+        for definition in definitions:
+            old = previous[definition.name] = self._replace(definition.name, definition)
+            if old is not None:
+                # Start from the old outcome, so an unchanged value does not propagate
+                definition.value, definition.error = old.value, old.error
+        for name in removed:
+            previous[name] = self._replace(name, None)
+        try:
+            return self._order(self._downstream(previous))
+        except CycleError:
+            for name, old in previous.items():
+                self._replace(name, old)
+            raise
+
+    def _recompute(self, order:list, roots:set, changed:set) -> list:
+        """Evaluates `roots` and, in `order`, every definition reading a name whose value changed."""
+        definitions = self.definitions
+        memory = self.memory
+        evaluated = []
+        for name in order:
+            definition = definitions.get(name)
+            if definition is None:
+                continue
+            # Skip definitions whose inputs all kept their value
+            if name not in roots and not any(dependency in changed for dependency in definition.dependencies):
+                continue
+            old = (definition.value, definition.error)
+            try:
+                value = definition.program.run(memory=memory, backend=self.backend)
+                definition.value, definition.error = value, None
+                memory.set(variable_name=name, value=value, data_type=type(value), overwrite=True)
+            except EVALUATION_ERRORS as error:
+                definition.value, definition.error = None, str(error) or type(error).__name__
+                memory.unset(name)
+            evaluated.append(name)
+            if (definition.value, definition.error) != old or type(definition.value) is not type(old[0]):
+                changed.add(name)
+        self.evaluations += len(evaluated)
+        return evaluated
+
+    def records(self):
+        """One record per definition, in definition order, shaped like components.batch records."""
+        for definition in self.definitions.values():
+            yield {"line": definition.lineno, "input": f"{definition.name} = {definition.source}",
+                   "result": definition.value, "error": definition.error}
+
+    def __len__(self) -> int:
+        return len(self.definitions)
+
+
+if __name__ == "__main__":
+    program = Program()
+    print(program.load("x = 3\ny = * x 2\nz = + x y\nw = 10"))
+    print(program.update("x = 4"), program.value("z"))
+    print(program.update("w = 11"))
+    try:
+        program.update("x = + z 1")
+    except CycleError as error:
+        print(error)
+    print(program.remove("x"), program.definitions["z"])
+    try:
+        program.load("a = b\nb = a")
+    except CycleError as error:
+        print(error, len(program))
+
+    program = Program(mode="infix")
+    print(program.load("price = 40\ntax = price / 10\ntotal = -(price + tax) * 2"), program.value("total"))
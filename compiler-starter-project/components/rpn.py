@@ -0,0 +1,285 @@
+import struct
+import sys
+from array import array
+from itertools import accumulate
+
+from components.evaluator import parse_number
+from components.memory import UNBOUND, Memory, default_memory
+from components.numeric import Backend, get_backend
+
+    # -------------------------------------------
+    #   Precompiled postfix (RPN) programs.
+    #
+    #   A postfix expression is converted once into typed arrays:
+    #
+    #       opcodes     array('B')   CONST, BIG, LOAD, ADD, SUB, MUL, DIV
+    #       constants   array('q')   int64 literals, in the order CONST reads them
+    #       loads       array('I')   name index of every LOAD, in order
+    #       big         list         literals that do not fit in int64 (BIG reads them)
+    #       names       list         variable names
+    #
+    #   CONST / BIG / LOAD consume their pool front to back, so no instruction carries an
+    #   argument. `run` walks the opcodes once over a value stack sized at compile time
+    #   (the maximum depth); pools are read through iterators, so a step creates no Python
+    #   object of its own — only the arithmetic results are new objects.
+    #
+    #   `to_bytes` / `from_bytes` give a compact little-endian binary form, so converted
+    #   formulas can be stored and reloaded without MyLexer or the shunting-yard loop.
+    #   On disk the constant pool uses the narrowest of int8/16/32/64 that holds it, and a
+    #   reloaded program keeps that width in memory.
+    # -------------------------------------------
+
+CONST, BIG, LOAD, ADD, SUB, MUL, DIV = range(7)
+_OPCODES = {'+': ADD, '-': SUB, '*': MUL, '/': DIV}
+SYMBOLS = {ADD: '+', SUB: '-', MUL: '*', DIV: '/'}
+
+INT64_MIN, INT64_MAX = -(1 << 63), (1 << 63) - 1
+
+MAGIC = b"RPN1"
+# magic, constant width, opcodes, constants, loads, big literals, names, stack depth
+_HEADER = struct.Struct("<4scIIIIII")
+_WIDTHS = ((b'b', 1 << 7), (b'h', 1 << 15), (b'i', 1 << 31), (b'q', 1 << 63))
+# Stack size change of every opcode (operands push one value, operators pop two and push one)
+_STACK_EFFECT = (1, 1, 1, -1, -1, -1, -1)
+
+
+class RPNProgram:
+    __slots__ = ("opcodes", "constants", "loads", "big", "names", "depth", "_converted", "_bound")
+
+    def __init__(self, opcodes:array, constants:array, loads:array, big:list, names:list, depth:int) -> None:
+        self.opcodes:array = opcodes
+        self.constants:array = constants
+        self.loads:array = loads
+        self.big:list = big
+        self.names:list = names
+        self.depth:int = depth              # Largest stack size reached by `run`
+        self._converted:tuple = None        # (backend, constants as backend values, big as backend values)
+        self._bound:tuple = None            # (memory, slot of every name in that memory)
+
+    # ------------------------ Evaluation ------------------------ #
+
+    def constants_for(self, backend:Backend) -> tuple:
+        """Both literal pools as lists of backend values, converted once per backend."""
+        converted = self._converted
+        if converted is None or converted[0] is not backend:
+            number = backend.number
+            constants = self.constants.tolist()
+            big = self.big
+            if number is not None:
+                constants = [number(constant) for constant in constants]
+                big = [number(constant) for constant in big]
+            converted = self._converted = (backend, constants, big)
+        return converted[1], converted[2]
+
+    def resolve(self, bindings:dict = None, memory:Memory = None) -> list:
+        """Current value of every name, from `bindings` when given, otherwise by slot from Memory."""
+        if bindings is not None:
+            return [bindings[name] for name in self.names]
+        if memory is None:
+            memory = default_memory()
+        bound = self._bound
+        if bound is None or bound[0] is not memory:
+            bound = self._bound = (memory, [memory.slot(name) for name in self.names])
+        stored = memory.values
+        values = [stored[slot] for slot in bound[1]]
+        for position, value in enumerate(values):
+            if value is UNBOUND:
+                raise AssertionError(f"variable_name={self.names[position]!r} not exist in Memory")
+        return values
+
+    def run(self, bindings:dict = None, memory:Memory = None, backend:Backend = None) -> object:
+        """
+        Evaluates the program. Variables come from `bindings` when given, otherwise from
+        `memory` (the default scope when omitted); `backend` picks the numeric backend.
+        """
+        backend = get_backend(backend)
+        constants, big = self.constants_for(backend)
+        operations = backend.operations
+        next_constant = iter(constants).__next__
+        next_big = iter(big).__next__
+        if self.names:
+            next_load = map(self.resolve(bindings, memory).__getitem__, self.loads).__next__
+
+        stack = [None] * self.depth
+        top = -1
+        for opcode in self.opcodes:
+            if opcode == CONST:
+                top += 1
+                stack[top] = next_constant()
+            elif opcode >= ADD:
+                right = stack[top]
+                top -= 1
+                stack[top] = operations[opcode - ADD](stack[top], right)
+            elif opcode == LOAD:
+                top += 1
+                stack[top] = next_load()
+            else:                           # BIG
+                top += 1
+                stack[top] = next_big()
+        return stack[0]
+
+    # ------------------------ Conversion ------------------------ #
+
+    def to_postfix(self) -> str:
+        """
+        Example:
+        Input: compile_postfix("3 4 5 * +")
+        Output: "3 4 5 * +"
+        """
+        next_constant = iter(self.constants).__next__
+        next_big = iter(self.big).__next__
+        next_load = iter(self.loads).__next__
+        output = []
+        for opcode in self.opcodes:
+            if opcode == CONST:
+                output.append(str(next_constant()))
+            elif opcode == BIG:
+                output.append(str(next_big()))
+            elif opcode == LOAD:
+                output.append(self.names[next_load()])
+            else:
+                output.append(SYMBOLS[opcode])
+        return " ".join(output)
+
+    # ------------------------ Binary form ------------------------ #
+
+    def to_bytes(self) -> bytes:
+        constants, loads = self.constants, self.loads
+        low, high = (min(constants), max(constants)) if constants else (0, 0)
+        width = next(code for code, limit in _WIDTHS if -limit <= low and high < limit)
+        if width != b'q':
+            constants = array(width.decode(), constants)
+        if sys.byteorder == "big":
+            constants, loads = array(constants.typecode, constants), array('I', loads)
+            constants.byteswap()
+            loads.byteswap()
+        big = "\0".join(map(str, self.big)).encode()
+        names = "\0".join(self.names).encode()
+        header = _HEADER.pack(MAGIC, width, len(self.opcodes), len(constants), len(loads), len(big), len(names), self.depth)
+        return b"".join((header, self.opcodes.tobytes(), constants.tobytes(), loads.tobytes(), big, names))
+
+    @classmethod
+    def from_bytes(cls, data:bytes) -> "RPNProgram":
+        if len(data) < _HEADER.size:
+            raise ValueError("❌ Not an RPN program (too short)")
+        magic, width, n_opcodes, n_constants, n_loads, n_big, n_names, depth = _HEADER.unpack_from(data)
+        if magic != MAGIC or width not in dict(_WIDTHS):
+            raise ValueError(f"❌ Not an RPN program (magic {magic!r})")
+        stored = array(width.decode())
+        sizes = (n_opcodes, n_constants * stored.itemsize, n_loads * 4, n_big, n_names)
+        if _HEADER.size + sum(sizes) != len(data):
+            raise ValueError("❌ Truncated or corrupt RPN program")
+
+        view = memoryview(data)
+        position = _HEADER.size
+        sections = []
+        for size in sizes:
+            sections.append(view[position:position + size])
+            position += size
+        opcodes, loads = array('B'), array('I')
+        opcodes.frombytes(sections[0])
+        stored.frombytes(sections[1])
+        loads.frombytes(sections[2])
+        if sys.byteorder == "big":
+            stored.byteswap()
+            loads.byteswap()
+        constants = stored                  # Kept at the stored width; `run` converts the pool once anyway
+        big = [int(text) for text in bytes(sections[3]).split(b"\0")] if n_big else []
+        names = bytes(sections[4]).decode().split("\0") if n_names else []
+        # Every opcode must be known and every pool entry read by exactly one instruction
+        # (C-speed counts, nothing is decoded one by one)
+        raw = bytes(sections[0])
+        counts = [raw.count(opcode) for opcode in range(DIV + 1)]
+        if (sum(counts) != n_opcodes or counts[CONST] != n_constants or counts[BIG] != len(big)
+                or counts[LOAD] != n_loads or (n_loads and max(loads) >= len(names))):
+            raise ValueError("❌ Corrupt RPN program")
+        # Replay the stack sizes: an operator needs two values (the size never drops below
+        # one after any step), exactly one value is left, and the header depth is the maximum
+        sizes = list(accumulate(map(_STACK_EFFECT.__getitem__, raw)))
+        if not sizes or min(sizes) < 1 or sizes[-1] != 1 or max(sizes) != depth:
+            raise ValueError("❌ Corrupt RPN program")
+        return cls(opcodes, constants, loads, big, names, depth)
+
+    def save(self, path:str) -> None:
+        with open(path, "wb") as file:
+            file.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path:str) -> "RPNProgram":
+        with open(path, "rb") as file:
+            return cls.from_bytes(file.read())
+
+    def __len__(self) -> int:
+        return len(self.opcodes)
+
+    def __eq__(self, other) -> bool:
+        return (isinstance(other, RPNProgram) and self.opcodes == other.opcodes and self.constants == other.constants
+                and self.loads == other.loads and self.big == other.big and self.names == other.names)
+
+    def __repr__(self) -> str:
+        return f"RPNProgram({len(self.opcodes)} ops, depth {self.depth}, {len(self.names)} names)"
+
+
+def compile_postfix(tokens) -> RPNProgram:
+    """
+    Converts a postfix expression (string or token list) into an RPNProgram.
+    Example:
+    Input: "x 4 5 * +"
+    Output: opcodes LOAD CONST CONST MUL ADD, constants [4, 5], names ['x'], depth 3
+    """
+    if isinstance(tokens, str):
+        tokens = tokens.split()
+    opcodes = array('B')
+    constants = array('q')
+    loads = array('I')
+    big = []
+    names = []
+    name_index = {}
+    size = depth = 0
+
+    for token in tokens:
+        opcode = _OPCODES.get(token)
+        if opcode is not None:
+            if size < 2:
+                raise ValueError(f"❌ Invalid postfix expression (Operator '{token}' has fewer than 2 operands)")
+            size -= 1
+        else:
+            if token.isidentifier():
+                index = name_index.get(token)
+                if index is None:
+                    index = name_index[token] = len(names)
+                    names.append(token)
+                opcode = LOAD
+                loads.append(index)
+            else:
+                value = parse_number(token)
+                if INT64_MIN <= value <= INT64_MAX:
+                    opcode = CONST
+                    constants.append(value)
+                else:
+                    opcode = BIG
+                    big.append(value)
+            size += 1
+            depth = max(depth, size)
+        opcodes.append(opcode)
+
+    if size != 1:
+        raise ValueError(f"❌ Invalid postfix expression ({size} values left on the stack)")
+    return RPNProgram(opcodes, constants, loads, big, names, depth)
+
+
+def compile_infix(text:str, parser = None) -> RPNProgram:
+    """Runs the shunting-yard conversion (MyParser.infix_to_postfix) once and compiles the result."""
+    if parser is None:
+        from components.parsers import MyParser
+        parser = MyParser()
+    return compile_postfix(parser.infix_to_postfix(text))
+
+
+if __name__ == "__main__":
+    program = compile_infix("x * (4 + 5) - 123456789012345678901234567890 / y")
+    print(program, program.to_postfix())
+    data = program.to_bytes()
+    print(len(data), "bytes")
+    loaded = RPNProgram.from_bytes(data)
+    print(loaded == program, loaded.run({"x": 2, "y": 10}), loaded.run({"x": 2, "y": 10}, backend="fraction"))
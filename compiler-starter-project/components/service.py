@@ -0,0 +1,297 @@
+import argparse
+import asyncio
+import json
+import os
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from components.engine import EVALUATION_ERRORS, MODES, Engine
+from components.numeric import BACKENDS
+
+    # -------------------------------------------
+    #   Local evaluation service (asyncio, JSON lines).
+    #
+    #   Clients connect over a Unix socket or TCP on localhost and send one JSON request
+    #   per line:     {"id": 1, "expression": "+ 3 4", "mode": "prefix"}
+    #   and get one response per request, in request order:
+    #                 {"id": 1, "result": 7, "error": null}
+    #
+    #       - Every connection is a session: its own Engine, so its own Memory.
+    #       - A connection's requests wait in a queue of `max_pending`; when it is full the
+    #         service stops reading that socket until the session catches up (backpressure).
+    #       - Requests of a connection are collected for `batch_window` seconds (or until
+    #         `max_batch`) and evaluated as one job on a thread pool, so parsing never
+    #         runs on the event loop.
+    #       - Expressions without names cannot depend on a session's Memory, so they go to
+    #         one shared batcher that collects them from all sessions and evaluates each
+    #         distinct expression once. Expressions with names (and assignments) run on
+    #         the session's Engine, in order; inside a batch, identical ones are evaluated
+    #         once and an infix assignment ends the dedupe run.
+    #
+    #   Run from `compiler-starter-project/`:
+    #       python -m components.service --tcp 127.0.0.1:8765
+    #       python -m components.service --unix /tmp/calculator.sock
+    # -------------------------------------------
+
+class ServiceStats:
+    __slots__ = ("connections", "requests", "batches", "deduplicated")
+
+    def __init__(self) -> None:
+        self.connections:int = 0
+        self.requests:int = 0
+        self.batches:int = 0
+        self.deduplicated:int = 0
+
+    def __repr__(self) -> str:
+        return (f"ServiceStats(connections={self.connections}, requests={self.requests}, "
+                f"batches={self.batches}, deduplicated={self.deduplicated})")
+
+
+# A name or an assignment: the expression reads (or changes) the session's Memory
+_USES_MEMORY = re.compile(r'[A-Za-z_=]')
+
+
+def evaluate_one(engine:Engine, mode:str, expression:str) -> tuple:
+    """(result, error) of one expression; never raises."""
+    try:
+        return engine.evaluate(expression, mode=mode), None
+    except EVALUATION_ERRORS as error:
+        return None, str(error) or type(error).__name__
+    except Exception as error:              # Never let one request take the session down
+        return None, f"internal error: {type(error).__name__}: {error}"
+
+
+def evaluate_outcomes(engine:Engine, requests:list) -> tuple:
+    """
+    Evaluates a batch of requests of one session, in order. Returns their (result, error)
+    and how many were answered from an identical earlier request of the batch.
+    Runs on a worker thread (so it leaves ServiceStats to the caller); a session never
+    has two batches in flight.
+    """
+    seen = {}                               # (mode, expression) -> (result, error)
+    outcomes = []
+    deduplicated = 0
+    for request in requests:
+        if "error" in request:              # Already rejected while reading the line
+            outcomes.append((None, request["error"]))
+            continue
+        mode = request.get("mode") or engine.mode
+        expression = request["expression"]
+        key = (mode, " ".join(expression.split()))
+        outcome = seen.get(key)
+        if outcome is not None:
+            deduplicated += 1
+        else:
+            outcome = evaluate_one(engine, mode, expression)
+            if mode == "infix" and "=" in expression:
+                seen.clear()                # Memory changed, earlier results may be stale
+            else:
+                seen[key] = outcome
+        outcomes.append(outcome)
+    return outcomes, deduplicated
+
+
+def encode_responses(requests:list, outcomes:list) -> bytes:
+    lines = []
+    for request, (result, error) in zip(requests, outcomes):
+        response = {"id": request.get("id"), "result": result, "error": error}
+        # default=str like batch.NDJSONWriter, for Fraction / Decimal results
+        lines.append(json.dumps(response, ensure_ascii=False, default=str) + "\n")
+    return "".join(lines).encode()
+
+
+def evaluate_requests(engine:Engine, requests:list, stats:ServiceStats = None) -> bytes:
+    """Evaluates a batch of requests of one session and returns the encoded responses."""
+    outcomes, deduplicated = evaluate_outcomes(engine, requests)
+    if stats is not None:
+        stats.deduplicated += deduplicated
+    return encode_responses(requests, outcomes)
+
+
+def parse_request(line:bytes) -> dict:
+    # Returns the request, or a ready-made error response for a malformed line
+    try:
+        request = json.loads(line)
+    except ValueError as error:
+        return {"id": None, "result": None, "error": f"invalid JSON: {error}"}
+    if not isinstance(request, dict) or not isinstance(request.get("expression"), str):
+        return {"id": request.get("id") if isinstance(request, dict) else None, "result": None,
+                "error": "request must be an object with a string 'expression'"}
+    if request.get("mode") not in (None, *MODES):
+        return {"id": request.get("id"), "result": None, "error": f"mode must be one of {MODES}"}
+    return request
+
+
+def _evaluate_keys(engine:Engine, keys:list) -> list:
+    return [evaluate_one(engine, mode, expression) for mode, expression in keys]
+
+
+class CalculatorService:
+    def __init__(self, mode:str = "prefix", workers:int = None, batch_window:float = 0.001, max_batch:int = 512,
+                 backend:str = None, precision:int = None, max_pending:int = 1024) -> None:
+        self.mode:str = mode
+        self.backend:str = backend
+        self.precision:int = precision
+        self.batch_window:float = batch_window
+        self.max_batch:int = max_batch
+        self.max_pending:int = max_pending  # Queued requests per connection, and in the shared batcher
+        self.executor = ThreadPoolExecutor(max_workers=workers or min(32, (os.cpu_count() or 1) + 4))
+        self.stats:ServiceStats = ServiceStats()
+        self.shared_engine:Engine = self.new_session()      # Only ever sees name-free expressions
+        self._shared:asyncio.Queue = None   # ([(mode, expression), ...], future) from every session
+        self._shared_task:asyncio.Task = None
+
+    def new_session(self) -> Engine:
+        return Engine(mode=self.mode, backend=self.backend, precision=self.precision)
+
+    async def handle_client(self, reader:asyncio.StreamReader, writer:asyncio.StreamWriter) -> None:
+        self.stats.connections += 1
+        if self._shared_task is None:
+            self._shared = asyncio.Queue(maxsize=self.max_pending)
+            self._shared_task = asyncio.create_task(self._shared_batcher())
+        queue = asyncio.Queue(maxsize=self.max_pending)
+        session = asyncio.create_task(self._session(self.new_session(), queue, writer))
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if line.strip():
+                    self.stats.requests += 1
+                    await queue.put(parse_request(line))    # Waits (and stops reading) while the queue is full
+        except (ConnectionError, asyncio.LimitOverrunError, ValueError):
+            pass                            # Client went away or sent a line over the limit
+        except asyncio.CancelledError:
+            # Server shutting down with the connection still open; ending normally keeps
+            # asyncio from logging the cancelled handler
+            session.cancel()
+        finally:
+            try:
+                if not session.done():
+                    await queue.put(None)
+                await session
+            except asyncio.CancelledError:
+                session.cancel()
+            finally:
+                writer.close()
+
+    async def _session(self, engine:Engine, queue:asyncio.Queue, writer:asyncio.StreamWriter) -> None:
+        loop = asyncio.get_running_loop()
+        closing = False
+        while not closing:
+            request = await queue.get()
+            if request is None:
+                break
+            if self.batch_window and queue.empty():
+                await asyncio.sleep(self.batch_window)      # Let concurrent requests join the batch
+            batch = [request]
+            while len(batch) < self.max_batch and not queue.empty():
+                request = queue.get_nowait()
+                if request is None:
+                    closing = True
+                    break
+                batch.append(request)
+            if writer is None:
+                continue                    # Client gone: keep draining so the reader never blocks
+
+            # Name-free expressions go to the shared batcher, the rest run here, in order
+            shared = []                     # (mode, expression), None for a local request
+            local = []
+            for request in batch:
+                if "error" in request or _USES_MEMORY.search(request["expression"]):
+                    shared.append(None)
+                    local.append(request)
+                else:
+                    shared.append((request.get("mode") or engine.mode, " ".join(request["expression"].split())))
+            future = None
+            if len(local) < len(batch):
+                future = loop.create_future()
+                await self._shared.put(([key for key in shared if key is not None], future))
+            self.stats.batches += 1
+            if local:
+                local, deduplicated = await loop.run_in_executor(self.executor, evaluate_outcomes, engine, local)
+                self.stats.deduplicated += deduplicated         # Counters only change on the event loop
+            local = iter(local)
+            shared_outcomes = iter(await future if future is not None else ())
+            outcomes = [next(local) if key is None else next(shared_outcomes) for key in shared]
+            try:
+                writer.write(encode_responses(batch, outcomes))
+                await writer.drain()
+            except ConnectionError:
+                writer = None
+
+    async def _shared_batcher(self) -> None:
+        # Collects name-free expressions from every session; each distinct one is evaluated once
+        loop = asyncio.get_running_loop()
+        queue = self._shared
+        while True:
+            items = [await queue.get()]     # One item per session batch: (keys, future)
+            if self.batch_window and queue.empty():
+                await asyncio.sleep(self.batch_window)
+            while not queue.empty():
+                items.append(queue.get_nowait())
+            distinct = {}                   # (mode, expression) -> position in `distinct`
+            n_keys = 0
+            for keys, _ in items:
+                n_keys += len(keys)
+                for key in keys:
+                    if key not in distinct:
+                        distinct[key] = len(distinct)
+            self.stats.batches += 1
+            self.stats.deduplicated += n_keys - len(distinct)
+            outcomes = await loop.run_in_executor(self.executor, _evaluate_keys, self.shared_engine, list(distinct))
+            for keys, future in items:
+                if not future.done():
+                    future.set_result([outcomes[distinct[key]] for key in keys])
+
+    async def serve_tcp(self, host:str = "127.0.0.1", port:int = 8765) -> asyncio.AbstractServer:
+        return await asyncio.start_server(self.handle_client, host, port, limit=1 << 24)
+
+    async def serve_unix(self, path:str) -> asyncio.AbstractServer:
+        return await asyncio.start_unix_server(self.handle_client, path, limit=1 << 24)
+
+    def close(self) -> None:
+        if self._shared_task is not None:
+            self._shared_task.cancel()
+        self.executor.shutdown(wait=False)
+
+
+async def serve(service:CalculatorService, tcp:str = None, unix:str = None) -> None:
+    if unix:
+        server = await service.serve_unix(unix)
+    else:
+        host, _, port = (tcp or "127.0.0.1:8765").rpartition(":")
+        server = await service.serve_tcp(host or "127.0.0.1", int(port))
+    addresses = ", ".join(str(socket.getsockname()) for socket in server.sockets)
+    print(f"calculator service listening on {addresses}", file=sys.stderr)
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv=None) -> int:
+    arg_parser = argparse.ArgumentParser(prog="python -m components.service", description="JSON-lines evaluation service")
+    address = arg_parser.add_mutually_exclusive_group()
+    address.add_argument("--tcp", default=None, help="HOST:PORT to listen on (default 127.0.0.1:8765)")
+    address.add_argument("--unix", default=None, help="Unix socket path to listen on")
+    arg_parser.add_argument("--mode", choices=MODES, default="prefix", help="default notation of requests")
+    arg_parser.add_argument("--numeric", choices=tuple(BACKENDS), default="float", help="numeric backend")
+    arg_parser.add_argument("--precision", type=int, default=None, help="significant digits for --numeric decimal")
+    arg_parser.add_argument("--workers", type=int, default=None, help="evaluation threads")
+    arg_parser.add_argument("--batch-window", type=float, default=0.001, help="seconds to wait for more requests")
+    arg_parser.add_argument("--max-pending", type=int, default=1024, help="queued requests per connection")
+    args = arg_parser.parse_args(argv)
+
+    service = CalculatorService(mode=args.mode, workers=args.workers, batch_window=args.batch_window,
+                                backend=args.numeric, precision=args.precision, max_pending=args.max_pending)
+    try:
+        asyncio.run(serve(service, args.tcp, args.unix))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
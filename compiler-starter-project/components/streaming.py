@@ -0,0 +1,169 @@
+import mmap
+import sys
+from typing import NamedTuple
+
+import sly
+
+from components.engine import EVALUATION_ERRORS, Engine
+from components.fastlex import TOKEN_TYPES, NUMBER, tokenize_fast
+from components.profiling import profiler
+
+    # -------------------------------------------
+    #   Streaming tokenization of large expression files.
+    #
+    #       - `read_chunks` reads a file in fixed-size blocks, through mmap when the file
+    #         can be mapped, otherwise with plain reads (pipes, stdin).
+    #       - `stream_statements` cuts the blocks at the last newline, carries the unfinished
+    #         line (and so any token split by the cut) into the next block, and tokenizes
+    #         each piece with one `tokenize_fast` call.
+    #       - Statements (one per line) are yielded as soon as their line is complete, with
+    #         absolute line numbers and byte offsets, like MyLexer's lineno / index.
+    #
+    #   Peak memory is one block (and its token arrays, ~20 bytes per input byte) plus the
+    #   longest line, whatever the file size.
+    # -------------------------------------------
+
+class Statement(NamedTuple):
+    lineno:int              # Line number of the statement
+    index:int               # Byte offset of the line in the file
+    text:bytes              # The line, without its newline
+    tokens:list             # sly Tokens with absolute lineno / index, ready for MyParser.parse
+    errors:list             # Byte offsets (in the file) of illegal characters
+
+
+def read_chunks(source, chunk_bytes:int = 1 << 16):
+    """
+    Yields blocks of `chunk_bytes` from a path or a binary file object ('-' is stdin).
+    Regular files are memory-mapped, so only the block being sliced is paged in.
+    """
+    if source == "-":
+        source = sys.stdin.buffer
+    if isinstance(source, str):
+        with open(source, "rb") as file:
+            yield from read_chunks(file, chunk_bytes)
+        return
+
+    try:
+        mapped = mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError, AttributeError):
+        # Not mappable: a pipe, an empty file, or an in-memory buffer
+        mapped = None
+    if mapped is None:
+        while True:
+            block = source.read(chunk_bytes)
+            if not block:
+                return
+            yield block
+    with mapped:
+        for start in range(0, len(mapped), chunk_bytes):
+            yield mapped[start:start + chunk_bytes]
+
+
+def _statements_of(piece:bytes, base:int, lineno:int, with_tokens:bool = True):
+    # Splits one tokenized piece (ending at a line end) into per-line Statements.
+    # Without `with_tokens` only the text and the illegal characters are kept (prefix input).
+    with profiler.stage("stream.tokenize") as stage:
+        tokens = tokenize_fast(piece, lineno)
+        stage.tokens = len(tokens)
+    types, starts, ends, values = tokens.types, tokens.starts, tokens.ends, tokens.values
+    errors = tokens.errors
+    n_tokens = len(types)
+    position = 0                            # Next token
+    error_position = 0                      # Next illegal character
+
+    line_start = 0
+    for line_end in (*tokens.newlines, len(piece)):
+        line_tokens = []
+        first = position
+        while not with_tokens and position < n_tokens and starts[position] < line_end:
+            position += 1
+        while position < n_tokens and starts[position] < line_end:
+            token = sly.lex.Token()
+            code = types[position]
+            token.type = TOKEN_TYPES[code]
+            if code == NUMBER:
+                token.value = tokens.big_values.get(position, values[position])
+            else:
+                token.value = piece[starts[position]:ends[position]].decode()
+            token.lineno = lineno
+            token.index = base + starts[position]
+            token.end = base + ends[position]
+            line_tokens.append(token)
+            position += 1
+        line_errors = []
+        while error_position < len(errors) and errors[error_position] < line_end:
+            line_errors.append(base + errors[error_position])
+            error_position += 1
+        if position > first or line_errors:
+            yield Statement(lineno, base + line_start, piece[line_start:line_end], line_tokens, line_errors)
+        line_start = line_end + 1
+        lineno += 1
+
+
+def stream_statements(chunks, lineno:int = 1, with_tokens:bool = True):
+    """
+    Yields one Statement per non-blank line of a stream of byte blocks.
+    A line (or token) cut by a block boundary is carried over and finished by the next block.
+    Example:
+    Input: [b"x = 1", b"2\\ny + x\\n"]
+    Output: Statement(1, 0, b"x = 12", [NAME, ASSIGN, NUMBER]), Statement(2, 7, b"y + x", [NAME, '+', NAME])
+    """
+    carry = b""
+    base = 0                                # File offset of carry[0]
+    for block in chunks:
+        cut = block.rfind(b"\n")
+        if cut < 0:
+            # No line end in this block: the whole block belongs to the current line
+            carry += block
+            continue
+        piece = carry + block[:cut + 1]
+        carry = block[cut + 1:]
+        yield from _statements_of(piece, base, lineno, with_tokens)
+        lineno += piece.count(b"\n")
+        base += len(piece)
+    if carry:
+        yield from _statements_of(carry, base, lineno, with_tokens)
+
+
+def read_statements(paths:list, chunk_bytes:int = 1 << 16, with_tokens:bool = True):
+    """Streams the Statements of several files, '-' meaning stdin (line numbers restart per file)."""
+    for path in paths or ["-"]:
+        yield from stream_statements(read_chunks(path, chunk_bytes), with_tokens=with_tokens)
+
+
+def evaluate_statements(engine:Engine, statements):
+    """
+    Yields one record per Statement, in the same shape as `batch.evaluate_lines`.
+    Infix statements go straight from their tokens to MyParser, without re-lexing the text.
+    """
+    parse = engine.parser.parse
+    for statement in statements:
+        # Bytes that are not UTF-8 are lexed as illegal characters; they must not end the stream
+        text = statement.text.decode(errors="replace").strip()
+        if text.startswith("#"):
+            continue
+        try:
+            if statement.errors:
+                # Index within the line, like Engine's own lexer error
+                index = statement.errors[0] - statement.index
+                character = statement.text[index:index + 1].decode(errors="replace")
+                raise ValueError(f"❌ Illegal character '{character}' at index {index}")
+            if engine.mode == "infix":
+                with profiler.stage("infix.parse") as stage:
+                    reductions = engine.parser.reductions
+                    try:
+                        result = parse(iter(statement.tokens))
+                    finally:
+                        stage.tokens = len(statement.tokens)
+                        stage.reductions = engine.parser.reductions - reductions
+            else:
+                result = engine.evaluate(text)
+            yield {"line": statement.lineno, "input": text, "result": result, "error": None}
+        except EVALUATION_ERRORS as error:
+            yield {"line": statement.lineno, "input": text, "result": None, "error": str(error) or type(error).__name__}
+
+
+if __name__ == "__main__":
+    blocks = [b"x = 1", b"2\n\ny + x\n(3 + 4) * x_", b"1 ! 2"]
+    for statement in stream_statements(blocks):
+        print(statement.lineno, statement.index, statement.text, [(t.type, t.value, t.index) for t in statement.tokens], statement.errors)
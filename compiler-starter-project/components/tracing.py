@@ -0,0 +1,113 @@
+import os
+import sys
+from enum import IntEnum
+from typing import Callable, NamedTuple
+
+    # -------------------------------------------
+    #   Structured tracing for the calculator components.
+    #
+    #       - Every component owns a `Channel` (lexer, parser, converter, ast, ...).
+    #       - Call sites guard with `if channel.level:` (or `>= Level.DEBUG`), so a disabled
+    #         channel costs one attribute read and nothing is formatted.
+    #       - Enabled channels send `Event` tuples to a pluggable sink (any callable).
+    #       - `CALC_TRACE="lexer,parser=debug"` enables channels from the environment.
+    # -------------------------------------------
+
+class Level(IntEnum):
+    OFF:int = 0
+    INFO:int = 1        # token / reduce / node evaluation / results
+    DEBUG:int = 2       # + every stack push and pop
+
+
+class Event(NamedTuple):
+    component:str       # Channel name, e.g. "lexer"
+    kind:str            # "token", "reduce", "stack", "node", "result", ...
+    data:dict           # Raw values, formatting is up to the sink
+
+
+class PrintSink:
+    """Writes one line per event to a stream (stderr by default, stdout stays clean)."""
+    def __init__(self, stream=None) -> None:
+        self.stream = stream
+
+    def __call__(self, event:Event) -> None:
+        fields = " ".join(f"{key}={value!r}" for key, value in event.data.items())
+        print(f"[{event.component}] {event.kind} {fields}", file=self.stream or sys.stderr)
+
+
+class ListSink:
+    """Collects events in memory, useful for tests and tooling."""
+    def __init__(self) -> None:
+        self.events:list = []
+
+    def __call__(self, event:Event) -> None:
+        self.events.append(event)
+
+
+class Channel:
+    __slots__ = ("name", "level", "sink")
+
+    def __init__(self, name:str) -> None:
+        self.name:str = name
+        self.level:Level = Level.OFF
+        self.sink:Callable = PrintSink()
+
+    def emit(self, kind:str, **data) -> None:
+        self.sink(Event(self.name, kind, data))
+
+    def __repr__(self) -> str:
+        return f"Channel({self.name}, {self.level.name})"
+
+
+_channels:dict = {}
+
+
+def channel(name:str) -> Channel:
+    """Returns the channel for a component, creating it (disabled) on first use."""
+    if name not in _channels:
+        _channels[name] = Channel(name)
+        _configure_from_env(_channels[name])
+    return _channels[name]
+
+
+def enable(*names:str, level:Level = Level.INFO, sink:Callable = None) -> None:
+    """Turns tracing on for the given components (all known components when no name is given)."""
+    for name in names or tuple(_channels):
+        target = channel(name)
+        target.level = Level(level)
+        if sink is not None:
+            target.sink = sink
+
+
+def disable(*names:str) -> None:
+    """Turns tracing off for the given components (all components when no name is given)."""
+    for name in names or tuple(_channels):
+        channel(name).level = Level.OFF
+
+
+_warned_levels:set = set()             # Unknown CALC_TRACE levels already reported
+
+
+def _configure_from_env(target:Channel) -> None:
+    # CALC_TRACE="lexer,parser=debug" or CALC_TRACE="all=info"
+    for item in os.environ.get("CALC_TRACE", "").split(","):
+        name, _, level = item.strip().partition("=")
+        if name in (target.name, "all"):
+            known = Level.__members__.get(level.upper()) if level else Level.INFO
+            if known is None:
+                # A typo in an environment variable must not break every entry point
+                if level not in _warned_levels:
+                    _warned_levels.add(level)
+                    print(f"CALC_TRACE: unknown level {level!r} (use one of {', '.join(Level.__members__).lower()}), "
+                          f"using info", file=sys.stderr)
+                known = Level.INFO
+            target.level = known
+
+
+if __name__ == "__main__":
+    sink = ListSink()
+    enable("demo", level=Level.DEBUG, sink=sink)
+    demo = channel("demo")
+    if demo.level:
+        demo.emit("token", type="NUMBER", value=42)
+    print(sink.events)
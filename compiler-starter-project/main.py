@@ -1,11 +1,86 @@
 import sys
 from PyQt6 import uic
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
 from PyQt6.QtWidgets import QApplication
 from PyQt6.QtWidgets import QMainWindow, QLineEdit, QPushButton, QLCDNumber
 
-from components.lexica import MyLexer
-from components.parsers import MyParser
-from components.memory import Memory
+from components.memory import default_memory
+from components.incremental import Budget, IncrementalPrefix
+from components.profiling import profiler
+
+    # -------------------------------------------
+    #   Evaluation runs off the UI thread.
+    #
+    #       - Every edit (and "=") bumps `MainWindow.generation` and queues an EvaluationJob
+    #         on a one-thread QThreadPool, so the live prefix state has a single writer.
+    #       - A newer edit drops the queued jobs; the running one sees its generation is
+    #         stale at its next Budget check and stops, keeping what it has read.
+    #       - A job also stops after EVALUATION_SECONDS; pressing "=" resumes from there.
+    #       - Results come back through a queued signal and stale ones are ignored, so the
+    #         UI thread only ever sets a few widgets (the infix text is cut at MAX_DISPLAY).
+    # -------------------------------------------
+
+EVALUATION_SECONDS = 2.0                # Time budget of one job
+MAX_DISPLAY = 4096                      # Characters of infix put in the QLineEdit
+
+
+class EvaluationSignals(QObject):
+    # generation, result (None: show 0), text for the infix field
+    finished = pyqtSignal(int, object, str)
+
+
+class EvaluationJob(QRunnable):
+    def __init__(self, window:"MainWindow", generation:int, text:str, report:bool) -> None:
+        super().__init__()
+        self.window = window
+        self.generation:int = generation
+        self.text:str = text
+        self.report:bool = report       # "=" was pressed: print the details and the memory
+        self.signals = window.evaluation_signals
+
+    def stale(self) -> bool:
+        return self.generation != self.window.generation
+
+    def run(self) -> None:
+        if self.stale():
+            return                      # Superseded while it was queued
+        live = self.window.live
+        budget = Budget(cancelled=self.stale, seconds=EVALUATION_SECONDS)
+        with profiler.stage("ui.evaluate") as stage:
+            done = live.update(self.text, budget)
+            stage.tokens = len(live.tokens)
+        if budget.reason == "cancelled":
+            return
+
+        error = None
+        if not done:
+            error = f"Stopped after {len(live.tokens)} tokens ({budget.reason}), press = to continue"
+            shown = error
+        elif self.report and (live.error or len(live.tokens) < 3 or not live.complete):
+            if len(live.tokens) < 3:
+                error = f"Prefix expression is too short: {self.text.strip()}"
+            else:
+                error = live.error or f"Incomplete prefix expression: {self.text.strip()}"
+            shown = "Invalid Prefix Input"
+        else:
+            shown = live.infix_prefix(MAX_DISPLAY)
+        self.signals.finished.emit(self.generation, None if error else live.result, shown)
+
+        if self.report:
+            self.print_report(live, error)
+
+    def print_report(self, live:IncrementalPrefix, error:str = None) -> None:
+        # Runs on the worker thread, so a big Memory dump never blocks the window
+        if error:
+            print(f"❌ ERROR: {error}")
+            return
+        print(f"✅ Converted Infix: {live.infix}")
+        print(f"✅ Result: {live.result}\n")
+        with profiler.stage("ui.print_memory"):
+            print(default_memory())     # Debugging memory
+        if profiler.enabled:
+            print(profiler)             # Per-stage timings (CALC_PROFILE=1)
+
 
 class MainWindow(QMainWindow):
 
@@ -33,6 +108,16 @@ class MainWindow(QMainWindow):
         super().__init__(*args, **kwargs)
         uic.loadUi("./components/main.ui", self)
 
+        # Parser state per token of the input, so each edit only re-reads the edited tokens.
+        # Only the evaluation thread touches it.
+        self.live = IncrementalPrefix()
+        self.generation:int = 0                 # Bumped by every request; older results are dropped
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(1)
+        self.evaluation_signals = EvaluationSignals(self)
+        self.evaluation_signals.finished.connect(self.show_evaluation)
+        self.input_prefix.textChanged.connect(self.update_live)
+
         #### Binding buttons to functions ####
         self.button_0.clicked.connect(lambda: self.push("0"))   
         self.button_1.clicked.connect(lambda: self.push("1"))
@@ -60,6 +145,24 @@ class MainWindow(QMainWindow):
         else:
             self.input_prefix.setText(f"{current_text}{text}")    # No space for numbers
     
+    def update_live(self, text: str):
+        """Refresh the infix and answer outputs while the prefix input is being edited."""
+        self.evaluate(text, report=False)
+
+    def evaluate(self, text: str, report: bool):
+        """Queues an evaluation of `text` and cancels the ones still pending."""
+        self.generation += 1
+        self.pool.clear()                       # Drop queued jobs; the running one notices on its own
+        self.pool.start(EvaluationJob(self, self.generation, text, report))
+
+    def show_evaluation(self, generation: int, result: object, shown: str):
+        """Receives a job's outcome on the UI thread."""
+        if generation != self.generation:
+            return                              # The input changed since this job started
+        with profiler.stage("ui.display"):
+            self.output_answer.display(0 if result is None else result)    # Show the final answer
+            self.output_infix.setText(shown)    # Show infix expression (or why there is none)
+
     def clear(self):
         """Clear all input and output fields."""
         self.input_prefix.setText("")       # Clear prefix input
@@ -70,51 +173,15 @@ class MainWindow(QMainWindow):
     def push_equal(self):
         print("\n========================================================================")
         print("📍 Calculating from Prefix Input...")
-
-        lexer = MyLexer()
-        parser = MyParser()
-        memory = Memory()
-
-        input_text = self.input_prefix.text().strip()
-
-        # ✅ Ensure prefix input is properly formatted
-        tokens = input_text.split()
-        if len(tokens) < 3:
-            print(f"❌ ERROR: Prefix expression is too short: {input_text}")
-            self.output_infix.setText("Invalid Prefix Input")
-            # self.output_postfix.setText("")
-            self.output_answer.display("0")
-            return
-
-        print(f"🟠 Checking input prefix: {tokens}")
-
-        try:
-            # Convert prefix to infix and postfix
-            infix_expr = parser.prefix_to_infix(input_text)
-            # postfix_expr = parser.prefix_to_postfix(input_text)
-
-            # Debugging
-            print(f"✅ Prefix Input: {input_text}")
-            print(f"✅ Converted Infix: {infix_expr}")
-            # print(f"✅ Converted Postfix: {postfix_expr}")
-
-            # Evaluate the infix expression
-            result = parser.parse(lexer.tokenize(infix_expr))
-
-            print(f"✅ Result: {result}\n")
-
-            # Display in UI
-            self.output_answer.display(result)       # Show the final answer
-            self.output_infix.setText(infix_expr)   # Show infix expression
-            # self.output_postfix.setText(postfix_expr)  # Show postfix expression
-
-            print(memory)  # Debugging memory
-
-        except ValueError as e:
-            print(f"❌ ERROR: {e}")
-            self.output_infix.setText("Invalid Prefix Input")
-            # self.output_postfix.setText("")
-            self.output_answer.display("0")
+        # The live state usually holds the result of the current text already; the job
+        # only reads what is left and prints the details off the UI thread
+        self.evaluate(self.input_prefix.text(), report=True)
+
+    def closeEvent(self, event):
+        self.generation += 1                    # Running job stops at its next check
+        self.pool.clear()
+        self.pool.waitForDone()
+        super().closeEvent(event)
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)